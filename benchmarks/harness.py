@@ -0,0 +1,125 @@
+"""
+Timing helpers shared by the benchmark suite.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB (0 if unavailable)."""
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], items: int) -> Dict[str, Any]:
+    total = sum(latencies)
+    return {
+        "items": items,
+        "calls": len(latencies),
+        "total_s": round(total, 6),
+        "throughput_per_s": round(items / total, 2) if total > 0 else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+
+def measure_calls(fn: Callable[[Any], Any], inputs: Iterable[Any], warmup: int = 1) -> Dict[str, Any]:
+    """
+    Calls `fn` once per input and reports per-call latency.
+    """
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        fn(item)
+
+    latencies = []
+    for item in inputs:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, len(inputs))
+
+
+def measure_once(fn: Callable[[], Any], items: int, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Runs a bulk operation `repeat` times; throughput is items processed per second.
+    """
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    result = summarize(latencies, items * repeat)
+    result["items"] = items
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def save_results(results: Dict[str, Any], path: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    payload = {
+        "metadata": {
+            "revision": git_revision(),
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "results": results
+    }
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Benchmark results saved to {path}")
+
+
+def compare(baseline_path: str, results: Dict[str, Any], threshold: float = 0.10) -> List[str]:
+    """
+    Prints throughput change per benchmark against a saved run.
+    Returns the names that regressed by more than `threshold`.
+    """
+    with open(baseline_path, "r") as f:
+        baseline = json.load(f).get("results", {})
+
+    regressions = []
+    print(f"\nComparison against {baseline_path}:")
+    for name, current in sorted(results.items()):
+        old = baseline.get(name)
+        if not old or not old.get("throughput_per_s") or not current.get("throughput_per_s"):
+            continue
+        change = current["throughput_per_s"] / old["throughput_per_s"] - 1
+        flag = ""
+        if change < -threshold:
+            flag = "  <-- REGRESSION"
+            regressions.append(name)
+        print(f"  {name:<45} {change:+7.1%}{flag}")
+    return regressions
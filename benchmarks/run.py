@@ -0,0 +1,261 @@
+"""
+Benchmark suite for the engine pipeline.
+
+Runs offline against synthetic data (and optionally a recorded HTTP cassette)
+and reports throughput, p50/p99 latency and peak RSS per benchmark.
+
+Usage:
+    python -m benchmarks.run                       # full suite
+    python -m benchmarks.run --quick               # smaller sizes (skips 1M aggregation)
+    python -m benchmarks.run --only resolver,aggregate
+    python -m benchmarks.run --compare benchmarks/results/abc123.json
+    python -m benchmarks.run --cassette fixtures/cassettes/run.jsonl.gz   # + end-to-end engine run
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict
+
+from benchmarks import synthetic
+from benchmarks.harness import measure_calls, measure_once, save_results, compare, git_revision
+
+
+def bench_resolver(quick: bool) -> Dict[str, Any]:
+    from src.analysis.entity_resolution import EntityResolver
+
+    results = {}
+    alias_counts = [100, 500] if quick else [100, 500, 2000]
+    text_lengths = [100, 1000] if quick else [100, 1000, 5000]
+    for companies_n in alias_counts:
+        companies = synthetic.make_companies(companies_n)
+        resolver = EntityResolver(companies=companies)
+        for length in text_lengths:
+            texts = synthetic.make_texts(50 if quick else 200, length, companies)
+            name = f"resolver.resolve[companies={companies_n},chars={length}]"
+            results[name] = measure_calls(resolver.resolve, texts)
+            print(f"{name}: {results[name]['throughput_per_s']} texts/s")
+    return results
+
+
+def bench_sentiment(quick: bool) -> Dict[str, Any]:
+    from src.analysis.sentiment import SentimentEngine
+
+    engine = SentimentEngine()
+    results = {}
+    for batch in ([100, 1000] if quick else [100, 1000, 10000]):
+        texts = synthetic.make_texts(batch, 200, [], seed=batch)
+        name = f"sentiment.score_batch[n={batch}]"
+        results[name] = measure_once(lambda: engine.score_batch(texts), batch)
+        print(f"{name}: {results[name]['throughput_per_s']} texts/s")
+
+    texts = synthetic.make_texts(500, 200, [], seed=7)
+    results["sentiment.analyze[single]"] = measure_calls(engine.analyze, texts)
+
+    # Steady state across runs: every text was scored (and persisted) by an earlier run
+    texts = synthetic.make_texts(1000, 200, [], seed=1000)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "sentiment.sqlite")
+        previous_run = SentimentEngine(cache_path=cache_path)
+        previous_run.score_batch(texts)
+        previous_run.flush()
+        cached = SentimentEngine(cache_path=cache_path)
+        name = "sentiment.score_batch[n=1000,warm_cache]"
+        results[name] = measure_once(lambda: cached.score_batch(texts), len(texts))
+        print(f"{name}: {results[name]['throughput_per_s']} texts/s")
+        cached.cache.close()
+        previous_run.cache.close()
+    return results
+
+
+def bench_lexicon(quick: bool) -> Dict[str, Any]:
+    from src.analysis.lexicon import load_lexicon
+    from src.analysis.sentiment import SentimentEngine
+
+    results = {}
+    texts = synthetic.make_texts(1000 if quick else 5000, 200, [], seed=9)
+    with tempfile.TemporaryDirectory() as tmp:
+        # The shipped finance lexicon, and the same padded with thousands of extra terms
+        padded = os.path.join(tmp, "padded.tsv")
+        with open(padded, "w", encoding="utf-8") as f:
+            f.writelines(f"{term}\t{valence}\n" for term, valence in synthetic.make_lexicon(5000).items())
+        variants = {
+            "stock": [],
+            "finance": ["data/lexicons/finance.tsv"],
+            "finance+5000": ["data/lexicons/finance.tsv", padded],
+        }
+        cache_dir = os.path.join(tmp, "compiled")
+        for label, files in variants.items():
+            engine = SentimentEngine(lexicon_files=files, lexicon_cache_dir=cache_dir)
+            polarity = engine.analyzer.polarity_scores
+            name = f"lexicon.polarity_scores[{label}]"
+            results[name] = measure_once(lambda: [polarity(t) for t in texts], len(texts))
+            print(f"{name}: {results[name]['throughput_per_s']} texts/s ({len(engine.analyzer.lexicon)} terms)")
+
+        files = variants["finance+5000"]
+        results["lexicon.load[finance+5000,compile]"] = measure_once(lambda: load_lexicon(files), 1)
+        results["lexicon.load[finance+5000,cached]"] = measure_once(lambda: load_lexicon(files, cache_dir), 1)
+        for name in ("lexicon.load[finance+5000,compile]", "lexicon.load[finance+5000,cached]"):
+            print(f"{name}: p50 {results[name]['p50_ms']} ms")
+    return results
+
+
+def bench_bot_detector(quick: bool) -> Dict[str, Any]:
+    from src.analysis.bot_detector import BotDetector
+
+    detector = BotDetector()
+    posts = synthetic.make_posts(1000 if quick else 10000)
+    name = f"bot_detector.is_bot[n={len(posts)}]"
+    result = measure_calls(detector.is_bot, posts)
+    print(f"{name}: {result['throughput_per_s']} posts/s")
+    return {name: result}
+
+
+def bench_aggregate(quick: bool) -> Dict[str, Any]:
+    from src.main_engine import SocialArbEngine
+
+    results = {}
+    for count in ([1_000, 100_000] if quick else [1_000, 100_000, 1_000_000]):
+        signals = synthetic.make_signals(count)
+        name = f"phase3.aggregate[signals={count}]"
+        results[name] = measure_once(lambda: SocialArbEngine.aggregate_signals(signals), count)
+        print(f"{name}: {results[name]['throughput_per_s']} signals/s")
+        del signals
+    return results
+
+
+def bench_ledger(quick: bool) -> Dict[str, Any]:
+    from src.main_engine import write_ledger
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        signals_path = os.path.join(tmp, "current_signals.json")
+        web_path = os.path.join(tmp, "data.json")
+        delta_path = os.path.join(tmp, "ledger_delta.json")
+        for count in ([100, 1000] if quick else [100, 1000, 10000]):
+            ledger = synthetic.make_ledger(count)
+            name = f"ledger.write[records={count}]"
+            results[name] = measure_once(lambda: write_ledger(ledger, signals_path, web_path, delta_path), count)
+            results[name]["bytes"] = os.path.getsize(signals_path) + os.path.getsize(web_path)
+            # What the dashboard downloads on page load
+            results[name]["web_index_bytes"] = os.path.getsize(web_path)
+            print(f"{name}: {results[name]['throughput_per_s']} records/s, web index {results[name]['web_index_bytes']} bytes")
+
+            # Same records again: only the comparison and the dashboard file
+            name = f"ledger.write_unchanged[records={count}]"
+            results[name] = measure_once(lambda: write_ledger(ledger, signals_path, web_path, delta_path), count)
+            print(f"{name}: {results[name]['throughput_per_s']} records/s")
+    return results
+
+
+def bench_archive(quick: bool) -> Dict[str, Any]:
+    from datetime import datetime, timedelta, timezone
+    from src.utils.archive import SignalArchive
+
+    results = {}
+    days = 14 if quick else 90
+    ledger = synthetic.make_ledger(50)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = SignalArchive(tmp)
+        # One run per hour, compacting each day as the next one starts
+        name = "archive.append[rows=50]"
+        results[name] = measure_calls(
+            lambda hour: archive.append(ledger, f"run{hour:05d}", start + timedelta(hours=hour)),
+            range(days * 24)
+        )
+        print(f"{name}: p50 {results[name]['p50_ms']} ms")
+
+        tickers = [r["ticker"] for r in ledger[:5]]
+        end = start + timedelta(days=days)
+        name = f"archive.query[days={days},tickers=5]"
+        results[name] = measure_once(lambda: archive.query(tickers, start, end), days * 24 * len(tickers))
+        print(f"{name}: p50 {results[name]['p50_ms']} ms")
+
+        name = f"archive.query[days={days},all]"
+        results[name] = measure_once(lambda: archive.query(start=start, end=end), days * 24 * len(ledger))
+        print(f"{name}: p50 {results[name]['p50_ms']} ms")
+    return results
+
+
+def bench_backtest(quick: bool) -> Dict[str, Any]:
+    from src.analysis.backtest import Backtester, daily_snapshots
+
+    results = {}
+    # ~1 year / 3 years of hourly runs with 50 signals each, over 1000 / 3000 tickers
+    years, tickers = (1, 1000) if quick else (3, 3000)
+    closes = synthetic.make_price_matrix(days=260 * years + 30, tickers=tickers)
+    signals = synthetic.make_snapshots(hours=24 * 365 * years, tickers=tickers, per_run=50)
+    backtester = Backtester(archive=object())
+
+    name = f"backtest.daily_snapshots[rows={len(signals)}]"
+    results[name] = measure_once(lambda: daily_snapshots(signals), len(signals), repeat=1)
+    print(f"{name}: {results[name]['throughput_per_s']} rows/s")
+
+    snapshots = daily_snapshots(signals)
+    name = f"backtest.evaluate[snapshots={len(snapshots)},tickers={tickers}]"
+    results[name] = measure_once(lambda: backtester.evaluate(snapshots, closes), len(snapshots), repeat=1)
+    print(f"{name}: {results[name]['throughput_per_s']} snapshots/s")
+    return results
+
+
+def bench_engine_replay(cassette_path: str) -> Dict[str, Any]:
+    os.environ["SOCIAL_ARB_HTTP_MODE"] = "replay"
+    os.environ["SOCIAL_ARB_CASSETTE"] = cassette_path
+    from src.main_engine import SocialArbEngine
+
+    engine = SocialArbEngine()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the benchmark from touching the real data/, web/ and cache/ directories
+        for attr in engine.OUTPUT_PATHS:
+            setattr(engine, attr, os.path.join(tmp, os.path.basename(getattr(engine, attr))))
+        result = measure_once(engine.run, 1, repeat=1)
+    return {"engine.run[replay]": result}
+
+
+BENCHMARKS: Dict[str, Callable[[bool], Dict[str, Any]]] = {
+    "resolver": bench_resolver,
+    "sentiment": bench_sentiment,
+    "lexicon": bench_lexicon,
+    "bot_detector": bench_bot_detector,
+    "aggregate": bench_aggregate,
+    "ledger": bench_ledger,
+    "archive": bench_archive,
+    "backtest": bench_backtest,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Social Arb engine benchmarks")
+    parser.add_argument("--only", help=f"comma separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--quick", action="store_true", help="smaller input sizes")
+    parser.add_argument("--out", help="results file (default benchmarks/results/<revision>.json)")
+    parser.add_argument("--compare", help="previous results file to compare throughput against")
+    parser.add_argument("--cassette", help="also time a full SocialArbEngine.run replayed from this cassette")
+    args = parser.parse_args(argv)
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    results: Dict[str, Any] = {}
+    for name in selected:
+        print(f"--- Benchmark: {name} ---")
+        results.update(BENCHMARKS[name](args.quick))
+
+    if args.cassette:
+        print("--- Benchmark: engine (replay) ---")
+        results.update(bench_engine_replay(args.cassette))
+
+    out = args.out or os.path.join("benchmarks", "results", f"{git_revision()}.json")
+    save_results(results, out)
+
+    if args.compare:
+        return 1 if compare(args.compare, results) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
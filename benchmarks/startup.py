@@ -0,0 +1,109 @@
+"""
+Startup (import) cost of the engine entry points, measured with `python -X importtime`.
+
+Each target runs in a fresh interpreter so nothing is cached between targets.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 5 --out benchmarks/results/startup.json
+    python -m benchmarks.startup --compare benchmarks/results/startup-old.json
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+from benchmarks.harness import save_results, compare
+
+# name -> code executed in the child interpreter
+TARGETS = {
+    "engine.import": "import src.main_engine",
+    "engine.construct": "import src.main_engine as m; m.SocialArbEngine()",
+    "verify_web_output.import": "import src.verify_web_output",
+    "tui.import": "import src.ui.tui",
+    "debug_trends.import": "import src.debug_trends",
+    "debug_reddit.import": "import src.debug_reddit",
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    Returns (total seconds of top-level imports, [(module, cumulative seconds)] sorted desc).
+    """
+    total_us = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self_us |   cumulative_us | <indent>module"
+        _, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        try:
+            cumulative = int(cumulative_us.strip())
+        except ValueError:
+            continue
+        # Top-level imports are not indented under a parent
+        if not name.startswith("  ") and name.startswith(" "):
+            total_us += cumulative
+        modules.append((name.strip(), cumulative / 1e6))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return total_us / 1e6, modules
+
+
+def measure_target(code: str, repeat: int) -> Dict[str, Any]:
+    import_totals = []
+    walls = []
+    heaviest: List[Tuple[str, float]] = []
+    env = {**os.environ, "SOCIAL_ARB_HTTP_MODE": "replay", "SOCIAL_ARB_CASSETTE": os.devnull}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, env=env
+        )
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            tail = proc.stderr.strip().splitlines()[-1:] or ["?"]
+            raise RuntimeError(f"'{code}' failed: {tail[0]}")
+        total, modules = parse_importtime(proc.stderr)
+        import_totals.append(total)
+        heaviest = modules[:10]
+
+    median_wall = statistics.median(walls)
+    return {
+        "items": 1,
+        "import_s": round(statistics.median(import_totals), 4),
+        "wall_s": round(median_wall, 4),
+        # Startups per second, so `compare` can flag regressions like the other benchmarks
+        "throughput_per_s": round(1 / median_wall, 3),
+        "heaviest_imports": [{"module": name, "cumulative_s": round(s, 4)} for name, s in heaviest]
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Engine/TUI/debug script startup benchmark")
+    parser.add_argument("--only", help=f"comma separated subset of: {', '.join(TARGETS)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default=os.path.join("benchmarks", "results", "startup.json"))
+    parser.add_argument("--compare", help="previous startup results to compare against")
+    args = parser.parse_args(argv)
+
+    names = args.only.split(",") if args.only else list(TARGETS)
+    results = {}
+    for name in names:
+        result = measure_target(TARGETS[name], args.repeat)
+        results[name] = result
+        top = ", ".join(f"{m['module']} {m['cumulative_s'] * 1000:.0f}ms" for m in result["heaviest_imports"][:3])
+        print(f"{name:<28} imports {result['import_s'] * 1000:7.1f} ms  wall {result['wall_s'] * 1000:7.1f} ms  [{top}]")
+
+    save_results(results, args.out)
+    if args.compare:
+        return 1 if compare(args.compare, results) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
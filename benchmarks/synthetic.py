@@ -0,0 +1,167 @@
+"""
+Deterministic synthetic inputs for the benchmark suite.
+"""
+
+import random
+import string
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+FILLER_WORDS = [
+    "the", "market", "is", "going", "to", "rip", "calls", "puts", "earnings", "guidance",
+    "bought", "sold", "shares", "today", "tomorrow", "moon", "dip", "buy", "hold", "bag",
+    "great", "terrible", "company", "ceo", "product", "launch", "revenue", "beat", "miss", "yolo"
+]
+
+SUBREDDITS = ["wallstreetbets", "stocks", "investing", "options", "pennystocks"]
+
+
+def _rng(seed: int) -> random.Random:
+    return random.Random(seed)
+
+
+def make_companies(count: int, seed: int = 1) -> List[Dict]:
+    """Company records in the data/sp500.json shape with unique symbols and aliases."""
+    rng = _rng(seed)
+    companies = []
+    symbols = set()
+    while len(companies) < count:
+        symbol = "".join(rng.choice(string.ascii_uppercase) for _ in range(rng.randint(2, 5)))
+        if symbol in symbols:
+            continue
+        symbols.add(symbol)
+        name = f"{symbol.lower()}{rng.choice(['tron', 'corp', 'soft', 'labs', 'works'])}"
+        companies.append({
+            "symbol": symbol,
+            "name": f"{name.title()} Inc.",
+            "aliases": [name, f"{name} inc.", f"{symbol.lower()} brand"]
+        })
+    return companies
+
+
+def make_texts(count: int, length: int, companies: List[Dict], mention_rate: float = 0.3, seed: int = 2) -> List[str]:
+    """Posts of roughly `length` characters; some mention a company alias or a cashtag."""
+    rng = _rng(seed)
+    texts = []
+    for _ in range(count):
+        words = []
+        size = 0
+        while size < length:
+            if companies and rng.random() < mention_rate / 10:
+                company = rng.choice(companies)
+                word = rng.choice([company["aliases"][0], f"${company['symbol']}"])
+            else:
+                word = rng.choice(FILLER_WORDS)
+            words.append(word)
+            size += len(word) + 1
+        texts.append(" ".join(words))
+    return texts
+
+
+def make_lexicon(count: int, seed: int = 8) -> Dict[str, float]:
+    """Domain lexicon terms (made-up words) with valences on VADER's -4..4 scale."""
+    rng = _rng(seed)
+    terms = {}
+    while len(terms) < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        terms[word] = round(rng.uniform(-4, 4), 1)
+    return terms
+
+
+def make_posts(count: int, seed: int = 3) -> List[Dict]:
+    """Reddit post dicts in the RedditScraper.fetch_feed shape."""
+    rng = _rng(seed)
+    now = datetime(2025, 1, 1)
+    posts = []
+    for i in range(count):
+        title = " ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(4, 12)))
+        body = " ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(0, 80)))
+        posts.append({
+            "platform": "Reddit",
+            "guid": f"p{i}",
+            "subreddit": rng.choice(SUBREDDITS),
+            "timestamp": (now + timedelta(minutes=i)).isoformat(),
+            "title": title,
+            "content": f"{title} {body}",
+            "score": rng.randint(0, 500),
+            "comments": rng.randint(0, 50)
+        })
+    return posts
+
+
+def make_signals(count: int, tickers: int = 500, seed: int = 4) -> List[Dict]:
+    """Raw engine signals (pre-aggregation) spread over `tickers` symbols."""
+    rng = _rng(seed)
+    symbols = [f"T{i:04d}" for i in range(tickers)]
+    sources = [f"Reddit: {s}" for s in SUBREDDITS] + ["GoogleTrends", "Weather/Hail"]
+    signals = []
+    for i in range(count):
+        signal = {
+            "ticker": rng.choice(symbols),
+            "source": rng.choice(sources),
+            "raw_text": "synthetic",
+            "sentiment_score": rng.uniform(-1, 1),
+            "timestamp": "2025-01-01T00:00:00"
+        }
+        if i % 7 == 0:
+            signal["crowd_score"] = rng.uniform(-1, 1)
+        signals.append(signal)
+    return signals
+
+
+def make_ledger(count: int, seed: int = 5) -> List[Dict]:
+    """Final ledger records in the save_ledger shape."""
+    rng = _rng(seed)
+    ledger = []
+    for i in range(count):
+        sources = [f"Reddit: {rng.choice(SUBREDDITS)}" for _ in range(rng.randint(1, 10))]
+        strength = len(sources)
+        sentiment_sum = rng.uniform(-strength, strength)
+        ledger.append({
+            "ticker": f"T{i:04d}",
+            "signal_strength": strength,
+            "velocity": rng.randint(-5, 5),
+            "avg_sentiment": sentiment_sum / strength,
+            "blind_spot": rng.random() < 0.5,
+            "analyst_rating": "Neutral",
+            "est_position_shares": rng.randint(0, 100),
+            "sources": sorted(set(sources)),
+            "details": {"count": strength, "sentiment_sum": sentiment_sum, "sources": sources},
+            "current_price": rng.uniform(1, 500),
+            "trend_sentiment": rng.uniform(0, 5),
+            "bullish_search_vol": rng.randint(0, 1000),
+            "bearish_search_vol": rng.randint(0, 1000),
+            "crowd_confirmation": None
+        })
+    return ledger
+
+
+def make_price_matrix(days: int, tickers: int, seed: int = 6):
+    """Random-walk daily closes as a business-day x ticker DataFrame (T0000...)."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, size=(days, tickers))
+    closes = 50 * np.exp(np.cumsum(returns, axis=0))
+    index = pd.bdate_range("2023-01-02", periods=days, name="date")
+    return pd.DataFrame(closes, index=index, columns=[f"T{i:04d}" for i in range(tickers)])
+
+
+def make_snapshots(hours: int, tickers: int, per_run: int, seed: int = 7):
+    """Archive rows (SignalArchive.query shape): `per_run` random tickers every hour."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    rows = hours * per_run
+    scanned_at = pd.Timestamp("2023-01-02", tz="UTC") + pd.to_timedelta(np.repeat(np.arange(hours), per_run), unit="h")
+    return pd.DataFrame({
+        "scanned_at": scanned_at,
+        "ticker": np.array([f"T{i:04d}" for i in range(tickers)])[rng.integers(0, tickers, rows)],
+        "signal_strength": rng.integers(1, 20, rows),
+        "velocity": rng.integers(-5, 6, rows),
+        "avg_sentiment": rng.uniform(-1, 1, rows),
+        "blind_spot": rng.random(rows) < 0.3,
+        "analyst_rating": rng.choice(["High Asymmetry", "Parity", "Neutral", "Unknown"], rows),
+    })
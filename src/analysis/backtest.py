@@ -0,0 +1,277 @@
+"""
+Backtests archived signals against daily closes.
+
+Hourly snapshots from the signal archive are reduced to the last snapshot per
+(day, ticker). Every snapshot picked by the entry rule is bought at that day's
+close (or the next trading day's), sized with RiskManager's formula, and held
+for `hold` trading days. Forward returns, hit rates and the equity curve are
+computed with NumPy fancy indexing over the date x ticker price matrix, so
+there's no per-trade Python loop.
+
+Usage:
+    python -m src.analysis.backtest --start 2026-01-01 --end 2026-06-30 --rule blind_spot
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.risk import RiskManager
+from src.utils.log import get_logger
+
+log = get_logger("backtest")
+
+SNAPSHOT_COLUMNS = ["scanned_at", "ticker", "signal_strength", "velocity", "avg_sentiment",
+                    "blind_spot", "analyst_rating"]
+
+# A column name of a boolean snapshot field, or a function returning a boolean Series
+Rule = Union[str, Callable[[pd.DataFrame], pd.Series], None]
+
+
+class PriceCache:
+    """
+    Daily closes (date x ticker) kept in one Parquet file; missing tickers or
+    days are fetched from yfinance in a single batched download.
+    """
+
+    def __init__(self, path: str = os.path.join("cache", "prices", "daily_close.parquet")):
+        self.path = path
+
+    def load(self) -> pd.DataFrame:
+        if not os.path.exists(self.path):
+            return pd.DataFrame()
+        return pd.read_parquet(self.path)
+
+    def get(self, tickers: Sequence[str], start, end, fetch: bool = True) -> pd.DataFrame:
+        """Closes for `tickers` between start and end (inclusive), one column per ticker."""
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+        cached = self.load()
+
+        if fetch:
+            missing = [t for t in tickers if t not in cached.columns]
+            # Refresh everything if the cache stops before the requested end (up to yesterday)
+            wanted_end = min(end, pd.Timestamp(datetime.now(timezone.utc).date()) - pd.Timedelta(days=1))
+            stale = not cached.empty and cached.index.max() < wanted_end
+            to_fetch = list(tickers) if stale else missing
+            if to_fetch:
+                fresh = self._download(to_fetch, start, end)
+                if not fresh.empty:
+                    cached = fresh.combine_first(cached) if not cached.empty else fresh
+                    self._save(cached)
+
+        if cached.empty:
+            return pd.DataFrame(index=pd.DatetimeIndex([], name="date"), columns=list(tickers), dtype=float)
+        window = cached.loc[(cached.index >= start) & (cached.index <= end)]
+        return window.reindex(columns=list(tickers))
+
+    def _download(self, tickers: List[str], start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        from src.utils import cassette
+        if cassette.is_replay():
+            # yfinance traffic can't be replayed; backtest with whatever is cached
+            return pd.DataFrame()
+        try:
+            import yfinance as yf
+            log.info(f"Downloading daily closes for {len(tickers)} tickers...")
+            data = yf.download(tickers, start=start, end=end + pd.Timedelta(days=1),
+                               auto_adjust=True, progress=False, group_by="column")
+        except Exception as e:
+            log.warning(f"Price download failed: {e}")
+            return pd.DataFrame()
+        if data is None or data.empty:
+            return pd.DataFrame()
+        closes = data["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(tickers[0])
+        closes.index = pd.DatetimeIndex(closes.index).tz_localize(None).normalize()
+        closes.index.name = "date"
+        return closes.astype(float)
+
+    def _save(self, closes: pd.DataFrame):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        closes.sort_index().to_parquet(self.path + ".tmp")
+        os.replace(self.path + ".tmp", self.path)
+
+
+def daily_snapshots(signals: pd.DataFrame) -> pd.DataFrame:
+    """
+    Last snapshot per (UTC day, ticker) from archive rows, with a tz-naive `date` column.
+    """
+    if signals.empty:
+        return signals.assign(date=pd.Series(dtype="datetime64[ns]"))
+    df = signals.sort_values("scanned_at")
+    df = df.assign(date=df["scanned_at"].dt.tz_convert("UTC").dt.tz_localize(None).dt.normalize())
+    return df.drop_duplicates(["date", "ticker"], keep="last").reset_index(drop=True)
+
+
+class Backtester:
+    """
+    Evaluates entry rules over archived signals; see module docstring.
+    """
+
+    def __init__(self, archive=None, prices: Optional[PriceCache] = None, risk: Optional[RiskManager] = None,
+                 horizons: Sequence[int] = (1, 5, 20), hold: int = 5, vol_window: int = 21):
+        if archive is None:
+            from src.utils.archive import SignalArchive
+            archive = SignalArchive()
+        self.archive = archive
+        self.prices = prices or PriceCache()
+        self.risk = risk or RiskManager()
+        self.horizons = tuple(horizons)
+        self.hold = hold
+        self.vol_window = vol_window
+
+    def run(self, start, end, tickers: Optional[Iterable[str]] = None, rule: Rule = "blind_spot",
+            fetch_prices: bool = True) -> Dict[str, Any]:
+        """Loads archived signals and prices for the range and evaluates `rule`."""
+        signals = self.archive.query(tickers, start, end, columns=SNAPSHOT_COLUMNS)
+        snapshots = daily_snapshots(signals)
+        universe = sorted(snapshots["ticker"].unique()) if not snapshots.empty else []
+        # Prices run past `end` so the last snapshots still get forward returns
+        price_end = pd.Timestamp(end) + pd.Timedelta(days=int(max(self.horizons + (self.hold,)) * 1.6) + 5)
+        # ... and start early enough for the volatility window
+        price_start = pd.Timestamp(start) - pd.Timedelta(days=int(self.vol_window * 1.6) + 5)
+        closes = self.prices.get(universe, price_start, price_end, fetch=fetch_prices)
+        return self.evaluate(snapshots, closes, rule)
+
+    def evaluate(self, snapshots: pd.DataFrame, closes: pd.DataFrame, rule: Rule = "blind_spot") -> Dict[str, Any]:
+        """
+        snapshots: daily_snapshots() output. closes: date x ticker close matrix.
+        Returns forward returns / hit rates for the rule, a per-factor breakdown
+        over all snapshots, and the equity curve of the sized trades.
+        """
+        closes = closes.sort_index()
+        P = closes.to_numpy(dtype=float)
+        n_days = len(closes.index)
+
+        # Map each snapshot to its entry row (first trading day on/after the signal) and column
+        rows = closes.index.searchsorted(snapshots["date"].to_numpy(), side="left") if n_days else np.zeros(len(snapshots), int)
+        cols = closes.columns.get_indexer(snapshots["ticker"]) if n_days else np.full(len(snapshots), -1)
+        valid = (cols >= 0) & (rows < n_days)
+        entry = np.full(len(snapshots), np.nan)
+        entry[valid] = P[rows[valid], cols[valid]]
+        valid &= np.isfinite(entry) & (entry > 0)
+
+        frame = snapshots.assign(entry_price=entry)
+        for h in self.horizons:
+            frame[f"fwd_{h}d"] = self._forward(P, rows, cols, valid, h)
+
+        mask = self._rule_mask(frame, rule) & valid
+        trades = frame.loc[mask]
+
+        # Volatility as RiskManager.get_volatility sees it: std of daily returns over ~1 month
+        returns = closes.pct_change(fill_method=None)
+        vol_matrix = returns.rolling(self.vol_window, min_periods=5).std().to_numpy()
+        r, c = rows[mask], cols[mask]
+        vol = vol_matrix[r, c]
+        vol = np.where(np.isfinite(vol), vol, 0.05) # get_volatility's no-data default
+        shares = self.risk.position_shares(vol, P[r, c], trades["velocity"].to_numpy())
+
+        equity = self._equity_curve(closes, P, r, c, shares)
+        drawdown = equity / equity.cummax() - 1 if len(equity) else equity
+
+        return {
+            "snapshots": int(len(frame)),
+            "priced_snapshots": int(valid.sum()),
+            "trades": int(len(trades)),
+            "rule": rule if isinstance(rule, str) or rule is None else getattr(rule, "__name__", "custom"),
+            "forward_returns": self._return_stats(trades),
+            "factors": self.factor_breakdown(frame.loc[valid]),
+            "total_pnl": float(equity.iloc[-1] - self.risk.risk_bucket) if len(equity) else 0.0,
+            "max_drawdown": float(drawdown.min()) if len(drawdown) else 0.0,
+            "equity": equity,
+        }
+
+    @staticmethod
+    def _forward(P: np.ndarray, rows: np.ndarray, cols: np.ndarray, valid: np.ndarray, h: int) -> np.ndarray:
+        out = np.full(len(rows), np.nan)
+        ok = valid & (rows + h < len(P))
+        out[ok] = P[rows[ok] + h, cols[ok]] / P[rows[ok], cols[ok]] - 1
+        return out
+
+    @staticmethod
+    def _rule_mask(frame: pd.DataFrame, rule: Rule) -> np.ndarray:
+        if rule is None:
+            return np.ones(len(frame), dtype=bool)
+        if callable(rule):
+            return np.asarray(rule(frame), dtype=bool)
+        return frame[rule].fillna(False).astype(bool).to_numpy()
+
+    def _equity_curve(self, closes: pd.DataFrame, P: np.ndarray, r: np.ndarray, c: np.ndarray,
+                      shares: np.ndarray) -> pd.Series:
+        """Marks every trade to market each day it's held; overlapping trades stack."""
+        pnl = np.zeros(len(closes.index))
+        for k in range(1, self.hold + 1):
+            held = r + k < len(P)
+            step = shares[held] * (P[r[held] + k, c[held]] - P[r[held] + k - 1, c[held]])
+            np.add.at(pnl, r[held] + k, np.nan_to_num(step))
+        return pd.Series(self.risk.risk_bucket + np.cumsum(pnl), index=closes.index, name="equity")
+
+    def _return_stats(self, frame: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        stats = {}
+        for h in self.horizons:
+            fwd = frame[f"fwd_{h}d"].dropna()
+            stats[f"{h}d"] = {
+                "count": int(len(fwd)),
+                "mean": float(fwd.mean()) if len(fwd) else 0.0,
+                "median": float(fwd.median()) if len(fwd) else 0.0,
+                "hit_rate": float((fwd > 0).mean()) if len(fwd) else 0.0,
+            }
+        return stats
+
+    def factor_breakdown(self, frame: pd.DataFrame) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Mean forward return and hit rate per bucket of blind_spot, velocity sign and analyst_rating.
+        """
+        buckets = {
+            "blind_spot": frame["blind_spot"].fillna(False).astype(bool).map({True: "yes", False: "no"}),
+            "velocity": pd.Series(np.sign(frame["velocity"].fillna(0)), index=frame.index)
+                          .map({1: "rising", 0: "flat", -1: "falling"}),
+            "analyst_rating": frame["analyst_rating"].fillna("Unknown").astype(str),
+        }
+        fwd_cols = [f"fwd_{h}d" for h in self.horizons]
+        out = {}
+        for factor, labels in buckets.items():
+            grouped = frame[fwd_cols].groupby(labels)
+            means = grouped.mean()
+            hits = frame[fwd_cols].gt(0).astype(float).where(frame[fwd_cols].notna()).groupby(labels).mean()
+            counts = grouped.size()
+            out[factor] = {
+                str(label): {
+                    "count": int(counts[label]),
+                    **{f"mean_{col[4:]}": float(means.at[label, col]) for col in fwd_cols},
+                    **{f"hit_rate_{col[4:]}": float(hits.at[label, col]) for col in fwd_cols},
+                }
+                for label in counts.index
+            }
+        return out
+
+
+def main(argv=None) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Backtest archived signals")
+    parser.add_argument("--start", default=(datetime.now(timezone.utc) - timedelta(days=90)).date().isoformat())
+    parser.add_argument("--end", default=datetime.now(timezone.utc).date().isoformat())
+    parser.add_argument("--tickers", help="comma separated (default: everything archived)")
+    parser.add_argument("--rule", default="blind_spot", help="boolean snapshot column to enter on, or 'all'")
+    parser.add_argument("--hold", type=int, default=5, help="trading days each position is held")
+    parser.add_argument("--no-fetch", action="store_true", help="only use cached prices")
+    args = parser.parse_args(argv)
+
+    tickers = [t.strip() for t in args.tickers.split(",")] if args.tickers else None
+    result = Backtester(hold=args.hold).run(
+        args.start, args.end, tickers=tickers,
+        rule=None if args.rule == "all" else args.rule,
+        fetch_prices=not args.no_fetch
+    )
+    result.pop("equity")
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
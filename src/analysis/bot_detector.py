@@ -12,8 +12,9 @@ class BotDetector:
         "giveaway", "telegram", "whatsapp", "pump", "discord"
     ]
     
-    def __init__(self):
-        self.sentiment = SentimentEngine()
+    def __init__(self, sentiment: SentimentEngine = None):
+        # The engine passes its own, so comment scores share the cache and domain lexicon
+        self.sentiment = sentiment or SentimentEngine()
 
     def is_bot(self, post: Dict[str, Any]) -> bool:
         """
@@ -48,22 +49,31 @@ class BotDetector:
         Positive means comments agree with Bullish thesis (or are generally positive).
         Negative means comments are calling it out (Bearish).
         """
-        if not comments:
-            return 0.0
-            
-        total_score = 0
-        count = 0
-        
-        for comment in comments:
-            # Skip very short comments like "Nice" or "Lol"
-            if len(comment) < 10:
-                continue
-                
-            score = self.sentiment.analyze(comment)
-            total_score += score['compound']
-            count += 1
-            
-        if count == 0:
-            return 0.0
-            
-        return total_score / count
+        return self.verify_comments_batch({"_": comments}).get("_", 0.0)
+
+    def verify_comments_batch(self, comment_map: Dict[str, List[str]]) -> Dict[str, float]:
+        """
+        Batched version of verify_comments.
+        Takes {post_key: [comments]} and scores every comment in one sentiment pass.
+        Returns {post_key: confirmation_score}.
+        """
+        keys = []
+        texts = []
+        for key, comments in comment_map.items():
+            for comment in comments or []:
+                # Skip very short comments like "Nice" or "Lol"
+                if len(comment) < 10:
+                    continue
+                keys.append(key)
+                texts.append(comment)
+
+        totals: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        for key, score in zip(keys, self.sentiment.score_batch(texts)):
+            totals[key] = totals.get(key, 0.0) + score
+            counts[key] = counts.get(key, 0) + 1
+
+        return {
+            key: (totals[key] / counts[key]) if counts.get(key) else 0.0
+            for key in comment_map
+        }
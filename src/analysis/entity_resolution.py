@@ -1,28 +1,123 @@
 import json
 import re
-from typing import Optional, Dict, List
+from collections import Counter
+from typing import Optional, Dict, Iterable, List, Tuple
 import os
 
+# $AAPL, $brk.b
+CASHTAG_RE = re.compile(r'\$([A-Za-z]{1,5}(?:\.[A-Za-z])?)\b')
+# Words of lowercased text; a leading $ marks a cashtag
+TOKEN_RE = re.compile(r'\$?[a-z0-9]+')
+
+# Aliases that are also everyday words: they only count with finance context around them
+AMBIGUOUS_ALIASES = frozenset({
+    "apple", "amazon", "meta", "visa", "target", "block", "oracle", "shell", "gap", "ball", "coach",
+    "chase", "delta", "discover", "progressive", "match", "snap", "zoom", "dow", "lulu", "hers",
+    "crocs", "nasdaq", "google", "uber", "ebay", "cisco", "intel", "nike", "ford", "general",
+})
+# Co-occurring words that make an ambiguous alias likely to mean the company
+FINANCE_TERMS = frozenset({
+    "stock", "stocks", "share", "shares", "shareholder", "shareholders", "ticker", "price", "earnings",
+    "eps", "revenue", "guidance", "dividend", "buyback", "valuation", "market", "cap", "ipo",
+    "calls", "puts", "options", "strike", "bullish", "bearish", "long", "short", "buy", "sell",
+    "position", "portfolio", "invest", "investing", "investor", "investors", "analyst", "analysts",
+    "upgrade", "downgrade", "quarter", "q1", "q2", "q3", "q4", "ceo", "nyse", "rally", "dip",
+    "yolo", "tendies", "bagholder", "bagholders",
+})
+
 class EntityResolver:
     """
     Maps text to financial tickers using a local JSON database.
     """
     
     DB_PATH = os.path.join("data", "companies.json")
+    UNIVERSE_PATH = os.path.join("data", "universe.json")
 
-    def __init__(self):
-        self.companies = self._load_db()
+    # Confidence of an ambiguous alias with no finance term in its window, and what each term adds
+    AMBIGUOUS_PRIOR = 0.25
+    CONTEXT_WEIGHT = 0.25
+
+    def __init__(self, companies: Optional[List[Dict]] = None, cashtag_allow: Iterable[str] = (),
+                 cashtag_deny: Iterable[str] = (), listings_path: Optional[str] = None,
+                 ambiguous_aliases: Iterable[str] = (), context_window: int = 8,
+                 min_confidence: float = 0.5):
+        # Content hash of the universe build (src.utils.populate_db); None for other sources
+        self.version: Optional[str] = None
+        # `companies` overrides the on-disk DB (benchmarks, tests)
+        self.companies = companies if companies is not None else self._load_db()
         # Build inverted index for fast lookup: alias -> ticker
         self.alias_map = self._build_alias_map()
+        # Aliases matched as token sequences, grouped by first token: one dict lookup per word of text
+        self.ambiguous_aliases = AMBIGUOUS_ALIASES | {a.lower() for a in ambiguous_aliases}
+        self.alias_index = self._build_alias_index()
+        self.context_window = context_window
+        self.min_confidence = min_confidence
+        # Alias matches dropped for lack of context, per ticker
+        self.dropped_aliases: Counter = Counter()
+        # Cashtags only count if they're a known symbol (DB + exchange listing) or allow-listed,
+        # and only once a full exchange listing is loaded; see is_valid_cashtag
+        self.cashtag_allow = frozenset(t.upper() for t in cashtag_allow)
+        self.cashtag_deny = frozenset(t.upper() for t in cashtag_deny)
+        listed, self.listing_complete = self._load_listings(listings_path)
+        self.known_tickers = frozenset(
+            {str(c["symbol"]).upper() for c in self.companies if c.get("symbol")} | listed
+        )
+        self.rejected_cashtags: Counter = Counter()
+
+    @staticmethod
+    def _load_listings(path: Optional[str]) -> Tuple[set, bool]:
+        """
+        Broader universe of valid symbols: one per line, '#' comments allowed.
+        Returns (symbols, complete). A file built by src.utils.populate_db says in its
+        "# universe <version> exchanges=..." header whether the Nasdaq/NYSE directories
+        went in; without them it only holds the S&P 500 and isn't complete. Any other
+        listing file is taken as complete. A missing file means no listing.
+        """
+        if not path or not os.path.exists(path):
+            return set(), False
+        symbols = set()
+        complete = True
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith("# universe"):
+                    exchanges = dict(
+                        field.split("=", 1) for field in line[1:].split() if "=" in field
+                    ).get("exchanges", "none")
+                    complete = exchanges != "none"
+                    continue
+                symbol = line.split("#", 1)[0].strip().upper()
+                if symbol:
+                    symbols.add(symbol)
+        return symbols, complete and bool(symbols)
+
+    def is_valid_cashtag(self, symbol: str) -> bool:
+        symbol = symbol.upper()
+        if symbol in self.cashtag_deny:
+            return False
+        if symbol in self.cashtag_allow or symbol in self.known_tickers:
+            return True
+        # Without a full exchange listing (just the S&P 500 / curated DB) an unknown symbol is
+        # more likely a small cap ($GME, $AMC) than slang, so anything shaped like a ticker counts
+        return not self.listing_complete
 
     def _load_db(self) -> List[Dict]:
-        # Priority 1: S&P 500 full list
+        # Priority 1: merged universe (S&P 500 + curated aliases), built by src.utils.populate_db
+        if os.path.exists(self.UNIVERSE_PATH):
+            try:
+                with open(self.UNIVERSE_PATH, 'r', encoding='utf-8') as f:
+                    universe = json.load(f)
+                self.version = universe.get("version")
+                return universe["companies"]
+            except Exception as e:
+                print(f"Error loading {self.UNIVERSE_PATH}: {e}")
+
+        # Priority 2: S&P 500 full list
         sp500_path = os.path.join("data", "sp500.json")
         if os.path.exists(sp500_path):
             with open(sp500_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
 
-        # Priority 2: Manual list
+        # Priority 3: Manual list
         if not os.path.exists(self.DB_PATH):
             print(f"Warning: {self.DB_PATH} not found. Returning empty DB.")
             return []
@@ -55,32 +150,85 @@ class EntityResolver:
                 
         return mapping
 
-    def resolve(self, text: str) -> List[str]:
+    def _build_alias_index(self) -> Dict[str, List[Tuple[Tuple[str, ...], str, bool]]]:
         """
-        Finds mentioned tickers in the text.
-        Returns a list of unique tickers found.
+        first token -> [(alias tokens, ticker, ambiguous)], longest alias first.
+        Aliases are tokenized like the text, so "apple inc." also matches "Apple Inc" and
+        stray punctuation in the DB ("block,") doesn't matter.
         """
-        text_lower = text.lower()
-        found_tickers = set()
+        index: Dict[str, List[Tuple[Tuple[str, ...], str, bool]]] = {}
+        for alias, ticker in self.alias_map.items():
+            tokens = tuple(TOKEN_RE.findall(alias.replace("$", "")))
+            if not tokens:
+                continue
+            ambiguous = len(tokens) == 1 and (tokens[0] in self.ambiguous_aliases or len(tokens[0]) <= 2)
+            index.setdefault(tokens[0], []).append((tokens, ticker, ambiguous))
+        for candidates in index.values():
+            candidates.sort(key=lambda c: len(c[0]), reverse=True)
+        return index
+
+    def score(self, text: str) -> Dict[str, float]:
+        """
+        Mentioned tickers with a confidence in [0, 1], in one pass over the words of the text.
+
+        Cashtags and unambiguous aliases score 1. An ambiguous alias ("apple", "visa") starts at
+        AMBIGUOUS_PRIOR and gains CONTEXT_WEIGHT per finance term or cashtag within
+        `context_window` words of it; a cashtag of the same ticker anywhere confirms it.
+        """
+        scores: Dict[str, float] = {}
         
         # 1. Direct Ticker search via Regex ($TICKER)
         # Note: This is simplistic. $AAPL is clear, but just AAPL might be noise if not careful.
         # We stick to $TICKER format or explicit name matching for this version.
-        ticker_matches = re.findall(r'\$([A-Za-z]{1,5})', text)
-        for t in ticker_matches:
-            # Verify it's a known ticker if possible, or just accept it as a potential signal
-            found_tickers.add(t.upper())
-
-        # 2. Alias/Name search
-        # This is O(N*M) where N is text words and M is aliases.
-        # Optimized approach: Check if alias strings exist in text.
-        for alias, ticker in self.alias_map.items():
-            # word boundary check to avoid substring matches (e.g. "for" in "Ford")
-            # Simple regex for the alias
-            if re.search(r'\b' + re.escape(alias) + r'\b', text_lower):
-                found_tickers.add(ticker)
+        for t in CASHTAG_RE.findall(text):
+            # Only known symbols: "$HUGE" or "$USD" would otherwise cost a full round of enrichment lookups
+            if self.is_valid_cashtag(t):
+                scores[t.upper()] = 1.0
+            else:
+                self.rejected_cashtags[t.upper()] += 1
+
+        # 2. Alias/Name search: longest alias starting at each word, whole words only
+        # (so "for" never matches inside "Ford"). Finance terms are counted on the way.
+        tokens = TOKEN_RE.findall(text.lower())
+        context_seen = [0]  # context_seen[i]: finance terms/cashtags among tokens[:i]
+        ambiguous_matches = []
+        skip_until = 0
+        for i, token in enumerate(tokens):
+            context_seen.append(context_seen[-1] + (token in FINANCE_TERMS or token[0] == "$"))
+            if i < skip_until:
+                continue
+            for alias_tokens, ticker, ambiguous in self.alias_index.get(token, ()):
+                n = len(alias_tokens)
+                if n > 1 and tuple(tokens[i:i + n]) != alias_tokens:
+                    continue
+                if ambiguous:
+                    ambiguous_matches.append((i, i + n, ticker))
+                else:
+                    scores[ticker] = 1.0
+                skip_until = i + n
+                break
 
-        return list(found_tickers)
+        for start, end, ticker in ambiguous_matches:
+            if scores.get(ticker) == 1.0:
+                continue
+            terms = context_seen[min(len(tokens), end + self.context_window)] - context_seen[max(0, start - self.context_window)]
+            confidence = min(1.0, self.AMBIGUOUS_PRIOR + self.CONTEXT_WEIGHT * terms)
+            scores[ticker] = max(scores.get(ticker, 0.0), confidence)
+        return scores
+
+    def resolve(self, text: str) -> List[str]:
+        """
+        Finds mentioned tickers in the text.
+        Returns a list of unique tickers found with at least `min_confidence`.
+        """
+        found_tickers = []
+        for ticker, confidence in self.score(text).items():
+            if confidence >= self.min_confidence:
+                found_tickers.append(ticker)
+            else:
+                # Every ticker kept here costs a round of price/analyst/volatility lookups
+                self.dropped_aliases[ticker] += 1
+        return found_tickers
 
 if __name__ == "__main__":
     # Create dummy DB for testing if not exists
@@ -0,0 +1,143 @@
+"""
+Domain lexicons layered over VADER's stock lexicon.
+
+A domain lexicon is a TSV file (`term<TAB>valence`, '#' comments) such as
+data/lexicons/finance.tsv. Words are merged into VADER's word -> valence dict,
+overriding its score for the same word. Single-character emoji can't be looked
+up directly: VADER replaces each emoji with its description before
+tokenizing. So the emoji gets a one-word description ("emoji1f680") and that
+word gets the valence.
+
+The merged tables are plain dicts, so polarity_scores costs the same whether
+the lexicon holds 7.5k or 20k words. The compiled result is cached as JSON
+under a key that covers the VADER release and the contents of every domain
+file. Later runs load it instead of parsing VADER's text lexicons and merging
+again.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from src.utils.log import get_logger
+
+log = get_logger("lexicon")
+
+# Bump when the merge rules change
+COMPILER_VERSION = 1
+
+
+def vader_version() -> str:
+    try:
+        from importlib.metadata import version
+        return version("vaderSentiment")
+    except Exception:
+        return "unknown"
+
+
+def read_terms(path: str) -> Dict[str, float]:
+    """term -> valence from a domain lexicon file. Terms are lowercased."""
+    terms = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            parts = line.split("\t")
+            try:
+                terms[parts[0].strip().lower()] = float(parts[1])
+            except (IndexError, ValueError):
+                log.warning(f"{path}:{line_no}: expected 'term<TAB>valence', got {line!r}")
+    return terms
+
+
+def _is_emoji(term: str) -> bool:
+    return len(term) == 1 and not term.isalnum()
+
+
+def emoji_word(emoji: str) -> str:
+    """The single word an emoji is rewritten to, so its valence is found in the word lexicon."""
+    return f"emoji{ord(emoji):x}"
+
+
+def compile_key(paths: Iterable[str]) -> str:
+    digest = hashlib.sha1(f"{COMPILER_VERSION}:{vader_version()}".encode("utf-8"))
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha1(f.read()).digest())
+    return digest.hexdigest()[:16]
+
+
+class CompiledLexicon:
+    """
+    VADER's word and emoji tables with the domain terms merged in.
+    """
+
+    def __init__(self, lexicon: Dict[str, float], emojis: Dict[str, str], key: str):
+        self.lexicon = lexicon
+        self.emojis = emojis
+        self.key = key
+        # Set by load_lexicon when the tables came from its on-disk cache
+        self.from_cache = False
+
+    @classmethod
+    def compile(cls, paths: Iterable[str], key: Optional[str] = None) -> "CompiledLexicon":
+        paths = list(paths)
+        stock = SentimentIntensityAnalyzer()
+        lexicon, emojis = dict(stock.lexicon), dict(stock.emojis)
+        for path in paths:
+            for term, valence in read_terms(path).items():
+                if _is_emoji(term):
+                    emojis[term] = emoji_word(term)
+                    lexicon[emoji_word(term)] = valence
+                else:
+                    lexicon[term] = valence
+        return cls(lexicon, emojis, key or compile_key(paths))
+
+    def analyzer(self) -> SentimentIntensityAnalyzer:
+        """An analyzer using these tables, without re-reading VADER's lexicon files."""
+        analyzer = SentimentIntensityAnalyzer.__new__(SentimentIntensityAnalyzer)
+        analyzer.lexicon = self.lexicon
+        analyzer.emojis = self.emojis
+        return analyzer
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, "lexicon": self.lexicon, "emojis": self.emojis}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledLexicon":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["lexicon"], data["emojis"], data["key"])
+
+
+def load_lexicon(paths: Iterable[str], cache_dir: Optional[str] = None) -> CompiledLexicon:
+    """
+    Stock VADER plus the domain lexicons in `paths` (later files win).
+    With `cache_dir`, the compiled tables are reused until VADER or a domain file changes.
+    """
+    paths = list(paths)
+    key = compile_key(paths)
+    cached = os.path.join(cache_dir, f"lexicon-{key}.json") if cache_dir else None
+    if cached and os.path.exists(cached):
+        try:
+            compiled = CompiledLexicon.load(cached)
+            compiled.from_cache = True
+            return compiled
+        except (OSError, ValueError, KeyError) as e:
+            log.warning(f"Ignoring unreadable compiled lexicon {cached}: {e}")
+
+    compiled = CompiledLexicon.compile(paths, key=key)
+    if cached:
+        try:
+            compiled.save(cached)
+        except OSError as e:
+            log.warning(f"Could not cache compiled lexicon: {e}")
+    return compiled
@@ -1,5 +1,4 @@
-import yfinance as yf
-import numpy as np
+from src.utils import cassette
 
 class RiskManager:
     """
@@ -14,35 +13,49 @@ class RiskManager:
         """
         Fetches historical volatility (std dev of returns).
         """
+        print(f"Fetching volatility for {ticker}...")
+        # Use specific period volatility (e.g. 30 day) not annualized if intended timeframe is short?
+        # Prompt says: "Ticker_Volatility (30-day Std Dev)"
+        # "Ticker_Volatility (30-day Std Dev) = 4%." -> suggesting period specific.
+        # So this is the std dev of the daily returns over the last month.
+        return float(self._volatilities(self.get_returns([ticker], period), [ticker])[0])
+
+    def get_returns(self, tickers: list, period: str = "1mo"):
+        """
+        Daily returns (date x ticker) for all tickers from one batched yfinance download.
+        Tickers without data are all-NaN columns; the frame is empty if the download fails.
+        """
+        # Imported here so the engine doesn't load yfinance/pandas until a volatility lookup
+        import pandas as pd
+
+        tickers = list(tickers)
+        if cassette.is_replay():
+            # yfinance traffic can't be replayed; callers fall back to the no-data default
+            return pd.DataFrame(columns=tickers, dtype=float)
+
+        import yfinance as yf
         try:
-            print(f"Fetching volatility for {ticker}...")
-            # We use yfinance to get history
-            # Ticker object might be slow, optimize if needed
-            stock = yf.Ticker(ticker)
-            hist = stock.history(period=period)
-            
-            if hist.empty:
-                return 0.05 # Default assume 5% vol if no data
-                
-            # Calculate daily returns
-            hist['pct_change'] = hist['Close'].pct_change()
-            vol = hist['pct_change'].std() * np.sqrt(252) # Annualized Volatility
-            
-            # Use specific period volatility (e.g. 30 day) not annualized if intended timeframe is short?
-            # Prompt says: "Ticker_Volatility (30-day Std Dev)" 
-            # We will use the raw std dev across the period for sizing or annualized?
-            # "Ticker_Volatility (30-day Std Dev) = 4%." -> suggesting period specific.
-            # Let's return the std dev of the daily returns over the last month.
-            
-            period_vol = hist['pct_change'].std()
-            if np.isnan(period_vol):
-                return 0.05
-                
-            return period_vol
-            
+            data = yf.download(tickers, period=period, auto_adjust=True, progress=False, group_by="column")
         except Exception as e:
-            print(f"Error fetching volatility for {ticker}: {e}")
-            return 0.05 # Default fallback
+            print(f"Error fetching returns for {', '.join(tickers)}: {e}")
+            return pd.DataFrame(columns=tickers, dtype=float)
+        if data is None or data.empty:
+            return pd.DataFrame(columns=tickers, dtype=float)
+
+        closes = data["Close"]
+        if isinstance(closes, pd.Series):
+            closes = closes.to_frame(tickers[0])
+        return closes.reindex(columns=tickers).astype(float).pct_change(fill_method=None)
+
+    @staticmethod
+    def _volatilities(returns, tickers: list):
+        import numpy as np
+
+        vols = np.full(len(tickers), 0.05) # Default assume 5% vol if no data
+        if returns.empty:
+            return vols
+        std = returns.reindex(columns=tickers).std().to_numpy(dtype=float)
+        return np.where(np.isnan(std), 0.05, std)
 
     def calculate_position_size(self, ticker: str, price: float, velocity: int = 0) -> int:
         """
@@ -54,29 +67,126 @@ class RiskManager:
         - If Velocity < 0 (Decelerating), reduce Target Risk by 50%.
         """
         vol = self.get_volatility(ticker)
-        if vol == 0: 
-            vol = 0.01 
-            
+        return int(self.position_shares(vol, price, velocity))
+
+    def position_value(self, vol, velocity):
+        """
+        Dollar position from the sizing formula, element-wise on NumPy arrays
+        (e.g. a date x ticker matrix in a backtest) as well as on scalars.
+        """
+        import numpy as np
+
+        vol = np.where(np.asarray(vol, dtype=float) == 0, 0.01, vol)
+        velocity = np.asarray(velocity)
+
         # Adjust risk based on velocity
-        adjusted_risk = self.target_risk
-        if velocity > 0:
-            adjusted_risk *= 1.5
-        elif velocity < 0:
-            adjusted_risk *= 0.5
-            
+        adjusted_risk = self.target_risk * np.where(velocity > 0, 1.5, np.where(velocity < 0, 0.5, 1.0))
+
         position_value = self.risk_bucket * (adjusted_risk / vol)
-        
+
         # Cap position size at 10% of bucket (or 15% if high velocity high conviction)
-        max_cap = 0.10
-        if velocity > 2:
-            max_cap = 0.15
-            
-        max_position = self.risk_bucket * max_cap
-        if position_value > max_position:
-            position_value = max_position
-            
-        shares = int(position_value / price)
-        return shares
+        max_cap = np.where(velocity > 2, 0.15, 0.10)
+        return np.minimum(position_value, self.risk_bucket * max_cap)
+
+    def position_shares(self, vol, price, velocity):
+        """position_value in whole shares."""
+        import numpy as np
+        return np.trunc(self.position_value(vol, velocity) / price)
+
+    def size_portfolio(self, candidates: list, max_gross: float = 1.0, period: str = "1mo") -> dict:
+        """
+        Sizes all candidates together: [{"ticker", "price", "velocity"}] -> {ticker: shares}.
+
+        One returns download covers every name. Each position starts at its
+        calculate_position_size value (same per-name caps), is scaled down by
+        how much risk it shares with the rest of the book (k perfectly
+        correlated names get 1/sqrt(k) each, an uncorrelated name keeps its
+        size), and the total is capped at max_gross * risk bucket. A single
+        ticker gets the same shares as calculate_position_size.
+        """
+        import numpy as np
+
+        if not candidates:
+            return {}
+        tickers = [c["ticker"] for c in candidates]
+        prices = np.array([c["price"] for c in candidates], dtype=float)
+        velocity = np.array([c.get("velocity", 0) for c in candidates])
+
+        returns = self.get_returns(tickers, period)
+        vols = self._volatilities(returns, tickers)
+        values = self.position_value(vols, velocity)
+
+        scales = self.correlation_scales(values, vols, returns.reindex(columns=tickers).to_numpy(dtype=float))
+        values = values * scales
+        gross = values.sum()
+        if gross > self.risk_bucket * max_gross:
+            values = values * (self.risk_bucket * max_gross / gross)
+        if scales.min() < 1 or gross > self.risk_bucket * max_gross:
+            print(f"Portfolio sizing: min correlation scale {scales.min():.2f}, gross ${values.sum():,.0f} across {len(tickers)} names")
+
+        shares = np.trunc(values / prices)
+        return dict(zip(tickers, shares.astype(int).tolist()))
+
+    @staticmethod
+    def correlation_scales(values, vols, returns):
+        """
+        Per-name factors (<= 1): sqrt(r_i / (C r)_i), where r is each position's dollar
+        risk and C the shrunk correlation matrix. (C r)_i is the risk of the book
+        that moves with name i; it equals r_i when i is uncorrelated with the rest.
+        """
+        import numpy as np
+
+        values = np.asarray(values, dtype=float)
+        if len(values) < 2:
+            return np.ones(len(values))
+        corr = RiskManager.shrunk_correlation(returns)
+        risk = values * vols
+        shared = corr @ risk
+        scales = np.ones(len(values))
+        # Tolerance so rounding alone never shaves a share off; hedged names keep full size
+        crowded = (risk > 0) & (shared > risk * (1 + 1e-9))
+        scales[crowded] = np.sqrt(risk[crowded] / shared[crowded])
+        return scales
+
+    @staticmethod
+    def shrunk_correlation(returns):
+        """
+        Correlation matrix of the return columns, shrunk towards the identity with
+        the Schafer-Strimmer (Ledoit-Wolf style) optimal intensity. Needs 5+ complete
+        rows; columns without enough data are treated as uncorrelated.
+        """
+        import numpy as np
+
+        returns = np.asarray(returns, dtype=float)
+        p = returns.shape[1] if returns.ndim == 2 else 0
+        corr = np.eye(p)
+        usable = np.flatnonzero((~np.isnan(returns)).sum(axis=0) >= 5) if p else np.array([], int)
+        if len(usable) < 2:
+            return corr
+        X = returns[:, usable]
+        X = X[~np.isnan(X).any(axis=1)]
+        n = len(X)
+        if n < 5:
+            return corr
+
+        X = X - X.mean(axis=0)
+        sd = X.std(axis=0, ddof=1)
+        sd[sd == 0] = 1.0
+        Z = X / sd
+        # With W_k = z_k z_k^T per row: sum_k W_k = Z^T Z and sum_k (W_k - mean W)^2 = (Z^2)^T Z^2 - (Z^T Z)^2 / n,
+        # so the n x p x p stack of W_k is never built
+        cross = Z.T @ Z
+        sample = cross / (n - 1)
+        Z2 = Z * Z
+        var_sample = n / (n - 1) ** 3 * np.maximum(Z2.T @ Z2 - cross * cross / n, 0.0)
+
+        off = ~np.eye(len(usable), dtype=bool)
+        denom = (sample[off] ** 2).sum()
+        intensity = 1.0 if denom == 0 else float(np.clip(var_sample[off].sum() / denom, 0.0, 1.0))
+        shrunk = (1 - intensity) * sample
+        np.fill_diagonal(shrunk, 1.0)
+        corr[np.ix_(usable, usable)] = shrunk
+        return corr
 
 if __name__ == "__main__":
     rm = RiskManager()
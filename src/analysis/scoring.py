@@ -0,0 +1,137 @@
+import json
+import math
+import os
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+
+def _rounded(value: Any) -> Any:
+    # Rounding keeps float noise out of the committed state file
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {k: _rounded(v) for k, v in value.items()}
+    return value
+
+
+class ActivityScorer:
+    """
+    Exponentially decayed mention counts and sentiment per ticker, kept across runs.
+
+    Every ticker stores, for each half-life h (hours), a decayed mention count and
+    sentiment sum plus the time they were last touched. Decay is applied lazily
+    (factor 2^(-elapsed/h)) when the ticker is next seen, so a signal costs O(1)
+    and tickers nobody mentions are never touched.
+
+    For "unusual activity" each ticker also keeps an exponentially weighted mean
+    and second moment of its mentions per run (one run ~ one hourly bucket).
+    The run's count is z-scored against that baseline before being folded in.
+    Runs where the ticker wasn't mentioned count as zeros, applied in one step.
+    """
+
+    def __init__(self, half_lives: Sequence[float] = (6, 24, 168), baseline_half_life: float = 168,
+                 state: Optional[Dict[str, Any]] = None):
+        self.half_lives = [float(h) for h in half_lives]
+        self.baseline_half_life = float(baseline_half_life)
+        # Weight of a new hourly observation in the baseline moments
+        self.alpha = 1 - 0.5 ** (1 / self.baseline_half_life)
+        self.tickers: Dict[str, Dict[str, Any]] = dict((state or {}).get("tickers", {}))
+        self._run: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "ActivityScorer":
+        state = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = None
+        return cls(state=state, **kwargs)
+
+    def _key(self, h: float) -> str:
+        return f"{h:g}h"
+
+    def observe(self, ticker: str, sentiment: float, now: float):
+        """Adds one mention at `now` (epoch seconds)."""
+        entry = self.tickers.get(ticker)
+        if entry is None:
+            entry = self.tickers[ticker] = {
+                "t": now, "count": {}, "sentiment": {}, "base_t": None, "base_mean": 0.0, "base_sq": 0.0
+            }
+        elapsed_h = max(0.0, (now - entry["t"]) / 3600)
+        for h in self.half_lives:
+            key = self._key(h)
+            decay = 0.5 ** (elapsed_h / h)
+            entry["count"][key] = entry["count"].get(key, 0.0) * decay + 1
+            entry["sentiment"][key] = entry["sentiment"].get(key, 0.0) * decay + sentiment
+        entry["t"] = now
+
+        run = self._run.setdefault(ticker, {"mentions": 0})
+        run["mentions"] += 1
+
+    def observe_many(self, signals: Iterable[Dict[str, Any]], now: float):
+        for s in signals:
+            self.observe(s["ticker"], s.get("sentiment_score", 0) or 0, now)
+
+    def finish_run(self, now: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Scores the tickers mentioned since the last finish_run and updates their baselines.
+        Returns {ticker: {"activity_z", "ew_count", "ew_sentiment"}}.
+        """
+        scores = {}
+        for ticker, run in self._run.items():
+            entry = self.tickers[ticker]
+            x = run["mentions"]
+            if entry["base_t"] is not None:
+                # Hourly buckets without mentions since the last update decay the moments towards 0
+                silent = max(0.0, round((now - entry["base_t"]) / 3600) - 1)
+                keep = (1 - self.alpha) ** silent
+                entry["base_mean"] *= keep
+                entry["base_sq"] *= keep
+                mean, sq = entry["base_mean"], entry["base_sq"]
+                # Mention counts are at least Poisson-noisy: never let the spread drop below that
+                sd = math.sqrt(max(sq - mean * mean, mean, 1.0))
+                z = (x - mean) / sd
+                entry["base_mean"] = (1 - self.alpha) * mean + self.alpha * x
+                entry["base_sq"] = (1 - self.alpha) * sq + self.alpha * x * x
+            else:
+                # First sighting: no baseline to compare against yet
+                z = 0.0
+                entry["base_mean"] = float(x)
+                entry["base_sq"] = float(x * x)
+            entry["base_t"] = now
+
+            scores[ticker] = {
+                "activity_z": round(z, 3),
+                "ew_count": {k: round(v, 3) for k, v in entry["count"].items()},
+                "ew_sentiment": {
+                    k: round(entry["sentiment"][k] / v, 4) if v else 0.0 for k, v in entry["count"].items()
+                },
+            }
+        self._run = {}
+        return scores
+
+    def prune(self, now: float, min_count: float = 0.01):
+        """Forgets tickers whose longest-half-life count has decayed below `min_count`."""
+        longest = self._key(max(self.half_lives))
+        for ticker in list(self.tickers):
+            entry = self.tickers[ticker]
+            decayed = entry["count"].get(longest, 0.0) * 0.5 ** (max(0.0, now - entry["t"]) / 3600 / max(self.half_lives))
+            if decayed < min_count:
+                del self.tickers[ticker]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"half_lives": self.half_lives, "baseline_half_life": self.baseline_half_life, "tickers": self.tickers}
+
+    def save(self, path: str):
+        """One ticker per line, so the hourly data/ commit only shows tickers that moved."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write('{"half_lives":%s,"baseline_half_life":%s,"tickers":{' % (
+                json.dumps(self.half_lives, separators=(",", ":")), json.dumps(self.baseline_half_life)))
+            for i, ticker in enumerate(sorted(self.tickers)):
+                entry = _rounded(self.tickers[ticker])
+                f.write(("\n" if i == 0 else ",\n") + json.dumps(ticker) + ":" + json.dumps(entry, separators=(",", ":")))
+            f.write("\n}}\n")
+        os.replace(tmp, path)
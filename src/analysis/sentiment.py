@@ -1,14 +1,67 @@
+import hashlib
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional
 
 class SentimentEngine:
     """
     Wrapper for VADER Sentiment Analysis.
     Optimized for social media text (emojis, slang).
+    With `cache_path`, scores are kept in a persistent SentimentCache so text
+    seen in an earlier run isn't scored again.
     """
     
-    def __init__(self):
-        self.analyzer = SentimentIntensityAnalyzer()
+    def __init__(self, cache_path: Optional[str] = None, cache_size: int = 200_000,
+                 lexicon_files: Iterable[str] = (), lexicon_cache_dir: Optional[str] = None):
+        # Domain lexicons (data/lexicons/*.tsv) are merged over stock VADER; see src.analysis.lexicon
+        self._lexicon_key = None
+        # "cached" / "compiled" when domain lexicons were loaded, for the run report
+        self.lexicon_source = None
+        # Texts scored by VADER vs answered from the cache, since construction
+        self.scored = 0
+        self.cache_hits = 0
+        lexicon_files = list(lexicon_files)
+        if lexicon_files:
+            from src.analysis.lexicon import load_lexicon
+            compiled = load_lexicon(lexicon_files, cache_dir=lexicon_cache_dir)
+            self.analyzer = compiled.analyzer()
+            self._lexicon_key = compiled.key
+            self.lexicon_source = "cached" if compiled.from_cache else "compiled"
+        else:
+            self.analyzer = SentimentIntensityAnalyzer()
+        self.cache = None
+        if cache_path:
+            from src.utils.sentiment_cache import SentimentCache
+            self.cache = SentimentCache(cache_path, self.lexicon_version(), max_entries=cache_size)
+
+    def lexicon_version(self) -> str:
+        """Identifies the scoring behaviour: VADER release plus a hash of the loaded lexicons."""
+        from src.analysis.lexicon import vader_version
+        if self._lexicon_key:
+            # Already covers the VADER release and every domain file
+            return f"vader-{vader_version()}-{self._lexicon_key}"
+        digest = hashlib.sha1()
+        for lexicon in (self.analyzer.lexicon, self.analyzer.emojis):
+            digest.update(repr(sorted(lexicon.items())).encode("utf-8"))
+        return f"vader-{vader_version()}-{digest.hexdigest()[:12]}"
+
+    def _polarity(self, text: str) -> Dict[str, float]:
+        if self.cache is None:
+            self.scored += 1
+            return self.analyzer.polarity_scores(text)
+        key = self.cache.key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return dict(zip(("neg", "neu", "pos", "compound"), cached))
+        self.scored += 1
+        scores = self.analyzer.polarity_scores(text)
+        self.cache.put(key, (scores["neg"], scores["neu"], scores["pos"], scores["compound"]))
+        return scores
+
+    def flush(self):
+        """Persists scores computed since the last flush (no-op without a cache)."""
+        if self.cache is not None:
+            self.cache.flush()
 
     def analyze(self, text: str) -> Dict[str, float]:
         """
@@ -18,9 +71,21 @@ class SentimentEngine:
         if not text:
             return {"compound": 0.0, "pos": 0.0, "neu": 0.0, "neg": 0.0}
             
-        scores = self.analyzer.polarity_scores(text)
+        scores = self._polarity(text)
         return scores
 
+    def score_batch(self, texts: List[str]) -> List[float]:
+        """
+        Returns the compound score for each text, in order.
+        Duplicate texts (reposts, copy-pasta comments) are only scored once.
+        """
+        unique_scores: Dict[str, float] = {}
+        polarity = self._polarity
+        for text in texts:
+            if text and text not in unique_scores:
+                unique_scores[text] = polarity(text)['compound']
+        return [unique_scores.get(text, 0.0) for text in texts]
+
     def analyze_batch(self, texts: list) -> float:
         """
         Returns average compound score for a list of texts.
@@ -28,12 +93,7 @@ class SentimentEngine:
         if not texts:
             return 0.0
             
-        total_compound = 0.0
-        for text in texts:
-            scores = self.analyze(text)
-            total_compound += scores['compound']
-            
-        return total_compound / len(texts)
+        return sum(self.score_batch(texts)) / len(texts)
 
 if __name__ == "__main__":
     engine = SentimentEngine()
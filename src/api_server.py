@@ -0,0 +1,444 @@
+"""
+Local HTTP API over the latest signals, so downstream scripts don't each
+re-parse data/current_signals.json.
+
+The ledger is loaded into an in-memory Snapshot indexed by ticker, by source
+(full source such as "Reddit: wallstreetbets" and platform such as "reddit")
+and by sentiment band. A watcher thread checks the ledger's (mtime, size)
+every few seconds. The engine replaces the file atomically, so when a run
+rewrites it the watcher builds a new Snapshot and swaps it in with a single
+assignment. Requests in flight keep the snapshot they started with. The
+signal archive is loaded the same way into a History indexed by ticker; the
+watcher also checks the (mtime, size) of every archive file, so a run that
+appends to the archive is picked up even if the ledger didn't change.
+
+Endpoints (JSON):
+    GET /health                       snapshot version, load time, signal count
+    GET /signals                      filtered/sorted list:
+          ?ticker=AAPL,NVDA  ?source=reddit  ?band=bullish|neutral|bearish
+          ?blind_spot=true  ?min_strength=3  ?sort=-signal_strength  ?limit=50&offset=0
+          ?fields=ticker,avg_sentiment
+    GET /signals/<TICKER>             full record (with the run's aggregate under "details")
+    GET /sources                      {source: number of tickers}
+    GET /history/<TICKER>?start=&end= archived signals (needs pyarrow)
+
+Responses carry an ETag derived from the snapshot version (the archive's, for
+/history) and the request, so If-None-Match gets a 304 without recomputing
+anything until the data changes.
+
+Usage:
+    python -m src.api_server --port 8765
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.utils.archive import SignalArchive, _as_datetime
+from src.utils.log import get_logger, fields
+
+log = get_logger("api")
+
+SIGNALS_FILE = os.path.join("data", "current_signals.json")
+ARCHIVE_DIR = os.path.join("data", "archive")
+
+BANDS = ("bearish", "neutral", "bullish")
+
+
+class QueryError(ValueError):
+    """Bad request parameters; reported as HTTP 400."""
+
+
+def _read_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "rb") as f:
+        raw = f.read()
+    return json.loads(raw) if raw.strip() else default
+
+
+def _archive_signature(root: str) -> Tuple:
+    """(file, mtime, size) of every Parquet file under the archive's date partitions."""
+    archive = SignalArchive(root)
+    sig = []
+    for partition in archive.partitions():
+        for path in archive._files(partition):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                # Removed by a compaction in progress; the next poll sees the result
+                continue
+            sig.append((os.path.relpath(path, root), st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+def _signature(paths) -> Tuple:
+    sig = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append(None)
+    return tuple(sig)
+
+
+class Snapshot:
+    """
+    One immutable load of the ledger, with its indexes.
+    """
+
+    def __init__(self, signals: List[Dict[str, Any]], threshold: float = 0.05):
+        self.loaded_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.signals = sorted(signals, key=lambda r: str(r.get("ticker")))
+        self.threshold = threshold
+        self.version = hashlib.sha1(
+            json.dumps(self.signals, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()[:16]
+
+        self.by_ticker: Dict[str, Dict[str, Any]] = {}
+        self.by_source: Dict[str, set] = {}
+        self.by_band: Dict[str, set] = {band: set() for band in BANDS}
+        for record in self.signals:
+            ticker = str(record.get("ticker")).upper()
+            self.by_ticker[ticker] = record
+            for source in record.get("sources") or []:
+                source = str(source)
+                self.by_source.setdefault(source.lower(), set()).add(ticker)
+                # "Reddit: wallstreetbets" is also findable as "reddit"
+                platform = source.split(":", 1)[0].strip().lower()
+                if platform != source.lower():
+                    self.by_source.setdefault(platform, set()).add(ticker)
+            self.by_band[self.band(record.get("avg_sentiment") or 0)].add(ticker)
+
+    @classmethod
+    def load(cls, signals_path: str, threshold: float = 0.05) -> "Snapshot":
+        signals = _read_json(signals_path, [])
+        if isinstance(signals, dict):
+            signals = signals.get("signals", [])
+        return cls(signals, threshold)
+
+    def band(self, sentiment: float) -> str:
+        if sentiment > self.threshold:
+            return "bullish"
+        if sentiment < -self.threshold:
+            return "bearish"
+        return "neutral"
+
+    def query(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """Filters with the indexes first, then sorts and pages what's left."""
+        candidates: Optional[set] = None
+
+        def narrow(tickers: set):
+            nonlocal candidates
+            candidates = set(tickers) if candidates is None else candidates & tickers
+
+        if params.get("ticker"):
+            narrow({t.strip().upper() for t in params["ticker"].split(",")} & self.by_ticker.keys())
+        if params.get("source"):
+            narrow(set().union(*(self.by_source.get(s.strip().lower(), set()) for s in params["source"].split(","))))
+        if params.get("band"):
+            bands = [b.strip().lower() for b in params["band"].split(",")]
+            unknown = [b for b in bands if b not in self.by_band]
+            if unknown:
+                raise QueryError(f"unknown band(s) {', '.join(unknown)}; expected {', '.join(BANDS)}")
+            narrow(set().union(*(self.by_band[b] for b in bands)))
+
+        records = self.signals if candidates is None else [self.by_ticker[t] for t in sorted(candidates)]
+        if params.get("blind_spot") is not None:
+            wanted = params["blind_spot"].lower() in ("1", "true", "yes")
+            records = [r for r in records if bool(r.get("blind_spot")) == wanted]
+        if params.get("min_strength"):
+            try:
+                minimum = float(params["min_strength"])
+            except ValueError:
+                raise QueryError("min_strength must be a number")
+            records = [r for r in records if (r.get("signal_strength") or 0) >= minimum]
+
+        if params.get("sort"):
+            field = params["sort"].lstrip("-")
+            # Missing values sort last either way
+            present = [r for r in records if r.get(field) is not None]
+            missing = [r for r in records if r.get(field) is None]
+            try:
+                present.sort(key=lambda r: r[field], reverse=params["sort"].startswith("-"))
+            except TypeError:
+                raise QueryError(f"can't sort by {field}: mixed value types")
+            records = present + missing
+
+        total = len(records)
+        try:
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", 0)) or total
+        except ValueError:
+            raise QueryError("limit and offset must be integers")
+        if offset < 0 or limit < 0:
+            raise QueryError("limit and offset can't be negative")
+        records = records[offset:offset + limit]
+        if params.get("fields"):
+            keep = [f.strip() for f in params["fields"].split(",")]
+            records = [{k: r[k] for k in keep if k in r} for r in records]
+        return {"version": self.version, "total": total, "offset": offset, "signals": records}
+
+    def ticker(self, ticker: str) -> Optional[Dict[str, Any]]:
+        record = self.by_ticker.get(ticker.upper())
+        if record is None:
+            return None
+        return {"version": self.version, "signal": record}
+
+    def sources(self) -> Dict[str, Any]:
+        return {"version": self.version, "sources": {s: len(t) for s, t in sorted(self.by_source.items())}}
+
+
+class History:
+    """
+    One load of the signal archive, indexed by ticker. Each ticker's rows are
+    sorted by scan time, so a start/end range is two bisects.
+    """
+
+    COLUMNS = ["scanned_at", "signal_strength", "velocity", "avg_sentiment", "blind_spot", "current_price"]
+
+    def __init__(self, by_ticker: Dict[str, Tuple[List[datetime], List[Dict[str, Any]]]], signature: Tuple = (),
+                 error: Optional[str] = None):
+        self.by_ticker = by_ticker
+        self.version = hashlib.sha1(repr(signature).encode("utf-8")).hexdigest()[:16]
+        # Set when the archive exists but can't be read (pyarrow missing)
+        self.error = error
+
+    @classmethod
+    def load(cls, archive_dir: str, signature: Tuple) -> "History":
+        if not signature:
+            return cls({}, signature)
+        frame = SignalArchive(archive_dir).query(columns=["ticker"] + cls.COLUMNS)
+        times = list(frame["scanned_at"].dt.to_pydatetime())
+        tickers = frame.pop("ticker").tolist()
+        frame["scanned_at"] = frame["scanned_at"].astype(str)
+        by_ticker: Dict[str, Tuple[List[datetime], List[Dict[str, Any]]]] = {}
+        # The archive returns rows in scan order, so each ticker's lists stay sorted
+        for ticker, at, row in zip(tickers, times, frame.to_dict(orient="records")):
+            entry = by_ticker.setdefault(str(ticker).upper(), ([], []))
+            entry[0].append(at)
+            entry[1].append(row)
+        return cls(by_ticker, signature)
+
+    def query(self, ticker: str, params: Dict[str, str]) -> Dict[str, Any]:
+        bounds = {}
+        for name in ("start", "end"):
+            value = params.get(name)
+            if not value:
+                continue
+            try:
+                bounds[name] = _as_datetime(value, end_of_day=name == "end")
+            except ValueError:
+                raise QueryError(f"{name} must be an ISO date or datetime, got {value!r}")
+
+        times, rows = self.by_ticker.get(ticker.upper(), ([], []))
+        first = bisect_left(times, bounds["start"]) if "start" in bounds else 0
+        last = bisect_right(times, bounds["end"]) if "end" in bounds else len(times)
+        return {"version": self.version, "ticker": ticker.upper(), "rows": rows[first:last]}
+
+
+class SignalStore:
+    """
+    Holds the current Snapshot and History and replaces each when its files
+    change on disk. Responses are memoized per snapshot/history (LRU of
+    `cache_size` entries).
+    """
+
+    def __init__(self, signals_path: str = SIGNALS_FILE, archive_dir: str = ARCHIVE_DIR, threshold: float = 0.05, cache_size: int = 256):
+        self.signals_path = signals_path
+        self.archive_dir = archive_dir
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        # key -> (Snapshot or History the body came from, body)
+        self._responses: "OrderedDict[Tuple, Tuple[Any, bytes]]" = OrderedDict()
+        self._signature = None
+        self._archive_signature = None
+        self.snapshot: Snapshot = Snapshot([], threshold)
+        self.history: History = History({})
+        self.reload()
+
+    def reload(self, force: bool = False) -> bool:
+        """Loads the ledger and the archive if they changed. Returns True if anything new was swapped in."""
+        reloaded = self._reload_signals(force)
+        return self._reload_history(force) or reloaded
+
+    def _reload_signals(self, force: bool) -> bool:
+        signature = _signature((self.signals_path,))
+        if not force and signature == self._signature:
+            return False
+        try:
+            snapshot = Snapshot.load(self.signals_path, self.threshold)
+        except (OSError, ValueError) as e:
+            # Keep serving the previous snapshot; the next change triggers another attempt
+            log.warning(f"Could not load signals: {e}")
+            self._signature = signature
+            return False
+        self._swap("snapshot", snapshot)
+        self._signature = signature
+        log.info(f"Loaded {len(snapshot.signals)} signals", extra=fields(version=snapshot.version))
+        return True
+
+    def _reload_history(self, force: bool) -> bool:
+        signature = _archive_signature(self.archive_dir)
+        if not force and signature == self._archive_signature:
+            return False
+        try:
+            history = History.load(self.archive_dir, signature)
+        except ImportError as e:
+            history = History({}, signature, error=f"archive needs pyarrow: {e}")
+        except (OSError, ValueError) as e:
+            log.warning(f"Could not load the signal archive: {e}")
+            self._archive_signature = signature
+            return False
+        self._swap("history", history)
+        self._archive_signature = signature
+        log.info(f"Loaded archive history for {len(history.by_ticker)} tickers", extra=fields(version=history.version))
+        return True
+
+    def _swap(self, attr: str, new):
+        with self._lock:
+            old = getattr(self, attr)
+            setattr(self, attr, new)
+            for key in [k for k, (owner, _) in self._responses.items() if owner is old]:
+                del self._responses[key]
+
+    def watch(self, interval: float = 2.0) -> threading.Event:
+        """Polls for changed files from a daemon thread; set the returned event to stop."""
+        stopped = threading.Event()
+
+        def loop():
+            while not stopped.wait(interval):
+                self.reload()
+
+        threading.Thread(target=loop, name="signal-store-watch", daemon=True).start()
+        return stopped
+
+    def etag(self, version: str, path: str, query: str) -> str:
+        digest = hashlib.sha1(f"{path}?{query}".encode("utf-8")).hexdigest()[:8]
+        return f'W/"{version}-{digest}"'
+
+    def response(self, owner, key: Tuple, build) -> bytes:
+        """The memoized body for `key`, built from `owner` (a Snapshot or History) on a miss."""
+        with self._lock:
+            hit = self._responses.get(key)
+            if hit is not None and hit[0] is owner:
+                self._responses.move_to_end(key)
+                return hit[1]
+        body = json.dumps(build(), separators=(",", ":"), default=str).encode("utf-8")
+        with self._lock:
+            if owner is self.snapshot or owner is self.history:
+                self._responses[key] = (owner, body)
+                self._responses.move_to_end(key)
+                while len(self._responses) > self.cache_size:
+                    self._responses.popitem(last=False)
+        return body
+
+
+def make_handler(store: SignalStore):
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "SocialArbAPI/1.0"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+            snapshot, history = store.snapshot, store.history
+
+            if parts == ["health"]:
+                return self._send(200, {"version": snapshot.version, "loaded_at": snapshot.loaded_at,
+                                        "signals": len(snapshot.signals)})
+            owner = snapshot
+            if parts == ["signals"]:
+                build = lambda: snapshot.query(params)
+            elif len(parts) == 2 and parts[0] == "signals":
+                if parts[1].upper() not in snapshot.by_ticker:
+                    return self._send(404, {"error": f"no signal for {parts[1].upper()}"})
+                build = lambda: snapshot.ticker(parts[1])
+            elif parts == ["sources"]:
+                build = snapshot.sources
+            elif len(parts) == 2 and parts[0] == "history":
+                if history.error:
+                    return self._send(501, {"error": history.error})
+                owner = history
+                build = lambda: history.query(parts[1], params)
+            else:
+                return self._send(404, {"error": f"unknown endpoint {url.path}"})
+
+            # Only a resolved route can answer 304
+            etag = store.etag(owner.version, url.path, url.query)
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            try:
+                body = store.response(owner, (url.path, url.query), build)
+            except QueryError as e:
+                return self._send(400, {"error": str(e)})
+            self._send(200, body, etag)
+
+        def _send(self, status: int, body, etag: Optional[str] = None):
+            if not isinstance(body, bytes):
+                body = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            log.debug(format % args)
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, store: Optional[SignalStore] = None,
+          poll_interval: float = 2.0) -> ThreadingHTTPServer:
+    """Builds the server (not yet serving) with a store watching the data files."""
+    store = store or SignalStore()
+    store.watch(poll_interval)
+    server = ThreadingHTTPServer((host, port), make_handler(store))
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m src.api_server", description="Local JSON API over the signals")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--poll", type=float, default=2.0, help="seconds between checks for a new ledger")
+    args = parser.parse_args(argv)
+
+    threshold = 0.05
+    if os.path.exists("config.json"):
+        with open("config.json", "r") as f:
+            threshold = json.load(f).get("settings", {}).get("sentiment_threshold", threshold)
+
+    server = serve(args.host, args.port, SignalStore(threshold=threshold), args.poll)
+    log.info(f"Serving signals on http://{args.host}:{args.port}/signals")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,286 @@
+"""
+Long-running mode for SocialArbEngine: each source is polled on its own
+schedule and the ledger is updated as soon as a poll changes something, so a
+ticker breaking on Reddit shows up within minutes, not at the next hourly run.
+
+State kept in memory between polls:
+    batches      source -> signals from its latest poll (a new poll replaces them)
+    per_source   source -> aggregate_signals(batch), so a poll only re-merges its own tickers
+    records      ticker -> ledger record; only tickers whose mentions changed are re-verified
+    components   scrapers, sessions, resolver and sentiment engine (with its score cache) stay warm;
+                 per-ticker lookups (news, analyst, trends, twitter, prices) are
+                 memoized for config "daemon.cache_minutes"
+
+Every hour (a "bucket", the same cadence as the scheduled runs) the daemon
+does what a one-shot run's aggregate and ledger phases do for the whole
+window: it folds the mentions into the activity scores, rewrites
+data/history.json (the velocity baseline), saves the activity state and
+appends to the archive. Between buckets only the ledger files
+(current_signals.json, web/data.json and the changed detail shards) are rewritten.
+
+Usage:
+    python -m src.main_engine daemon --no-enrich
+"""
+
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.http_client import get_client
+from src.utils.instrumentation import RunReport
+from src.utils.log import get_logger, fields
+
+log = get_logger("daemon")
+
+# Minutes between polls per source; overridden by config "daemon.poll_minutes"
+DEFAULT_POLL_MINUTES = {"reddit": 5, "tiktok": 15, "instagram": 30, "trends": 60, "weather": 60}
+
+# name -> (phase making the call, engine attribute or None for the engine itself, method, default minutes)
+CACHED_CALLS = {
+    "price": ("enrich", None, "_fetch_price", 5),
+    "twitter": ("twitter", "twitter", "search_cashtag", 30),
+    "trends": ("enrich", "advanced_trends", "get_sentiment_index", 60),
+    "news": ("verify", "verifier", "fetch_news_volume", 60),
+    "analyst": ("verify", "analyst", "get_consensus", 1440),
+}
+
+
+def _failed(value: Any) -> bool:
+    """The error values of the cached lookups: None (no price, no trend data) or {} (no analyst data)."""
+    return value is None or (isinstance(value, dict) and not value)
+
+
+def memoize(obj: Any, method: str, ttl: float, clock: Callable[[], float] = time.time,
+            max_entries: int = 4096, negative_ttl: float = 60.0) -> Dict:
+    """
+    Shadows obj.method with a version that remembers results for `ttl` seconds,
+    keyed by the call's arguments. Calls made through `self` inside the object
+    hit the cache too. Exceptions aren't cached, and failed lookups (None or {})
+    are only kept for `negative_ttl`. Other falsy results, like a news volume of
+    0, are real answers and stay for the full `ttl`.
+    Past `max_entries`, expired entries go first, then the oldest. Returns the
+    cache dict.
+    """
+    fn = getattr(obj, method)
+    cache: Dict[str, Any] = {}
+
+    def cached(*args, **kwargs):
+        key = repr((args, sorted(kwargs.items())))
+        now = clock()
+        hit = cache.get(key)
+        if hit is not None and now - hit[0] < hit[2]:
+            return hit[1]
+        value = fn(*args, **kwargs)
+        # Re-inserted at the end, so the dict stays ordered oldest first
+        cache.pop(key, None)
+        if len(cache) >= max_entries:
+            for stale in [k for k, (t, _, life) in cache.items() if now - t >= life]:
+                del cache[stale]
+            while len(cache) >= max_entries:
+                del cache[next(iter(cache))]
+        cache[key] = (now, value, min(ttl, negative_ttl) if _failed(value) else ttl)
+        return value
+
+    setattr(obj, method, cached)
+    return cache
+
+
+def merge_aggregates(parts: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Combines one ticker's aggregate_signals entries from several sources."""
+    merged = None
+    for part in parts:
+        if merged is None:
+            merged = {"count": 0, "sentiment_sum": 0, "sources": []}
+        merged["count"] += part["count"]
+        merged["sentiment_sum"] += part["sentiment_sum"]
+        merged["sources"].extend(part["sources"])
+        if "crowd_count" in part:
+            merged["crowd_sum"] = merged.get("crowd_sum", 0) + part["crowd_sum"]
+            merged["crowd_count"] = merged.get("crowd_count", 0) + part["crowd_count"]
+    return merged
+
+
+class EngineDaemon:
+    """
+    Drives an engine's phases on per-source schedules. tick() does one round of
+    whatever is due; run() loops until stop() (or SIGINT/SIGTERM).
+    """
+
+    BUCKET_SECONDS = 3600
+
+    def __init__(self, engine, sources: list = None, enrich: bool = True, dry_run: bool = False,
+                 clock: Callable[[], float] = time.time):
+        self.engine = engine
+        self.enrich = enrich
+        self.dry_run = dry_run
+        self.clock = clock
+        options = engine.config.get("daemon", {})
+
+        selected = engine.select_phases(sources=sources, enrich=enrich)
+        poll_minutes = {**DEFAULT_POLL_MINUTES, **options.get("poll_minutes", {})}
+        self.schedule = {
+            source: float(poll_minutes[source]) * 60
+            for source in engine.COLLECTION_PHASES if source in selected
+        }
+        self.crowd = "crowd" in selected
+        self.enrich_phases = [name for name in engine.ENRICH_PHASES if name in selected]
+
+        self.batches: Dict[str, List[Dict[str, Any]]] = {}
+        self.per_source: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.aggregated: Dict[str, Dict[str, Any]] = {}
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.scores: Dict[str, Dict[str, Any]] = {}
+        self.history = engine._load_history()
+        self.scorer = engine._activity_scorer()
+        self.next_poll = {source: 0.0 for source in self.schedule}
+        self.bucket_started: Optional[float] = None
+        self._stop = threading.Event()
+
+        if enrich:
+            cache_minutes = options.get("cache_minutes", {})
+            for name, (phase, component, method, minutes) in CACHED_CALLS.items():
+                if phase != "verify" and phase not in self.enrich_phases:
+                    continue
+                target = engine if component is None else getattr(engine, component)
+                memoize(target, method, float(cache_minutes.get(name, minutes)) * 60, clock)
+
+    def run(self):
+        """Polls until stopped. The first tick scrapes every source, like a one-shot run."""
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stop())
+        log.info("Daemon started", extra=fields(
+            schedule=",".join(f"{s}={int(v // 60)}m" for s, v in self.schedule.items())))
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.tick()
+                except Exception:
+                    # One bad round (disk full, a bug in a phase) shouldn't end the daemon
+                    log.error("Daemon tick failed", exc_info=True)
+                self._stop.wait(max(1.0, self.next_due() - self.clock()))
+        finally:
+            if "sentiment" in self.engine.__dict__:
+                self.engine.sentiment.flush()
+            log.info("Daemon stopped")
+
+    def stop(self):
+        self._stop.set()
+
+    def next_due(self) -> float:
+        due = list(self.next_poll.values())
+        if self.bucket_started is not None:
+            due.append(self.bucket_started + self.BUCKET_SECONDS)
+        return min(due) if due else self.clock() + self.BUCKET_SECONDS
+
+    def tick(self) -> set:
+        """Polls the sources that are due and publishes what changed. Returns the changed tickers."""
+        now = self.clock()
+        engine = self.engine
+        report = engine.report = RunReport(http_metrics=get_client().metrics)
+
+        changed = set()
+        for source in [s for s, due in self.next_poll.items() if due <= now]:
+            changed |= self._poll(source, report)
+            self.next_poll[source] = now + self.schedule[source]
+
+        bucket = self.bucket_started is None or now - self.bucket_started >= self.BUCKET_SECONDS
+        if bucket:
+            # Velocity and activity baselines move: every ticker gets a fresh record
+            self._close_bucket(now)
+            changed |= set(self.records).union(*self.per_source.values())
+
+        if changed:
+            self._refresh(changed, report)
+            self._publish(report, bucket, now)
+        if "sentiment" in engine.__dict__:
+            engine.sentiment.flush()
+        if report.phases:
+            report.write(engine.RUN_REPORT_FILE)
+        return changed
+
+    def window(self) -> List[Dict[str, Any]]:
+        """Signals from every source's latest poll."""
+        return [s for batch in self.batches.values() for s in batch]
+
+    def _poll(self, source: str, report: RunReport) -> set:
+        engine = self.engine
+        state = {"signals": [], "reddit_candidates": [], "enrich": self.enrich, "dry_run": self.dry_run}
+        try:
+            with report.phase(source) as ph:
+                engine._run_collection_phase(source, getattr(engine, f"_phase_{source}"), state, ph, False)
+            if source == "reddit" and self.crowd:
+                with report.phase("crowd") as ph:
+                    engine._phase_crowd(state, ph)
+        except Exception as e:
+            # Keep serving the previous batch; the source is retried on its next slot
+            log.warning(f"Poll of {source} failed: {e}", extra=fields(source=source))
+            return set()
+
+        old = self.per_source.get(source, {})
+        self.batches[source] = state["signals"]
+        self.per_source[source] = engine.aggregate_signals(state["signals"])
+        changed = {
+            ticker for ticker in set(old) | set(self.per_source[source])
+            if old.get(ticker) != self.per_source[source].get(ticker)
+        }
+        log.info(f"Polled {source}: {len(state['signals'])} signals, {len(changed)} tickers changed",
+                 extra=fields(source=source, signals=len(state["signals"]), changed=len(changed)))
+        return changed
+
+    def _close_bucket(self, now: float):
+        # One bucket ~ one scheduled run: score this hour's window against each ticker's baseline
+        self.scorer.observe_many(self.window(), now)
+        self.scores = self.scorer.finish_run(now)
+        self.bucket_started = now
+
+    def _refresh(self, tickers: set, report: RunReport):
+        """Re-merges, re-enriches and re-verifies `tickers` only."""
+        engine = self.engine
+        aggregated = {}
+        for ticker in sorted(tickers):
+            merged = merge_aggregates(agg[ticker] for agg in self.per_source.values() if ticker in agg)
+            if merged is None:
+                self.aggregated.pop(ticker, None)
+                self.records.pop(ticker, None)
+                continue
+            merged.update(self.scores.get(ticker, {}))
+            aggregated[ticker] = merged
+
+        state = {"aggregated": aggregated, "history": self.history, "enrich": self.enrich}
+        for name in self.enrich_phases:
+            with report.phase(name) as ph:
+                getattr(engine, f"_phase_{name}")(state, ph)
+        with report.phase("verify") as ph:
+            ph.items_in = len(aggregated)
+            records = engine._verify_records(aggregated, self.history, self.enrich, ph)
+            ph.items_out = len(records)
+            self.aggregated.update(aggregated)
+            self.records.update((r["ticker"], r) for r in records)
+            # Sizing splits one risk bucket across all blind spots, so it always looks at every record
+            engine._size_positions(list(self.records.values()), ph)
+
+    def _publish(self, report: RunReport, bucket: bool, now: float):
+        engine = self.engine
+        final_output = list(self.records.values())
+        with report.phase("ledger") as ph:
+            ph.items_in = len(final_output)
+            if self.dry_run:
+                log.info(f"Dry run: not writing {len(final_output)} signals to the ledger")
+                ph.status = "skipped"
+            else:
+                if not engine.save_ledger(final_output):
+                    ph.incr("ledger_unchanged")
+                if "instagram" in engine.__dict__:
+                    engine.instagram.save_state()
+                if bucket:
+                    engine._update_history(self.history, self.aggregated)
+                    self.scorer.prune(now)
+                    self.scorer.save(engine.ACTIVITY_FILE)
+                    with ph.call("archive.append"):
+                        engine._archive(final_output)
+                ph.items_out = len(final_output)
+        if bucket:
+            # Velocity until the next bucket is measured against this one
+            self.history = {ticker: dict(data) for ticker, data in self.aggregated.items()}
@@ -1,21 +1,57 @@
+import functools
 import json
 import os
-from datetime import datetime
-from src.scrapers.tiktok import TikTokScraper
-from src.scrapers.instagram import InstagramScraper
-from src.scrapers.reddit import RedditScraper
-from src.scrapers.trends import TrendsScraper, AdvancedTrendsScraper
-from src.scrapers.news import NewsVerifier
-from src.analysis.entity_resolution import EntityResolver
-from src.analysis.sentiment import SentimentEngine
-from src.analysis.risk import RiskManager
-from src.analysis.bot_detector import BotDetector
+import time
 
-from src.scrapers.weather import WeatherScraper
+from src.utils.checkpoint import CheckpointStore
+from src.utils.events import EventBus
+from src.utils.instrumentation import RunReport, PhaseStats
+from src.utils.lazy import LazyComponent
+from src.utils.ledger import _atomic_write, write_ledger
+from src.utils.log import get_logger, fields
+from src.utils.profiling import Profiler
 
-from src.scrapers.analyst import AnalystVerifier
+log = get_logger("engine")
+
+
+def _install_http_mode():
+    # Record/replay (SOCIAL_ARB_HTTP_MODE) must be in place before any scraper opens a session
+    from src.utils import cassette
+    cassette.install_from_env()
+
+
+def _lazy(module: str, attr: str, kwargs=None) -> LazyComponent:
+    return LazyComponent(module, attr, before_create=_install_http_mode, kwargs=kwargs)
+
+
+def _http_client():
+    from src.utils.http_client import get_client
+    return get_client()
+
+
+def _counts_sentiment(phase):
+    """
+    Phase decorator: adds the sentiment cache hits/misses of the texts the phase
+    scored (and whether the compiled lexicon came from its cache, if it was loaded
+    here) to the phase's counters, so the run report shows their hit rates.
+    """
+    @functools.wraps(phase)
+    def wrapper(self, state: dict, ph: PhaseStats):
+        loaded = "sentiment" in self.__dict__
+        before = (self.sentiment.scored, self.sentiment.cache_hits) if loaded else (0, 0)
+        try:
+            return phase(self, state, ph)
+        finally:
+            if "sentiment" in self.__dict__:
+                sentiment = self.sentiment
+                if sentiment.scored > before[0]:
+                    ph.incr("sentiment_cache_misses", sentiment.scored - before[0])
+                if sentiment.cache_hits > before[1]:
+                    ph.incr("sentiment_cache_hits", sentiment.cache_hits - before[1])
+                if not loaded and sentiment.lexicon_source:
+                    ph.incr("lexicon_cache_hits" if sentiment.lexicon_source == "cached" else "lexicon_cache_misses")
+    return wrapper
 
-from src.scrapers.twitter import TwitterScraper
 
 class SocialArbEngine:
     """
@@ -24,39 +60,297 @@ class SocialArbEngine:
     
     DATA_FILE = os.path.join("data", "ledger.json")
     HISTORY_FILE = os.path.join("data", "history.json")
+    ACTIVITY_FILE = os.path.join("data", "activity_state.json")
+    SIGNALS_FILE = os.path.join("data", "current_signals.json")
+    WEB_DATA_FILE = os.path.join("web", "data.json")
+    WEB_DETAILS_DIR = os.path.join("web", "details")
+    DELTA_FILE = os.path.join("data", "ledger_delta.json")
+    ARCHIVE_DIR = os.path.join("data", "archive")
+    RUN_REPORT_FILE = os.path.join("data", "run_report.jsonl")
+    INSTAGRAM_STATE_FILE = os.path.join("data", "instagram_state.json")
+    SCRAPE_CACHE_DIR = os.path.join("cache", "scrape")
+    CHECKPOINT_DIR = os.path.join("cache", "runs")
+    SENTIMENT_CACHE_FILE = os.path.join("cache", "sentiment.sqlite")
+    LEXICON_CACHE_DIR = os.path.join("cache", "lexicon")
+    # Every file/directory attribute above that a run writes, so benchmarks can redirect them all
+    OUTPUT_PATHS = (
+        "DATA_FILE", "HISTORY_FILE", "ACTIVITY_FILE", "SIGNALS_FILE", "WEB_DATA_FILE", "WEB_DETAILS_DIR",
+        "DELTA_FILE", "ARCHIVE_DIR", "RUN_REPORT_FILE", "INSTAGRAM_STATE_FILE", "SCRAPE_CACHE_DIR",
+        "CHECKPOINT_DIR", "SENTIMENT_CACHE_FILE", "LEXICON_CACHE_DIR"
+    )
+
+    PHASE_NAMES = (
+        "weather", "trends", "instagram", "tiktok", "reddit", "crowd",
+        "aggregate", "twitter", "enrich", "verify", "ledger"
+    )
+    # Phases that pull raw items from a source; their output can be cached and reused
+    COLLECTION_PHASES = ("weather", "trends", "instagram", "tiktok", "reddit")
+    # Enrichment phases hit an external service once per ticker
+    ENRICH_PHASES = ("twitter", "enrich")
+    # State a phase needs from an earlier phase; without it the phase is skipped
+    PHASE_REQUIRES = {
+        "twitter": "aggregated",
+        "enrich": "aggregated",
+        "verify": "aggregated",
+        "ledger": "final_output",
+    }
 
     CONFIG_FILE = "config.json"
 
+    # Components are imported and built on first use, so entry points that only
+    # need part of the engine (save_ledger, a single phase) don't pay for the rest.
+    tiktok = _lazy("src.scrapers.tiktok", "TikTokScraper")
+    instagram = _lazy("src.scrapers.instagram", "InstagramScraper",
+                      kwargs=lambda engine: {"state_file": engine.INSTAGRAM_STATE_FILE})
+    reddit = _lazy("src.scrapers.reddit", "RedditScraper")
+    twitter = _lazy("src.scrapers.twitter", "TwitterScraper")
+    trends = _lazy("src.scrapers.trends", "TrendsScraper")
+    advanced_trends = _lazy("src.scrapers.trends", "AdvancedTrendsScraper") # Advanced logic
+    weather = _lazy("src.scrapers.weather", "WeatherScraper")
+    verifier = _lazy("src.scrapers.news", "NewsVerifier")
+    analyst = _lazy("src.scrapers.analyst", "AnalystVerifier")
+    resolver = _lazy("src.analysis.entity_resolution", "EntityResolver",
+                     kwargs=lambda engine: engine._resolver_options())
+    sentiment = _lazy("src.analysis.sentiment", "SentimentEngine",
+                      kwargs=lambda engine: engine._sentiment_options())
+    risk = _lazy("src.analysis.risk", "RiskManager")
+    bot_detector = _lazy("src.analysis.bot_detector", "BotDetector",
+                         kwargs=lambda engine: {"sentiment": engine.sentiment})
+
     def __init__(self):
         self._load_config()
-        self.tiktok = TikTokScraper()
-        self.instagram = InstagramScraper()
-        self.reddit = RedditScraper()
-        self.twitter = TwitterScraper() 
-        self.trends = TrendsScraper()
-        self.advanced_trends = AdvancedTrendsScraper() # Advanced logic
-        self.weather = WeatherScraper()
-        self.verifier = NewsVerifier()
-        self.analyst = AnalystVerifier()
-        self.resolver = EntityResolver()
-        self.sentiment = SentimentEngine()
-        self.risk = RiskManager()
-        self.bot_detector = BotDetector()
+        # Live progress for in-process monitors (the TUI's live mode); see src.utils.events
+        self.events = EventBus()
+
+    @property
+    def yf(self):
+        """
+        Helper for price: the yfinance module, or None when unavailable or replaying.
+        """
+        if "_yf" not in self.__dict__:
+            from src.utils import cassette
+            try:
+                import yfinance as yf
+            except ImportError:
+                yf = None
+            # yfinance doesn't go through requests, so it can't be replayed
+            self._yf = None if cassette.is_replay() else yf
+        return self._yf
         
-        # Helper for price
+    def run(self, phases: list = None, sources: list = None, enrich: bool = True,
+            dry_run: bool = False, from_cache: bool = False, profile: str = None,
+            resume: str = None):
+        """
+        Runs the pipeline.
+        phases: subset of phase names to run (default: all).
+        sources: subset of COLLECTION_PHASES to scrape (default: all).
+        enrich: False skips Twitter/Trends/price enrichment and the per-ticker
+                news/analyst/risk lookups in verification.
+        dry_run: compute everything but don't write the ledger or history.
+        from_cache: collection phases replay their output from the last real scrape.
+        profile: "run" / "phases", overrides SOCIAL_ARB_PROFILE.
+        resume: run id (or "latest") of an unfinished run to continue from its
+                last completed phase, with that run's original options.
+        """
+        log.info("Starting Social Arb Engine...")
+        checkpoints = CheckpointStore(self.CHECKPOINT_DIR)
+        completed = set()
+        if resume:
+            run_id, options, completed, state = self._load_checkpoint(checkpoints, resume)
+            phases, sources, enrich = options["phases"], options["sources"], options["enrich"]
+            dry_run, from_cache = options["dry_run"], options["from_cache"]
+        else:
+            run_id = None
+            state = {"signals": [], "reddit_candidates": [], "enrich": enrich, "dry_run": dry_run}
+
+        self.report = RunReport(run_id=run_id, http_metrics=_http_client().metrics)
+        profiler = Profiler.from_env(self.report.run_id, mode=profile)
+        selected = self.select_phases(phases, sources, enrich)
+        if not resume:
+            checkpoints.start(self.report.run_id, {
+                "phases": phases, "sources": sources, "enrich": enrich,
+                "dry_run": dry_run, "from_cache": from_cache
+            })
+
+        events = self.events
+        events.publish("run_started", run_id=self.report.run_id,
+                       phases=[name for name, _ in self._phases() if name in selected and name not in completed])
+        stop_http_sampler = events.sample("http", self._http_snapshot) if events.active else None
+        status, error = "failed", None
         try:
-            import yfinance as yf
-            self.yf = yf
-        except ImportError:
-            self.yf = None
-        
-    def run(self):
-        print("Starting Social Arb Engine...")
-        signals = []
+            with profiler.run_scope():
+                for name, phase in self._phases():
+                    if name not in selected:
+                        continue
+                    if name in completed:
+                        log.info(f"Skipping {name}: completed before resume")
+                        continue
+                    events.publish("phase_started", run_id=self.report.run_id, phase=name)
+                    try:
+                        with self.report.phase(name) as ph, profiler.phase_scope(name):
+                            required = self.PHASE_REQUIRES.get(name)
+                            if required and required not in state:
+                                log.warning(f"Skipping {name}: needs '{required}' from an earlier phase")
+                                ph.status = "skipped"
+                            elif name in self.COLLECTION_PHASES:
+                                self._run_collection_phase(name, phase, state, ph, from_cache)
+                            else:
+                                phase(state, ph)
+                    finally:
+                        self._publish_progress(name, state)
+                    checkpoints.save(self.report.run_id, name, state)
+            checkpoints.finish(self.report.run_id)
+            status = "ok"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if stop_http_sampler:
+                stop_http_sampler()
+            if "sentiment" in self.__dict__:
+                # Also after a crash: a resumed run shouldn't rescore what this one already did
+                self.sentiment.flush()
+            self.report.write(self.RUN_REPORT_FILE)
+            events.publish("run_finished", run_id=self.report.run_id, status=status, error=error)
+
+        _http_client().log_summary()
+        log.info("Engine Run Complete.", extra=fields(run_id=self.report.run_id))
+
+    def _http_snapshot(self) -> dict:
+        return {
+            "run_id": self.report.run_id,
+            "hosts": {
+                host: {k: m[k] for k in ("requests", "errors", "rate_limited", "bytes")}
+                for host, m in _http_client().metrics().items()
+            }
+        }
+
+    def _publish_progress(self, name: str, state: dict):
+        """Phase stats and the per-ticker picture so far, for event bus subscribers."""
+        if not self.events.active:
+            return
+        record = self.report.phases[-1].to_dict()
+        self.events.publish("phase_finished", run_id=self.report.run_id, phase=name,
+                            **{k: record[k] for k in ("status", "wall_s", "items_in", "items_out", "http_requests")})
+        self.events.publish("tickers", run_id=self.report.run_id, phase=name, tickers=self._partial_aggregates(state))
+
+    @staticmethod
+    def _partial_aggregates(state: dict) -> dict:
+        # The most complete view available: final records > aggregates > raw signals
+        if state.get("final_output"):
+            return {
+                r["ticker"]: {"mentions": r["signal_strength"], "sentiment": r["avg_sentiment"],
+                              "activity_z": r.get("activity_z"), "blind_spot": r.get("blind_spot", False)}
+                for r in state["final_output"]
+            }
+        if state.get("aggregated"):
+            return {
+                ticker: {"mentions": d["count"], "sentiment": d["sentiment_sum"] / d["count"] if d["count"] else 0.0,
+                         "activity_z": d.get("activity_z")}
+                for ticker, d in state["aggregated"].items()
+            }
+        tickers = {}
+        for s in state.get("signals", []):
+            entry = tickers.setdefault(s["ticker"], {"mentions": 0, "sentiment": 0.0})
+            entry["mentions"] += 1
+            entry["sentiment"] += s.get("sentiment_score", 0) or 0
+        for entry in tickers.values():
+            entry["sentiment"] /= entry["mentions"]
+        return tickers
+
+    @classmethod
+    def resolve_resume(cls, resume: str) -> str:
+        """
+        Resolves a run id or "latest" to an unfinished checkpointed run.
+        Raises ValueError if there's nothing to resume.
+        """
+        checkpoints = CheckpointStore(cls.CHECKPOINT_DIR)
+        run_id = checkpoints.latest_incomplete() if resume == "latest" else resume
+        if not run_id:
+            raise ValueError(f"No unfinished run to resume in {checkpoints.root}")
+        try:
+            manifest = checkpoints.manifest(run_id)
+        except FileNotFoundError:
+            raise ValueError(f"No checkpoint for run {run_id}")
+        if manifest.get("complete"):
+            raise ValueError(f"Run {run_id} already completed")
+        return run_id
+
+    def _load_checkpoint(self, checkpoints: CheckpointStore, resume: str):
+        """
+        Returns (run_id, options, completed phases, state) for the run to resume.
+        """
+        run_id = self.resolve_resume(resume)
+        manifest = checkpoints.manifest(run_id)
+        state = checkpoints.load_state(run_id)
+        options = manifest["options"]
+        if state is None:
+            state = {"signals": [], "reddit_candidates": [], "enrich": options["enrich"], "dry_run": options["dry_run"]}
+        log.info(f"Resuming run {run_id} after: {', '.join(manifest['completed']) or 'nothing'}",
+                 extra=fields(run_id=run_id))
+        return run_id, options, set(manifest["completed"]), state
 
+    def _phases(self):
+        """
+        The pipeline, in order. Each phase reads and extends the shared run state.
+        """
+        return [(name, getattr(self, f"_phase_{name}")) for name in self.PHASE_NAMES]
+
+    @classmethod
+    def select_phases(cls, phases: list = None, sources: list = None, enrich: bool = True) -> set:
+        """
+        Resolves CLI-style phase/source selections to the set of phases to run.
+        Raises ValueError on unknown names.
+        """
+        selected = set(phases) if phases else set(cls.PHASE_NAMES)
+        unknown = selected - set(cls.PHASE_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown phase(s): {', '.join(sorted(unknown))}")
+        if sources is not None:
+            unknown = set(sources) - set(cls.COLLECTION_PHASES)
+            if unknown:
+                raise ValueError(f"Unknown source(s): {', '.join(sorted(unknown))}")
+            selected -= set(cls.COLLECTION_PHASES) - set(sources)
+        if not enrich:
+            selected -= set(cls.ENRICH_PHASES)
+        return selected
+
+    def _run_collection_phase(self, name: str, phase, state: dict, ph: PhaseStats, from_cache: bool):
+        """
+        Runs a scrape phase and caches what it produced, or replays that cache instead.
+        """
+        path = os.path.join(self.SCRAPE_CACHE_DIR, f"{name}.json")
+        if from_cache:
+            if not os.path.exists(path):
+                log.warning(f"No cached output for {name} at {path}; skipping")
+                ph.status = "skipped"
+                return
+            with open(path, "r") as f:
+                cached = json.load(f)
+            state["signals"].extend(cached["signals"])
+            state["reddit_candidates"].extend(cached["reddit_candidates"])
+            ph.items_out = len(cached["signals"])
+            ph.incr("scrape_cache_hits")
+            return
+
+        signals_before = len(state["signals"])
+        candidates_before = len(state["reddit_candidates"])
+        phase(state, ph)
+        os.makedirs(self.SCRAPE_CACHE_DIR, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({
+                "run_id": self.report.run_id,
+                "signals": state["signals"][signals_before:],
+                "reddit_candidates": state["reddit_candidates"][candidates_before:]
+            }, f)
+
+    def _phase_weather(self, state: dict, ph: PhaseStats):
         # 0. Phase 0: Physical Layer (Weather)
-        print("--- Phase 0: Event Layer ---")
-        weather_events = self.weather.check_hail_events()
+        signals = state["signals"]
+        with ph.call("weather.check_hail_events"):
+            weather_events = self.weather.check_hail_events()
+        ph.items_in = len(weather_events)
+        before = len(signals)
         for event in weather_events:
             for ticker in event['likely_tickers']:
                 signals.append({
@@ -66,15 +360,20 @@ class SocialArbEngine:
                     "sentiment_score": 0.5, # Positive for roofing co
                     "timestamp": event['timestamp']
                 })
+        ph.items_out = len(signals) - before
 
+    def _phase_trends(self, state: dict, ph: PhaseStats):
         # 1. Fetch from Google Trends (high intent)
-        print("--- Phase 1: Intent Layer ---")
-        trend_entries = self.trends.fetch_daily_trends()
+        signals = state["signals"]
+        with ph.call("trends.fetch_daily_trends"):
+            trend_entries = self.trends.fetch_daily_trends()
+        ph.items_in = len(trend_entries)
+        before = len(signals)
         for entry in trend_entries:
             # Check for entities
             tickers = self.resolver.resolve(entry['query'] + " " + entry['content'])
             if tickers:
-                print(f"Found Entity in Trends: {entry['query']} -> {tickers}")
+                log.info(f"Found Entity in Trends: {entry['query']} -> {tickers}")
                 for ticker in tickers:
                     signals.append({
                         "ticker": ticker,
@@ -83,21 +382,28 @@ class SocialArbEngine:
                         "sentiment_score": 0.1, # Implied interest
                         "timestamp": entry['timestamp']
                     })
+        ph.items_out = len(signals) - before
 
+    @_counts_sentiment
+    def _phase_instagram(self, state: dict, ph: PhaseStats):
         # 1.5 Instagram Layer (visual hype)
-        # 1.5 Instagram Layer (visual hype)
-        print("--- Phase 1.5: Instagram Layer ---")
+        signals = state["signals"]
         # Placeholder usernames; replace with real influencer accounts
         insta_config = self.config.get("scrapers", {}).get("instagram", {})
         insta_usernames = insta_config.get("usernames", ["financeinfluencer1", "financeinfluencer2"])
         insta_limit = insta_config.get("limit", 5)
-        insta_posts = self.instagram.fetch_posts(insta_usernames, limit=insta_limit)
+        with ph.call("instagram.fetch_posts"):
+            insta_posts = self.instagram.fetch_posts(insta_usernames, limit=insta_limit)
+        # Last seen post per user; persisted by the ledger phase like the activity state
+        state["instagram_state"] = dict(self.instagram.state)
+        ph.items_in = len(insta_posts)
+        before = len(signals)
         for post in insta_posts:
             tickers = self.resolver.resolve(post.get('caption', ''))
             if tickers:
-                for ticker in tickers:
-                    sent = self.sentiment.analyze(post.get('caption', ''))
-                    if sent['compound'] > 0.05 or sent['compound'] < -0.05:
+                sent = self.sentiment.analyze(post.get('caption', ''))
+                if sent['compound'] > 0.05 or sent['compound'] < -0.05:
+                    for ticker in tickers:
                         signals.append({
                             "ticker": ticker,
                             "source": post.get('permalink', f"Instagram/{post.get('username', 'unknown')}"),
@@ -105,20 +411,27 @@ class SocialArbEngine:
                             "sentiment_score": sent['compound'],
                             "timestamp": post.get('timestamp')
                         })
+        ph.items_out = len(signals) - before
 
-                # 1.6 TikTok Layer (viral hype)
-        print("--- Phase 1.6: TikTok Layer ---")
+    @_counts_sentiment
+    def _phase_tiktok(self, state: dict, ph: PhaseStats):
+        # 1.6 TikTok Layer (viral hype)
+        signals = state["signals"]
         tiktok_config = self.config.get("scrapers", {}).get("tiktok", {})
         tiktok_tags = tiktok_config.get("tags", ["finance", "stockmarket"])
         tiktok_limit = tiktok_config.get("limit", 5)
+        ph.items_in = 0
+        before = len(signals)
         for tag in tiktok_tags:
-            posts = self.tiktok.fetch_tag(tag, limit=tiktok_limit)
+            with ph.call("tiktok.fetch_tag"):
+                posts = self.tiktok.fetch_tag(tag, limit=tiktok_limit)
+            ph.items_in += len(posts)
             for post in posts:
                 tickers = self.resolver.resolve(post.get('content', ''))
                 if tickers:
-                    for ticker in tickers:
-                        sent = self.sentiment.analyze(post.get('content', ''))
-                        if sent['compound'] > 0.05 or sent['compound'] < -0.05:
+                    sent = self.sentiment.analyze(post.get('content', ''))
+                    if sent['compound'] > 0.05 or sent['compound'] < -0.05:
+                        for ticker in tickers:
                             signals.append({
                                 "ticker": ticker,
                                 "source": post.get('link', f"TikTok/{tag}"),
@@ -126,9 +439,12 @@ class SocialArbEngine:
                                 "sentiment_score": sent['compound'],
                                 "timestamp": post.get('timestamp')
                             })
-        # 2. Fetch from Reddit (discursive)
+        ph.items_out = len(signals) - before
+
+    @_counts_sentiment
+    def _phase_reddit(self, state: dict, ph: PhaseStats):
         # 2. Reddit Layer (Expanded)
-        print("--- Phase 2: Reddit Discussion Layer ---")
+        signals = state["signals"]
         # Define the 'investment universe' of subreddits
         subs = [
             "wallstreetbets", "stocks", "investing", "options", "pennystocks", 
@@ -138,82 +454,154 @@ class SocialArbEngine:
         ]
         
         # We use the new batch fetcher
-        reddit_posts = self.reddit.fetch_feed(subreddits=subs, limit=50)
+        with ph.call("reddit.fetch_feed"):
+            reddit_posts = self.reddit.fetch_feed(subreddits=subs, limit=50)
+        ph.items_in = len(reddit_posts)
+        before = len(signals)
         
+        reddit_candidates = state["reddit_candidates"]
         for post in reddit_posts:
             # 0. Bot Detection Filter
-                if self.bot_detector.is_bot(post):
-                    print(f"Skipping Bot Post: {post['title']}")
-                    continue
+            if self.bot_detector.is_bot(post):
+                log.debug(f"Skipping Bot Post: {post['title']}")
+                ph.incr("bot_posts")
+                continue
 
-                # Resolve entity from Title + Content
-                text_to_scan = f"{post.get('title')} {post.get('content')}"
-                tickers = self.resolver.resolve(text_to_scan)
-                
-                if tickers:
-                    for ticker in tickers:
-                        # Sentiment Check
-                        sent = self.sentiment.analyze(text_to_scan)
-                        
-                        # Simplified appending (Crowd Wisdom disabled for speed/stability temporarily)
-                        signals.append({
-                            "ticker": ticker,
-                            "source": f"Reddit: {post.get('subreddit')}", 
-                            "raw_text": post.get('title'),
-                            "sentiment_score": sent['compound'],
-                            "timestamp": post['timestamp'],
-                            "link": post.get('link')
-                        })
+            # Resolve entity from Title + Content
+            text_to_scan = f"{post.get('title')} {post.get('content')}"
+            tickers = self.resolver.resolve(text_to_scan)
+            
+            if tickers:
+                # Sentiment Check
+                sent = self.sentiment.analyze(text_to_scan)
+                reddit_candidates.append(post)
+                for ticker in tickers:
+                    signals.append({
+                        "ticker": ticker,
+                        "source": f"Reddit: {post.get('subreddit')}", 
+                        "raw_text": post.get('title'),
+                        "sentiment_score": sent['compound'],
+                        "timestamp": post['timestamp'],
+                        "link": post.get('link')
+                    })
+        ph.items_out = len(signals) - before
+
+    @_counts_sentiment
+    def _phase_crowd(self, state: dict, ph: PhaseStats):
+        # 2b. Crowd Wisdom: do the commenters agree with the post?
+        signals = state["signals"]
+        reddit_candidates = state["reddit_candidates"]
+        ph.items_in = len(reddit_candidates)
+        crowd_config = self.config.get("scrapers", {}).get("reddit", {}).get("crowd", {})
+        if not crowd_config.get("enabled", True) or not reddit_candidates:
+            log.info("Crowd Verification SKIPPED")
+            ph.status = "skipped"
+            return
 
+        crowd_scores = self._verify_crowd(reddit_candidates, crowd_config, ph)
+        for s in signals:
+            if s.get("link") in crowd_scores:
+                s["crowd_score"] = crowd_scores[s["link"]]
+        ph.items_out = len(crowd_scores)
+
+    def _phase_aggregate(self, state: dict, ph: PhaseStats):
         # 3. Aggregate Signals & Calculate Velocity
-        print("--- Phase 3: Aggregation & Velocity ---")
-        
         # Load History
-        history = self._load_history()
-        
-        aggregated = {}
-        for s in signals:
-            t = s['ticker']
-            if t not in aggregated:
-                aggregated[t] = {"count": 0, "sentiment_sum": 0, "sources": []}
-            aggregated[t]["count"] += 1
-            aggregated[t]["sentiment_sum"] += s.get("sentiment_score", 0)
-            aggregated[t]["sources"].append(s['source'])
-            
+        state["history"] = self._load_history()
+        ph.items_in = len(state["signals"])
+        state["aggregated"] = self.aggregate_signals(state["signals"])
+        ph.items_out = len(state["aggregated"])
+        if "resolver" in self.__dict__ and self.resolver.rejected_cashtags:
+            # Unknown/denied $TAGS never reach the per-ticker enrichment calls
+            ph.incr("cashtags_rejected", sum(self.resolver.rejected_cashtags.values()))
+            top = ", ".join(f"{t} x{n}" for t, n in self.resolver.rejected_cashtags.most_common(10))
+            log.info(f"Rejected cashtags: {top}")
+        if "resolver" in self.__dict__ and self.resolver.dropped_aliases:
+            # Ambiguous names ("apple", "visa") seen without finance context
+            ph.incr("aliases_dropped", sum(self.resolver.dropped_aliases.values()))
+            top = ", ".join(f"{t} x{n}" for t, n in self.resolver.dropped_aliases.most_common(10))
+            log.info(f"Dropped low-confidence alias matches: {top}")
+
+        # Decayed counts/sentiment and how unusual this run's mention count is per ticker
+        scorer = self._activity_scorer()
+        now = time.time()
+        scorer.observe_many(state["signals"], now)
+        for ticker, score in scorer.finish_run(now).items():
+            state["aggregated"][ticker].update(score)
+        # Persisted by the ledger phase, so dry runs and crashed runs don't advance it
+        state["activity_state"] = scorer.to_dict()
+
+    def _resolver_options(self) -> dict:
+        # Cashtag validation: allow/deny lists and the optional broader listing file.
+        # Alias confidence: extra ambiguous aliases, context window (words) and threshold.
+        options = self.config.get("entity_resolution", {})
+        return {
+            "cashtag_allow": options.get("cashtag_allow", []),
+            "cashtag_deny": options.get("cashtag_deny", []),
+            "listings_path": options.get("listings_file"),
+            "ambiguous_aliases": options.get("ambiguous_aliases", []),
+            "context_window": options.get("context_window", 8),
+            "min_confidence": options.get("min_confidence", 0.5)
+        }
+
+    def _sentiment_options(self) -> dict:
+        settings = self.config.get("settings", {})
+        return {
+            "cache_path": self.SENTIMENT_CACHE_FILE,
+            "cache_size": settings.get("sentiment_cache_size", 200_000),
+            "lexicon_files": settings.get("sentiment_lexicons", []),
+            "lexicon_cache_dir": self.LEXICON_CACHE_DIR
+        }
+
+    def _activity_scorer(self, state: dict = None):
+        from src.analysis.scoring import ActivityScorer
+        scoring = self.config.get("scoring", {})
+        kwargs = {
+            "half_lives": scoring.get("half_lives_hours", (6, 24, 168)),
+            "baseline_half_life": scoring.get("baseline_half_life_hours", 168)
+        }
+        if state is not None:
+            return ActivityScorer(state=state, **kwargs)
+        return ActivityScorer.load(self.ACTIVITY_FILE, **kwargs)
+
+    @_counts_sentiment
+    def _phase_twitter(self, state: dict, ph: PhaseStats):
         # 3b. Twitter Verification (Phase 2)
         # For high signal items, cross-check Twitter (Nitter)
         # This is expensive/slow so we only do it for active signals
-        if self.config.get("scrapers", {}).get("twitter", {}).get("enabled", True):
-            print("--- Phase 3b: Twitter Cross-Check ---")
-            for ticker, data in aggregated.items():
-                if data['count'] >= 1: # Threshold to verify
+        aggregated = state["aggregated"]
+        ph.items_in = len(aggregated)
+        if not self.config.get("scrapers", {}).get("twitter", {}).get("enabled", True):
+            log.info("Twitter Cross-Check SKIPPED per config")
+            ph.status = "skipped"
+            return
+
+        ph.items_out = 0
+        for ticker, data in aggregated.items():
+            if data['count'] >= 1: # Threshold to verify
+                 with ph.call("twitter.search_cashtag"):
                      tweets = self.twitter.search_cashtag(ticker)
-                     if tweets:
-                         print(f"Found {len(tweets)} tweets for {ticker}")
-                         data["sources"].append("Twitter/Nitter")
-                         # Simple sentiment addition
-                         data["count"] += len(tweets)
-                         # Assuming tweets neutral/positive for now as we didn't score them individually in scraper
-                         # Ideally we should score them.
-                         
-                         # Quick score of tweets
-                         tweet_sentiment = 0
-                         for tw in tweets:
-                             score = self.sentiment.analyze(tw['content'])
-                             tweet_sentiment += score['compound']
-                         
-                         data["sentiment_sum"] += tweet_sentiment
-        else:
-            print("--- Phase 3b: Twitter Cross-Check (SKIPPED per config) ---")
+                 if tweets:
+                     log.info(f"Found {len(tweets)} tweets for {ticker}")
+                     ph.items_out += 1
+                     data["sources"].append("Twitter/Nitter")
+                     # Simple sentiment addition
+                     data["count"] += len(tweets)
+                     
+                     # Quick score of tweets
+                     data["sentiment_sum"] += sum(self.sentiment.score_batch([tw['content'] for tw in tweets]))
 
+    def _phase_enrich(self, state: dict, ph: PhaseStats):
         # 3c. Advanced Trends & Price Overlay
-        print("--- Phase 3c: Trends & Price Context ---")
+        aggregated = state["aggregated"]
+        ph.items_in = len(aggregated)
         for ticker, data in aggregated.items():
             if data['count'] >= 1:
                 # 1. Google Trends Sentiment
                 # checks Hype (Volume) and Sentiment (Bull/Bear ratio)
-                print(f"Analyzing Trends for {ticker}...")
-                trend_data = self.advanced_trends.get_sentiment_index(ticker)
+                log.info(f"Analyzing Trends for {ticker}...")
+                with ph.call("trends.sentiment_index"):
+                    trend_data = self.advanced_trends.get_sentiment_index(ticker)
                 
                 if trend_data:
                     data['trend_sentiment'] = float(trend_data.get('sentiment_ratio', 0))
@@ -226,17 +614,36 @@ class SocialArbEngine:
                 # 2. Live Price (yfinance)
                 if self.yf:
                     try:
-                        t = self.yf.Ticker(ticker)
-                        hist = t.history(period="1d")
-                        if not hist.empty:
-                            current_price = hist['Close'].iloc[-1]
-                            data['current_price'] = float(current_price)
-                            print(f"Price for {ticker}: ${current_price:.2f}")
+                        with ph.call("yfinance.price"):
+                            current_price = self._fetch_price(ticker)
+                        if current_price is not None:
+                            data['current_price'] = current_price
+                            log.info(f"Price for {ticker}: ${current_price:.2f}")
                     except Exception as e:
-                        print(f"Failed to fetch price for {ticker}: {e}")
+                        log.warning(f"Failed to fetch price for {ticker}: {e}")
+        ph.items_out = sum(1 for data in aggregated.values() if "trend_sentiment" in data or "current_price" in data)
+
+    def _fetch_price(self, ticker: str):
+        """Last close from yfinance, or None when there's no data."""
+        hist = self.yf.Ticker(ticker).history(period="1d")
+        if hist.empty:
+            return None
+        return float(hist['Close'].iloc[-1])
 
+    def _phase_verify(self, state: dict, ph: PhaseStats):
         # 4. Verification, Velocity & Risk
-        print("--- Phase 4: Verification & Execution ---")
+        ph.items_in = len(state["aggregated"])
+        final_output = self._verify_records(state["aggregated"], state["history"], state.get("enrich", True), ph)
+        self._size_positions(final_output, ph)
+        state["final_output"] = final_output
+        ph.items_out = len(final_output)
+
+    def _verify_records(self, aggregated: dict, history: dict, enrich: bool, ph: PhaseStats) -> list:
+        """
+        Ledger records for `aggregated`: velocity against `history`, plus the news
+        blind-spot and analyst checks unless `enrich` is off. Positions are sized
+        separately (see _size_positions), since that looks at all blind spots at once.
+        """
         final_output = []
         
         for ticker, data in aggregated.items():
@@ -245,25 +652,34 @@ class SocialArbEngine:
                 continue
 
             avg_sentiment = data['sentiment_sum'] / data['count']
+
+            # Crowd confirmation (None when no comments were checked for this ticker)
+            crowd_confirmation = None
+            if data.get('crowd_count'):
+                crowd_confirmation = data['crowd_sum'] / data['crowd_count']
             
             # Calculate Velocity (Change in Volume)
             prev_data = history.get(ticker, {"count": 0})
             prev_count = prev_data.get("count", 0)
             velocity = data['count'] - prev_count # Simple difference for now
             
-            # Verify Blind Spot (News Volume)
-            priced_in = self.verifier.is_priced_in(ticker)
-            blind_spot = not priced_in
-            
-            # Verify Analyst Asymmetry
-            asymmetry_rating = self.analyst.analyze_asymmetry(ticker, avg_sentiment)
-            
-            # Risk Sizing (Smart Sizing with Velocity)
-            est_shares = 0
-            if blind_spot:
-                # Bonus multiplier for high velocity
-                # If velocity is high, we might size up, OR verify deeper
-                est_shares = self.risk.calculate_position_size(ticker, 100.0, velocity=velocity) # Assume $100 price for sizing check
+            if not enrich:
+                # --no-enrich: keep the run offline-cheap, no per-ticker lookups
+                blind_spot = False
+                asymmetry_rating = "Unknown"
+                est_shares = 0
+            else:
+                # Verify Blind Spot (News Volume)
+                with ph.call("news.is_priced_in"):
+                    priced_in = self.verifier.is_priced_in(ticker)
+                blind_spot = not priced_in
+                
+                # Verify Analyst Asymmetry
+                with ph.call("analyst.analyze_asymmetry"):
+                    asymmetry_rating = self.analyst.analyze_asymmetry(ticker, avg_sentiment)
+                
+                # Risk Sizing (Smart Sizing with Velocity), done for all blind spots at once in _size_positions
+                est_shares = 0
 
             final_output.append({
                 "ticker": ticker,
@@ -273,23 +689,109 @@ class SocialArbEngine:
                 "blind_spot": blind_spot,
                 "analyst_rating": asymmetry_rating,
                 "est_position_shares": est_shares,
-                "sources": list(set(data['sources'])), # unique sources
-                "est_position_shares": est_shares,
-                "sources": list(set(data['sources'])), # unique sources
+                "sources": sorted(set(data['sources'])), # unique sources, stable order for ledger diffs
                 "details": data,
                 
                 # New metrics for Dashboard
                 "current_price": data.get("current_price", 0),
                 "trend_sentiment": data.get("trend_sentiment", 0), # 0 means no data/neutral
                 "bullish_search_vol": data.get("bullish_vol", 0),
-                "bearish_search_vol": data.get("bearish_vol", 0)
+                "bearish_search_vol": data.get("bearish_vol", 0),
+                "crowd_confirmation": crowd_confirmation,
+                # Mentions this run vs the ticker's own decayed baseline, and decayed sentiment per half-life
+                "activity_z": data.get("activity_z", 0.0),
+                "ew_sentiment": data.get("ew_sentiment", {})
             })
-            
+
+        return final_output
+
+    def _size_positions(self, final_output: list, ph: PhaseStats):
+        # Bonus multiplier for high velocity
+        # If velocity is high, we might size up, OR verify deeper
+        sizing_candidates = [
+            {"ticker": item["ticker"], "price": 100.0, "velocity": item["velocity"]} # Assume $100 price for sizing check
+            for item in final_output if item["blind_spot"]
+        ]
+        if sizing_candidates:
+            # One returns download and a correlation-aware split of the risk bucket
+            with ph.call("risk.size_portfolio"):
+                shares = self.risk.size_portfolio(sizing_candidates)
+            for item in final_output:
+                item["est_position_shares"] = shares.get(item["ticker"], item["est_position_shares"])
+
+    def _phase_ledger(self, state: dict, ph: PhaseStats):
+        ph.items_in = len(state["final_output"])
+        if state.get("dry_run"):
+            log.info(f"Dry run: not writing {len(state['final_output'])} signals to the ledger")
+            ph.status = "skipped"
+            return
         # Update History with current run stats
-        self._update_history(history, aggregated)
-        
-        self.save_ledger(final_output)
-        print("Engine Run Complete.")
+        self._update_history(state["history"], state["aggregated"])
+        if "activity_state" in state:
+            scorer = self._activity_scorer(state["activity_state"])
+            scorer.prune(time.time())
+            scorer.save(self.ACTIVITY_FILE)
+        if "instagram_state" in state:
+            self.instagram.save_state(state["instagram_state"])
+        if not self.save_ledger(state["final_output"]):
+            ph.incr("ledger_unchanged")
+        with ph.call("archive.append"):
+            self._archive(state["final_output"])
+        ph.items_out = len(state["final_output"])
+
+    def _archive(self, final_output: list):
+        # Keep every run for backtests/history charts (data/archive, see src/utils/archive.py)
+        try:
+            from src.utils.archive import SignalArchive
+            SignalArchive(self.ARCHIVE_DIR).append(final_output, self.report.run_id)
+        except ImportError:
+            log.warning("pyarrow not installed; skipping the signal archive")
+
+    @staticmethod
+    def aggregate_signals(signals: list) -> dict:
+        """
+        Groups raw signals by ticker: {ticker: {count, sentiment_sum, sources, [crowd_sum, crowd_count]}}.
+        """
+        aggregated = {}
+        for s in signals:
+            t = s['ticker']
+            if t not in aggregated:
+                aggregated[t] = {"count": 0, "sentiment_sum": 0, "sources": []}
+            aggregated[t]["count"] += 1
+            aggregated[t]["sentiment_sum"] += s.get("sentiment_score", 0)
+            aggregated[t]["sources"].append(s['source'])
+            if "crowd_score" in s:
+                aggregated[t]["crowd_sum"] = aggregated[t].get("crowd_sum", 0) + s["crowd_score"]
+                aggregated[t]["crowd_count"] = aggregated[t].get("crowd_count", 0) + 1
+        return aggregated
+
+    def _verify_crowd(self, posts: list, crowd_config: dict, ph: PhaseStats) -> dict:
+        """
+        Fetches comments for the most engaged candidate posts concurrently and
+        scores them in one batch.
+        Returns {post_link: confirmation_score}.
+        """
+        top_n = crowd_config.get("top_n", 20)
+        # Most discussed posts first; they carry the most crowd signal
+        ranked = sorted(
+            (p for p in posts if p.get("link") and p.get("comments")),
+            key=lambda p: (p.get("comments") or 0, p.get("score") or 0),
+            reverse=True
+        )[:top_n]
+
+        with ph.call("reddit.fetch_comments_batch"):
+            comment_map = self.reddit.fetch_comments_batch(
+                [p["link"] for p in ranked],
+                limit=crowd_config.get("comments_per_post", 10),
+                max_workers=crowd_config.get("max_workers", 4),
+                min_interval=crowd_config.get("min_interval", 0.25),
+                time_budget=crowd_config.get("time_budget", 60.0)
+            )
+        scores = self.bot_detector.verify_comments_batch(comment_map)
+        ph.incr("crowd_posts_requested", len(ranked))
+        ph.incr("crowd_comments", sum(len(c) for c in comment_map.values()))
+        log.info(f"Crowd verified {len(scores)}/{len(ranked)} posts.")
+        return scores
 
     def _load_history(self) -> dict:
         if not os.path.exists(self.HISTORY_FILE):
@@ -305,7 +807,7 @@ class SocialArbEngine:
              with open(self.CONFIG_FILE, 'r') as f:
                  self.config = json.load(f)
         else:
-             print("Warning: config.json not found, using defaults.")
+             log.warning("config.json not found, using defaults.")
              self.config = {}
 
     def _update_history(self, old_history: dict, current_agg: dict):
@@ -315,31 +817,94 @@ class SocialArbEngine:
         For zero-cost simple version, we store 'last_run_stats' to calc immediate velocity.
         """
         # We can implement a rolling window later. For now, just save current as 'last'
-        with open(self.HISTORY_FILE, 'w') as f:
-            json.dump(current_agg, f, indent=2)
+        # Atomic so a reader never sees a half-written file
+        _atomic_write(self.HISTORY_FILE, lambda f: json.dump(current_agg, f, indent=2))
 
     def save_ledger(self, data: list):
         # We append to history or overwrite? 
         # For Git-Scraping, overwriting a "current.json" is good for dashboards, 
         # appending to "history.json" is good for time series.
-        # Let's save 'current_signals.json'
-        output_path = os.path.join("data", "current_signals.json")
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2)
-        print(f"Signals saved to {output_path}")
-
-        # Also save to web directory for Vercel
-        web_path = os.path.join("web", "data.json")
-        web_data = {
-            "metadata": {
-                "last_scan": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            },
-            "signals": data
-        }
-        with open(web_path, "w") as f:
-            json.dump(web_data, f, indent=2)
-        print(f"Web Dashboard data saved to {web_path}")
+        # Let's save 'current_signals.json' (plus a delta of what changed since last run)
+        # web/data.json is a summary index; full records go to per-ticker shards in web/details/
+        return write_ledger(data, self.SIGNALS_FILE, self.WEB_DATA_FILE, self.DELTA_FILE,
+                            details_dir=self.WEB_DETAILS_DIR,
+                            precompress=self.config.get("settings", {}).get("web_precompress", False))
+
+
+def _csv(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: list = None) -> int:
+    import argparse
+    import sys
+
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Bare `python -m src.main_engine [--flags]` keeps meaning "run everything"
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv.insert(0, "run")
+
+    parser = argparse.ArgumentParser(prog="python -m src.main_engine", description="Social Arb Engine")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the pipeline (all phases by default)")
+    run_parser.add_argument("--phases", type=_csv, help="comma separated phases to run")
+    run_parser.add_argument("--sources", type=_csv,
+                            help=f"comma separated sources to scrape ({','.join(SocialArbEngine.COLLECTION_PHASES)})")
+    run_parser.add_argument("--no-enrich", action="store_true",
+                            help="skip Twitter/Trends/price enrichment and news/analyst/risk lookups")
+    run_parser.add_argument("--dry-run", action="store_true", help="don't write the ledger or history")
+    run_parser.add_argument("--from-cache", action="store_true",
+                            help="reuse scrape outputs from the previous run instead of fetching")
+    run_parser.add_argument("--profile", choices=["off", "run", "phases"],
+                            help="profile the whole run or each phase (see SOCIAL_ARB_PROFILE*)")
+    run_parser.add_argument("--resume", nargs="?", const="latest", metavar="RUN_ID",
+                            help="continue an unfinished run (default: the latest) from its last completed phase")
+
+    daemon_parser = commands.add_parser("daemon", help="keep running, polling each source on its own schedule")
+    daemon_parser.add_argument("--sources", type=_csv,
+                               help=f"comma separated sources to poll ({','.join(SocialArbEngine.COLLECTION_PHASES)})")
+    daemon_parser.add_argument("--no-enrich", action="store_true",
+                               help="skip Twitter/Trends/price enrichment and news/analyst/risk lookups")
+    daemon_parser.add_argument("--dry-run", action="store_true", help="don't write the ledger or history")
+
+    commands.add_parser("phases", help="list pipeline phases")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "phases":
+        for name in SocialArbEngine.PHASE_NAMES:
+            print(name)
+        return 0
+
+    if args.command == "daemon":
+        try:
+            SocialArbEngine.select_phases(sources=args.sources, enrich=not args.no_enrich)
+        except ValueError as e:
+            parser.error(str(e))
+        from src.daemon import EngineDaemon
+        EngineDaemon(SocialArbEngine(), sources=args.sources, enrich=not args.no_enrich, dry_run=args.dry_run).run()
+        return 0
+
+    try:
+        SocialArbEngine.select_phases(args.phases, args.sources, not args.no_enrich)
+        if args.resume:
+            SocialArbEngine.resolve_resume(args.resume)
+    except ValueError as e:
+        parser.error(str(e))
 
-if __name__ == "__main__":
     engine = SocialArbEngine()
-    engine.run()
+    engine.run(
+        phases=args.phases,
+        sources=args.sources,
+        enrich=not args.no_enrich,
+        dry_run=args.dry_run,
+        from_cache=args.from_cache,
+        profile=args.profile,
+        resume=args.resume
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
-import yfinance as yf
 from typing import Dict, Any, Optional
 
+from src.utils import cassette
+
 class AnalystVerifier:
     """
     Checks Wall Street Consensus via Yahoo Finance.
@@ -21,6 +22,10 @@ class AnalystVerifier:
         }
         """
         print(f"Checking Analyst Consensus for {ticker}...")
+        if cassette.is_replay():
+            # yfinance traffic can't be replayed; behave like a failed lookup
+            return {}
+        import yfinance as yf # deferred: only needed once a lookup actually happens
         try:
             stock = yf.Ticker(ticker)
             info = stock.info
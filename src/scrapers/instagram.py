@@ -9,19 +9,34 @@ required, making it suitable for a zero‑cost setup.
 Limitations:
 * Only works for public accounts.
 * Instagram may rate‑limit or change the endpoint; the scraper includes basic retry
-  logic and a fallback to the simple HTML page parsing.
+  logic and a fallback that pulls the embedded JSON out of the profile page.
 * The scraper extracts the caption text and the media URL – you can then run the
   existing VADER sentiment engine on the caption.
+
+Profiles are fetched concurrently over the shared pooled HTTP client. The newest `shortcode`
+seen per user is remembered in `data/instagram_state.json`, so only posts published
+since the previous run are returned and unchanged profiles cost a single request.
+fetch_posts only advances the in-memory state; the engine saves it (save_state) together
+with the ledger, so dry runs and replays don't skip posts a real run never published.
 """
 
 import json
-import time
-from typing import List, Dict
-import requests
-from bs4 import BeautifulSoup
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+
+from src.utils.http_client import get_client
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
 
+GRAPHQL_URL = "https://www.instagram.com/graphql/query/"
+QUERY_HASH = "58b6785bea111c671ebb24d0e5c1e1e2"
+STATE_FILE = os.path.join("data", "instagram_state.json")
+
+# Marker of the legacy embedded profile JSON: <script>window._sharedData = {...};</script>
+_SHARED_DATA_MARKER = b"window._sharedData = "
+
 
 def _graphql_query(username: str) -> str:
     """Return the GraphQL query string for a given username.
@@ -30,75 +45,141 @@ def _graphql_query(username: str) -> str:
     return f"{{\n  user(username: \"{username}\") {{\n    edge_owner_to_timeline_media(first: 12) {{\n      edges {{\n        node {{\n          shortcode\n          edge_media_to_caption {{\n            edges {{\n              node {{\n                text\n              }}\n            }}\n          }}\n          display_url\n          taken_at_timestamp\n        }}\n      }}\n    }}\n  }}\n}}"
 
 
-def fetch_posts(usernames: List[str], limit: int = 5) -> List[Dict]:
-    """Fetch recent posts for each username.
+def _extract_shared_data(html: bytes) -> Optional[dict]:
+    """Pull the `window._sharedData` JSON out of a profile page without parsing the HTML.
 
-    Returns a list of dictionaries with keys: `username`, `caption`, `media_url`,
-    `timestamp`.
+    Finds the marker with a byte search and lets the JSON decoder stop at the end of
+    the object, so the cost is one scan plus decoding the embedded blob only.
     """
-    results: List[Dict] = []
-    for username in usernames:
+    start = html.find(_SHARED_DATA_MARKER)
+    if start == -1:
+        return None
+    start += len(_SHARED_DATA_MARKER)
+    end = html.find(b"</script>", start)
+    chunk = html[start:end if end != -1 else len(html)].decode("utf-8", errors="replace")
+    try:
+        data, _ = json.JSONDecoder().raw_decode(chunk)
+    except ValueError:
+        return None
+    return data
+
+
+def _edges_to_posts(username: str, edges: List[Dict], limit: int, last_seen: Optional[str]) -> List[Dict]:
+    """Converts timeline edges to post dicts, newest first, stopping at `last_seen`."""
+    posts = []
+    for edge in edges[:limit]:
+        node = edge.get("node", {})
+        shortcode = node.get("shortcode")
+        if last_seen and shortcode == last_seen:
+            break
+        caption_edges = node.get("edge_media_to_caption", {}).get("edges", [])
+        caption = caption_edges[0].get("node", {}).get("text", "") if caption_edges else ""
+        posts.append({
+            "username": username,
+            "shortcode": shortcode,
+            "caption": caption,
+            "media_url": node.get("display_url"),
+            "timestamp": node.get("taken_at_timestamp"),
+            "permalink": f"https://www.instagram.com/p/{shortcode}/" if shortcode else f"https://www.instagram.com/{username}/"
+        })
+    return posts
+
+
+class InstagramScraper:
+    """Wrapper class for Instagram scraping.
+
+    Provides a `fetch_posts` method compatible with the engine's usage.
+    """
+
+    def __init__(self, max_workers: int = 8, state_file: str = STATE_FILE):
+        self.max_workers = max_workers
+        self.state_file = state_file
+        self.http = get_client()
+        self.headers = {"User-Agent": USER_AGENT}
+        self._state_lock = threading.Lock()
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, str]:
+        if not os.path.exists(self.state_file):
+            return {}
         try:
-            # First try the GraphQL endpoint
-            url = "https://www.instagram.com/graphql/query/"
-            params = {"query_hash": "58b6785bea111c671ebb24d0e5c1e1e2", "variables": json.dumps({"id": username, "first": limit})}
-            headers = {"User-Agent": USER_AGENT, "Accept": "application/json"}
-            resp = requests.get(url, params=params, headers=headers, timeout=10)
+            with open(self.state_file, "r") as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save_state(self, state: Optional[Dict[str, str]] = None):
+        """Writes `state` (default: the scraper's current state) to the state file."""
+        try:
+            os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+            tmp = self.state_file + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.state if state is None else state, f, indent=2, sort_keys=True)
+            os.replace(tmp, self.state_file)
+        except Exception as e:
+            print(f"Failed to save Instagram state: {e}")
+
+    def _fetch_edges(self, username: str, limit: int) -> Optional[List[Dict]]:
+        """Returns the timeline edges for a user, or None if both strategies fail."""
+        # First try the GraphQL endpoint
+        try:
+            params = {"query_hash": QUERY_HASH, "variables": json.dumps({"id": username, "first": limit})}
+            resp = self.http.get(GRAPHQL_URL, params=params, headers={**self.headers, "Accept": "application/json"})
             if resp.status_code == 200:
                 data = resp.json()
-                edges = data.get("data", {}).get("user", {}).get("edge_owner_to_timeline_media", {}).get("edges", [])
-                for edge in edges[:limit]:
-                    node = edge.get("node", {})
-                    caption_edges = node.get("edge_media_to_caption", {}).get("edges", [])
-                    caption = caption_edges[0].get("node", {}).get("text", "") if caption_edges else ""
-                    shortcode = node.get("shortcode")
-                    results.append({
-                        "username": username,
-                        "caption": caption,
-                        "media_url": node.get("display_url"),
-                        "timestamp": node.get("taken_at_timestamp"),
-                        "permalink": f"https://www.instagram.com/p/{shortcode}/" if shortcode else f"https://www.instagram.com/{username}/"
-                    })
-                continue
+                return data.get("data", {}).get("user", {}).get("edge_owner_to_timeline_media", {}).get("edges", [])
         except Exception:
             pass
-        # Fallback to simple HTML parsing if GraphQL fails or is blocked
+
+        # Fallback to the JSON embedded in the profile page if GraphQL fails or is blocked
         try:
-            page_url = f"https://www.instagram.com/{username}/"
-            html = requests.get(page_url, headers={"User-Agent": USER_AGENT}, timeout=10).text
-            soup = BeautifulSoup(html, "html.parser")
-            scripts = soup.find_all("script", type="text/javascript")
-            for script in scripts:
-                if script.string and "window._sharedData" in script.string:
-                    json_text = script.string.split(' = ', 1)[1].rstrip(';')
-                    data = json.loads(json_text)
-                    edges = data.get("entry_data", {}).get("ProfilePage", [])[0].get("graphql", {}).get("user", {}).get("edge_owner_to_timeline_media", {}).get("edges", [])
-                    for edge in edges[:limit]:
-                        node = edge.get("node", {})
-                        caption = node.get("edge_media_to_caption", {}).get("edges", [])[0].get("node", {}).get("text", "")
-                        results.append({
-                            "username": username,
-                            "caption": caption,
-                            "media_url": node.get("display_url"),
-                            "timestamp": node.get("taken_at_timestamp"),
-                        })
-                    break
+            resp = self.http.get(f"https://www.instagram.com/{username}/", headers=self.headers)
+            data = _extract_shared_data(resp.content)
+            if not data:
+                return None
+            profile = data.get("entry_data", {}).get("ProfilePage", [{}])[0]
+            return profile.get("graphql", {}).get("user", {}).get("edge_owner_to_timeline_media", {}).get("edges", [])
         except Exception:
-            # If everything fails, skip this user
-            continue
-        # Respect a short delay to avoid hammering Instagram
-        time.sleep(1)
-    return results
-class InstagramScraper:
-    """Wrapper class for Instagram scraping.
+            return None
 
-    Provides a `fetch_posts` method compatible with the engine's usage.
-    """
-    def __init__(self):
-        pass
+    def _fetch_user(self, username: str, limit: int, skip_unchanged: bool) -> List[Dict]:
+        edges = self._fetch_edges(username, limit)
+        if not edges:
+            return []
+
+        last_seen = self.state.get(username) if skip_unchanged else None
+        posts = _edges_to_posts(username, edges, limit, last_seen)
+
+        newest = edges[0].get("node", {}).get("shortcode")
+        if newest:
+            with self._state_lock:
+                self.state[username] = newest
+        if not posts:
+            print(f"Instagram @{username}: no new posts since last run.")
+        return posts
 
-    def fetch_posts(self, usernames, limit=5):
+    def fetch_posts(self, usernames, limit=5, skip_unchanged=True):
         """Fetch recent posts for given usernames.
         Returns a list of post dictionaries.
+        With `skip_unchanged`, posts already seen in a previous run are dropped.
         """
-        return fetch_posts(usernames, limit)
+        if not usernames:
+            return []
+
+        workers = max(1, min(self.max_workers, len(usernames)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            per_user = list(executor.map(lambda u: self._fetch_user(u, limit, skip_unchanged), usernames))
+
+        return [post for posts in per_user for post in posts]
+
+
+def fetch_posts(usernames: List[str], limit: int = 5) -> List[Dict]:
+    """Fetch recent posts for each username.
+
+    Returns a list of dictionaries with keys: `username`, `caption`, `media_url`,
+    `timestamp`.
+    """
+    scraper = InstagramScraper()
+    posts = scraper.fetch_posts(usernames, limit)
+    scraper.save_state()
+    return posts
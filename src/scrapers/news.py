@@ -3,6 +3,8 @@ import urllib.parse
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 
+from src.utils.http_client import get_client
+
 class NewsVerifier:
     """
     Checks Google News to verify if a trend is 'Priced In'.
@@ -10,6 +12,9 @@ class NewsVerifier:
     
     BASE_RSS_URL = "https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
 
+    def __init__(self):
+        self.http = get_client()
+
     def fetch_news_volume(self, ticker: str, query: str = None, hours_lookback: int = 48) -> int:
         """
         Counts news articles in the last N hours for a ticker/query.
@@ -19,7 +24,12 @@ class NewsVerifier:
         url = self.BASE_RSS_URL.format(query=encoded_query)
         
         print(f"Verifying news volume for {search_term} from {url}")
-        feed = feedparser.parse(url)
+        try:
+            response = self.http.get(url)
+            feed = feedparser.parse(response.content)
+        except Exception as e:
+            print(f"Error fetching news for {search_term}: {e}")
+            return 0
         
         if not feed.entries:
             return 0
@@ -1,8 +1,11 @@
-import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import List, Dict, Any
 from datetime import datetime
 
+from src.utils.http_client import get_client, pause, DEFAULT_USER_AGENT
+
 class RedditScraper:
     """
     Scrapes Reddit data using the public JSON endpoints.
@@ -11,8 +14,22 @@ class RedditScraper:
     
     BASE_URL = "https://www.reddit.com"
     
-    def __init__(self, user_agent: str = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"):
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT):
         self.headers = {"User-Agent": user_agent}
+        # Shared pooled client so concurrent comment fetches reuse keep-alive connections
+        self.http = get_client()
+        # Simple shared rate limiter (min spacing between request starts)
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+    def _throttle(self, min_interval: float):
+        """Blocks until at least `min_interval` seconds have passed since the last request start."""
+        with self._rate_lock:
+            now = time.monotonic()
+            wait_for = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + min_interval
+        if wait_for > 0:
+            pause(wait_for)
 
     def fetch_feed(self, subreddits: List[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -28,10 +45,10 @@ class RedditScraper:
             print(f"Fetching Reddit: r/{sub}...")
             
             try:
-                response = requests.get(url, headers=self.headers)
+                response = self.http.get(url, headers=self.headers)
                 if response.status_code == 429:
                     print(f"Reddit Rate Limit Hit (429). Sleeping 2s...")
-                    time.sleep(2)
+                    pause(2)
                     continue
 
                 if response.status_code != 200:
@@ -68,7 +85,7 @@ class RedditScraper:
                     })
                     
                 # Be nice to API
-                time.sleep(0.5)
+                pause(0.5)
 
             except Exception as e:
                 print(f"Exception fetching {sub}: {e}")
@@ -83,7 +100,7 @@ class RedditScraper:
         print(f"Searching Reddit for: {query}")
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.http.get(url, headers=self.headers)
             if response.status_code != 200:
                 print(f"Error searching {query}: {response.status_code}")
                 return []
@@ -112,48 +129,115 @@ class RedditScraper:
             print(f"Exception searching {query}: {e}")
             return []
 
-    def fetch_comments(self, permalink: str, limit: int = 5) -> List[str]:
-        """
-        Fetches top comments for a given post perma-link.
-        """
+    def _comments_url(self, permalink: str, limit: int) -> str:
         # Ensure we construct the full URL correctly
         # permalinks in JSON usually start with /r/...
         if not permalink.startswith("http"):
              if not permalink.startswith("/"):
                  permalink = "/" + permalink
-             url = f"{self.BASE_URL}{permalink}.json?limit={limit}"
-        else:
-             url = f"{permalink}.json?limit={limit}"
+             return f"{self.BASE_URL}{permalink.rstrip('/')}.json?limit={limit}"
+        return f"{permalink.rstrip('/')}.json?limit={limit}"
+
+    @staticmethod
+    def _parse_comments(data: Any) -> List[str]:
+        # Reddit JSON for a post returns a list: [post_listing, comment_listing]
+        if not isinstance(data, list) or len(data) < 2:
+            return []
+
+        comment_listing = data[1]
+        children = comment_listing.get("data", {}).get("children", [])
 
+        comments = []
+        for child in children:
+            c_data = child.get("data", {})
+            body = c_data.get("body")
+            if body:
+                comments.append(body)
+
+        return comments
+
+    def fetch_comments(self, permalink: str, limit: int = 5) -> List[str]:
+        """
+        Fetches top comments for a given post perma-link.
+        """
+        url = self._comments_url(permalink, limit)
         print(f"Fetching Comments from: {url}")
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.http.get(url, headers=self.headers)
             if response.status_code != 200:
                 print(f"Error fetching comments: {response.status_code}")
                 return []
                 
-            data = response.json()
-            # Reddit JSON for a post returns a list: [post_listing, comment_listing]
-            if not isinstance(data, list) or len(data) < 2:
-                return []
-                
-            comment_listing = data[1]
-            children = comment_listing.get("data", {}).get("children", [])
-            
-            comments = []
-            for child in children:
-                c_data = child.get("data", {})
-                body = c_data.get("body")
-                if body:
-                    comments.append(body)
-                    
-            return comments
+            return self._parse_comments(response.json())
 
         except Exception as e:
             print(f"Exception fetching comments: {e}")
             return []
 
+    def fetch_comments_batch(self, permalinks: List[str], limit: int = 5, max_workers: int = 4,
+                             min_interval: float = 0.25, time_budget: float = 30.0) -> Dict[str, List[str]]:
+        """
+        Fetches comment trees for many posts concurrently.
+        Requests share the pooled HTTP client and are spaced by `min_interval` seconds.
+        Anything not finished within `time_budget` seconds is abandoned, so the
+        result may contain fewer permalinks than requested.
+        Returns: {permalink: [comment bodies]}
+        """
+        results: Dict[str, List[str]] = {}
+        if not permalinks:
+            return results
+
+        deadline = time.monotonic() + time_budget
+        rate_limited = threading.Event()
+
+        def _fetch(permalink: str) -> List[str]:
+            # Stop issuing new requests once the budget is gone or Reddit pushes back
+            if rate_limited.is_set() or time.monotonic() >= deadline:
+                return []
+            self._throttle(min_interval)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            # A 429 comes straight back instead of being retried into the budget
+            response = self.http.get(self._comments_url(permalink, limit), headers=self.headers,
+                                     timeout=min(10, remaining), retry_rate_limited=False)
+            if response.status_code == 429:
+                print("Reddit Rate Limit Hit (429) during comment fetch. Stopping batch.")
+                rate_limited.set()
+                return []
+            if response.status_code != 200:
+                return []
+            return self._parse_comments(response.json())
+
+        print(f"Fetching comments for {len(permalinks)} posts ({max_workers} workers, {time_budget:.0f}s budget)...")
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        futures = {executor.submit(_fetch, p): p for p in dict.fromkeys(permalinks)}
+        pending = set(futures)
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        comments = future.result()
+                    except Exception as e:
+                        print(f"Exception fetching comments for {futures[future]}: {e}")
+                        continue
+                    if comments:
+                        results[futures[future]] = comments
+        finally:
+            for future in pending:
+                future.cancel()
+            # Don't block on in-flight requests past the budget
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if pending:
+            print(f"Comment fetch budget exhausted: {len(pending)} posts skipped.")
+        return results
+
 if __name__ == "__main__":
     scraper = RedditScraper()
     print(scraper.fetch_subreddit_new("wallstreetbets", limit=2))
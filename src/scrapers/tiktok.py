@@ -3,6 +3,8 @@ import re
 from typing import List, Dict, Any
 from datetime import datetime
 
+from src.utils.http_client import get_client
+
 class TikTokScraper:
     """
     Scrapes TikTok data via RSSHub to avoid direct scraping issues.
@@ -15,6 +17,16 @@ class TikTokScraper:
 
     def __init__(self):
         self.base_url = self.RSS_HUB_INSTANCES[0]
+        self.http = get_client()
+
+    def _fetch_feed(self, url: str):
+        """Fetches an RSS feed through the shared client (feedparser has no timeout of its own)."""
+        try:
+            response = self.http.get(url)
+            return feedparser.parse(response.content)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return feedparser.FeedParserDict(entries=[])
 
     def _clean_html(self, raw_html: str) -> str:
         """Removes HTML tags from description."""
@@ -29,7 +41,7 @@ class TikTokScraper:
         """
         url = f"{self.base_url}/tiktok/tag/{tag}"
         print(f"Fetching TikTok tag: {tag} from {url}")
-        feed = feedparser.parse(url)
+        feed = self._fetch_feed(url)
 
         results = []
         if not feed.entries:
@@ -65,7 +77,7 @@ class TikTokScraper:
         """
         url = f"{self.base_url}/tiktok/user/{username}"
         print(f"Fetching TikTok user: {username} from {url}")
-        feed = feedparser.parse(url)
+        feed = self._fetch_feed(url)
         
         results = []
         for entry in feed.entries:
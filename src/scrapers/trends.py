@@ -1,10 +1,9 @@
 import feedparser
-import requests
-import pandas as pd
 from typing import List, Dict, Any
 from datetime import datetime
 import xml.etree.ElementTree as ET
-import time
+
+from src.utils.http_client import get_client, pause
 
 class TrendsScraper:
     """
@@ -12,6 +11,9 @@ class TrendsScraper:
     """
     
     RSS_URL = "https://trends.google.com/trending/rss?geo=US"
+
+    def __init__(self):
+        self.http = get_client()
     
     def fetch_daily_trends(self) -> List[Dict[str, Any]]:
         """
@@ -19,12 +21,8 @@ class TrendsScraper:
         """
         print(f"Fetching Google Trends from {self.RSS_URL}")
         
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        
         try:
-            response = requests.get(self.RSS_URL, headers=headers)
+            response = self.http.get(self.RSS_URL)
             response.raise_for_status()
             feed = feedparser.parse(response.content)
         except Exception as e:
@@ -80,6 +78,10 @@ class AdvancedTrendsScraper:
         except ImportError:
             print("Error: pytrends not installed. Please run `pip install pytrends`.")
             self.pytrends = None
+        except Exception as e:
+            # TrendReq fetches a Google cookie on construction; no network (or no recording) means no pytrends
+            print(f"Error: could not initialise pytrends: {e}")
+            self.pytrends = None
 
     def get_interest_over_time(self, keywords: List[str], timeframe: str = 'today 1-m') -> Dict[str, Any]:
         """
@@ -141,7 +143,7 @@ class AdvancedTrendsScraper:
         # Let's take the most potent term: "buy [symbol]" vs "sell [symbol]"
         kw_list = [bullish_terms[0], bearish_terms[0]] 
         
-        time.sleep(2) # Rate limiting to avoid 429s (Too Many Requests)
+        pause(2) # Rate limiting to avoid 429s (Too Many Requests)
         data = self.get_interest_over_time(kw_list, timeframe='today 3-m')
         
         if data is None:
@@ -149,6 +151,7 @@ class AdvancedTrendsScraper:
             return None
             
         # Pytrends can return a dict on failure/empty instead of DataFrame
+        import pandas as pd # pytrends has already loaded it by now
         if not isinstance(data, pd.DataFrame):
             print(f"Warning: Pytrends returned non-DataFrame (type: {type(data)}) for {symbol}")
             return None
@@ -1,11 +1,11 @@
-import requests
 import feedparser
 import random
-import time
 from typing import List, Dict, Any
 from datetime import datetime
 import urllib.parse
 
+from src.utils.http_client import get_client, pause
+
 class TwitterScraper:
     """
     Scrapes Twitter via Nitter instances to avoid API costs.
@@ -22,13 +22,14 @@ class TwitterScraper:
 
     def __init__(self):
         self.working_instances = self.NITTER_INSTANCES.copy()
+        self.http = get_client()
 
     def _get_working_instance(self) -> str:
         """Returns a random instance from the working pool."""
         if not self.working_instances:
             print("Warning: All Nitter instances failed. Resetting pool.")
             self.working_instances = self.NITTER_INSTANCES.copy()
-            
+
         return random.choice(self.working_instances)
 
     def search_cashtag(self, ticker: str) -> List[Dict[str, Any]]:
@@ -47,11 +48,7 @@ class TwitterScraper:
             
             try:
                 # Set short timeout to fail fast
-                # Use requests with headers to look like a browser
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-                resp = requests.get(url, headers=headers, timeout=10)
+                resp = self.http.get(url, timeout=(5, 10))
                 
                 if resp.status_code != 200:
                     raise Exception(f"Status Code {resp.status_code}")
@@ -82,7 +79,7 @@ class TwitterScraper:
                 print(f"Instance {instance} failed: {e}")
                 if instance in self.working_instances:
                     self.working_instances.remove(instance)
-                time.sleep(1)
+                pause(1)
                 
         print(f"Failed to scrape Twitter for {ticker} after retries.")
         return []
@@ -1,7 +1,8 @@
-import requests
 from typing import List, Dict, Any
 from datetime import datetime
 
+from src.utils.http_client import get_client
+
 class WeatherScraper:
     """
     Fetches weather data to detect 'Physical Catalysts'.
@@ -21,6 +22,9 @@ class WeatherScraper:
     # 99: Thunderstorm with slight and heavy hail
     HAIL_CODES = [96, 99]
 
+    def __init__(self):
+        self.http = get_client()
+
     def check_hail_events(self) -> List[Dict[str, Any]]:
         """
         Checks for recent or forecast hail in key markets.
@@ -33,7 +37,7 @@ class WeatherScraper:
             url = f"https://api.open-meteo.com/v1/forecast?latitude={coords['lat']}&longitude={coords['lon']}&daily=weathercode&timezone=auto"
             
             try:
-                resp = requests.get(url, timeout=10)
+                resp = self.http.get(url)
                 if resp.status_code != 200:
                     continue
                     
@@ -1,63 +1,346 @@
+from textual import work
 from textual.app import App, ComposeResult
-from textual.widgets import Header, Footer, DataTable, Static
-from textual.containers import Container
+from textual.widgets import Header, Footer, DataTable, Static, TabbedContent, TabPane, RichLog
+from textual.containers import Container, Horizontal, Vertical
 import json
 import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+# (column key, header, cell formatter); cells keep raw numbers so sorting is numeric
+COLUMNS = [
+    ("ticker", "Ticker", lambda item: str(item.get("ticker"))),
+    ("strength", "Signal Strength", lambda item: int(item.get("signal_strength") or 0)),
+    ("sentiment", "Sentiment", lambda item: round(float(item.get("avg_sentiment") or 0), 2)),
+    ("blind_spot", "Blind Spot?", lambda item: "✅ YES" if item.get("blind_spot") else "❌ NO"),
+    ("shares", "Position (Est Shares)", lambda item: int(item.get("est_position_shares") or 0)),
+    ("sources", "Sources", lambda item: ", ".join(item.get("sources") or [])),
+]
+COLUMN_KEYS = [key for key, _, _ in COLUMNS]
+
+# Live run tables: (column key, header)
+PHASE_COLUMNS = [("phase", "Phase"), ("status", "Status"), ("wall_s", "Wall s"), ("items_in", "In"),
+                 ("items_out", "Out"), ("http_requests", "HTTP")]
+HTTP_COLUMNS = [("host", "Host"), ("requests", "Requests"), ("rate", "req/s"), ("errors", "Errors"),
+                ("rate_limited", "429"), ("kb", "KB")]
+LIVE_TICKER_COLUMNS = [("ticker", "Ticker"), ("mentions", "Mentions"), ("sentiment", "Sentiment"),
+                       ("activity_z", "Activity z"), ("blind_spot", "Blind Spot?")]
+
+Row = Tuple
+
+
+def parse_ledger(path: str) -> Dict[str, Row]:
+    """ticker -> row cells. Raises OSError/ValueError on an unreadable ledger."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("signals", [])
+    if not isinstance(data, list):
+        raise ValueError(f"expected a list of signals, got {type(data).__name__}")
+    return {
+        str(item.get("ticker")): tuple(fmt(item) for _, _, fmt in COLUMNS)
+        for item in data if item.get("ticker")
+    }
+
+
+def apply_diff(table: DataTable, old_rows: Dict[str, Row], new_rows: Dict[str, Row], column_keys) -> bool:
+    """Adds, removes and updates only what differs between the two row sets. Returns True if anything changed."""
+    changed = False
+    for key in [k for k in old_rows if k not in new_rows]:
+        table.remove_row(key)
+        changed = True
+    for key, cells in new_rows.items():
+        old = old_rows.get(key)
+        if old is None:
+            table.add_row(*cells, key=key)
+            changed = True
+            continue
+        for column, before, after in zip(column_keys, old, cells):
+            if before != after:
+                table.update_cell(key, column, after)
+                changed = True
+    return changed
+
 
 class SocialArbTUI(App):
     """
     The 'Hacker' Terminal Interface.
+
+    The ledger file is polled for changes (a stat per POLL_INTERVAL) and parsed in a
+    worker thread; only rows and cells that changed are applied to the table.
+    DataTable only renders the visible rows, so thousands of tickers stay responsive.
+    Click a column header to sort by it (again to reverse).
+
+    Live mode ("e", or --live) runs SocialArbEngine in a worker thread and follows it
+    through its event bus: phase progress, request rates per host, the tickers found
+    so far and the engine log.
     """
     CSS = """
     Screen {
         layout: vertical;
     }
     DataTable {
-        height: 100%;
+        height: 1fr;
+        border: solid green;
+    }
+    #status {
+        height: 1;
+        color: green;
+    }
+    #live-left {
+        width: 1fr;
+    }
+    #live-tickers {
+        width: 1fr;
+    }
+    #engine-log {
+        height: 10;
         border: solid green;
     }
     """
-    
-    BINDINGS = [("q", "quit", "Quit"), ("r", "refresh_data", "Refresh")]
+
+    BINDINGS = [("q", "quit", "Quit"), ("r", "refresh_data", "Refresh"), ("e", "run_engine", "Run engine")]
+
+    LEDGER_FILE = os.path.join("data", "current_signals.json")
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, ledger_path: Optional[str] = None, engine_options: Optional[Dict[str, Any]] = None,
+                 live: bool = False):
+        super().__init__()
+        self.ledger_path = ledger_path or self.LEDGER_FILE
+        self.rows: Dict[str, Row] = {}
+        # (mtime_ns, size) of the last ledger version handed to a worker
+        self._ledger_signature = None
+        self.sort_column: Optional[str] = None
+        self.sort_reverse = False
+        self.last_loaded: Optional[str] = None
+        self.last_error: Optional[str] = None
+        # Live mode
+        self.engine_options = engine_options or {}
+        self.start_live = live
+        self.engine_running = False
+        self.live_rows: Dict[str, Row] = {}
+        self._http_previous: Dict[str, Tuple[float, int]] = {}
 
     def compose(self) -> ComposeResult:
         yield Header()
-        yield DataTable()
+        with TabbedContent(initial="ledger-tab"):
+            with TabPane("Ledger", id="ledger-tab"):
+                yield DataTable(id="ledger")
+                yield Static(id="status")
+            with TabPane("Live run", id="live-tab"):
+                with Horizontal():
+                    with Vertical(id="live-left"):
+                        yield DataTable(id="phases")
+                        yield DataTable(id="http")
+                    yield DataTable(id="live-tickers")
+                yield RichLog(id="engine-log", max_lines=2000)
         yield Footer()
 
     def on_mount(self) -> None:
-        table = self.query_one(DataTable)
-        table.add_columns("Ticker", "Signal Strength", "Sentiment", "Blind Spot?", "Position (Est Shares)", "Sources")
-        self.load_data()
-
-    def load_data(self):
-        table = self.query_one(DataTable)
-        table.clear()
-        
-        data_path = os.path.join("data", "current_signals.json")
-        if not os.path.exists(data_path):
+        table = self.query_one("#ledger", DataTable)
+        table.cursor_type = "row"
+        for key, label, _ in COLUMNS:
+            table.add_column(label, key=key)
+        for table_id, columns in (("#phases", PHASE_COLUMNS), ("#http", HTTP_COLUMNS),
+                                  ("#live-tickers", LIVE_TICKER_COLUMNS)):
+            live_table = self.query_one(table_id, DataTable)
+            for key, label in columns:
+                live_table.add_column(label, key=key)
+        self.check_ledger()
+        self.set_interval(self.POLL_INTERVAL, self.check_ledger)
+        if self.start_live:
+            self.action_run_engine()
+
+    # --- Ledger ---
+
+    def check_ledger(self, force: bool = False) -> None:
+        """Starts a background parse if the ledger changed since the last one."""
+        try:
+            st = os.stat(self.ledger_path)
+        except FileNotFoundError:
+            self._set_status(error=f"{self.ledger_path} not found")
             return
+        signature = (st.st_mtime_ns, st.st_size)
+        if force or signature != self._ledger_signature:
+            self._ledger_signature = signature
+            self.load_data()
 
+    @work(thread=True, exclusive=True, group="ledger")
+    def load_data(self) -> None:
+        # Runs off the UI thread; only the diff is applied back on it
         try:
-            with open(data_path, "r") as f:
-                data = json.load(f)
-                
-            for item in data:
-                ticker = item.get("ticker")
-                strength = str(item.get("signal_strength"))
-                sentiment = f"{item.get('avg_sentiment'):.2f}"
-                blind_spot = "✅ YES" if item.get("blind_spot") else "❌ NO"
-                shares = str(item.get("est_position_shares", 0))
-                sources = ", ".join(item.get("sources", []))
-                
-                table.add_row(ticker, strength, sentiment, blind_spot, shares, sources)
-                
-        except Exception as e:
-            pass
+            rows = parse_ledger(self.ledger_path)
+        except (OSError, ValueError) as e:
+            self.call_from_thread(self._set_status, error=f"Could not read {self.ledger_path}: {e}")
+            return
+        self.call_from_thread(self.apply_rows, rows)
+
+    def apply_rows(self, rows: Dict[str, Row]) -> None:
+        table = self.query_one("#ledger", DataTable)
+        changed = apply_diff(table, self.rows, rows, COLUMN_KEYS)
+        self.rows = rows
+        if changed and self.sort_column:
+            self._sort(table)
+        self.last_loaded = time.strftime("%H:%M:%S")
+        self._set_status(error=None)
+
+    def _sort(self, table: DataTable) -> None:
+        table.sort(self.sort_column, reverse=self.sort_reverse)
+
+    def on_data_table_header_selected(self, event: DataTable.HeaderSelected) -> None:
+        if event.data_table.id != "ledger":
+            return
+        column = event.column_key.value
+        self.sort_reverse = not self.sort_reverse if column == self.sort_column else column != "ticker"
+        self.sort_column = column
+        self._sort(event.data_table)
+        self._set_status(error=self.last_error)
+
+    def _set_status(self, error: Optional[str] = None) -> None:
+        self.last_error = error
+        parts = [f"{len(self.rows)} tickers"]
+        if self.last_loaded:
+            parts.append(f"updated {self.last_loaded}")
+        if self.sort_column:
+            parts.append(f"sorted by {self.sort_column} {'↓' if self.sort_reverse else '↑'}")
+        if self.engine_running:
+            parts.append("engine running")
+        if error:
+            parts.append(f"[red]{error}[/red]")
+        self.query_one("#status", Static).update(" · ".join(parts))
 
     def action_refresh_data(self) -> None:
-        self.load_data()
+        self.check_ledger(force=True)
 
-if __name__ == "__main__":
-    app = SocialArbTUI()
+    # --- Live engine ---
+
+    def action_run_engine(self) -> None:
+        if self.engine_running:
+            self.notify("The engine is already running")
+            return
+        self.engine_running = True
+        self.query_one(TabbedContent).active = "live-tab"
+        self.run_engine()
+
+    @work(thread=True, exclusive=True, group="engine")
+    def run_engine(self) -> None:
+        from src.main_engine import SocialArbEngine
+        from src.utils.events import EventLogHandler
+        from src.utils.log import redirect
+
+        engine = SocialArbEngine()
+        unsubscribe = engine.events.subscribe(lambda event: self.call_from_thread(self.on_engine_event, event))
+        # The engine logs to stdout, which the TUI owns; show the lines in the log panel instead
+        restore_logging = redirect(EventLogHandler(engine.events))
+        try:
+            engine.run(**self.engine_options)
+        except Exception as e:
+            # Also covers failures before the run started (bad options), which have no run_finished
+            self.call_from_thread(self._on_log, {"level": "ERROR", "message": f"Engine run failed: {e}"})
+        finally:
+            restore_logging()
+            unsubscribe()
+            self.call_from_thread(self._engine_stopped)
+
+    def _engine_stopped(self) -> None:
+        self.engine_running = False
+        self._set_status(error=self.last_error)
+
+    def on_engine_event(self, event: Dict[str, Any]) -> None:
+        kind = event["event"]
+        handler = getattr(self, f"_on_{kind}", None)
+        if handler:
+            handler(event)
+
+    def _on_run_started(self, event: Dict[str, Any]) -> None:
+        phases = self.query_one("#phases", DataTable)
+        phases.clear()
+        for name in event["phases"]:
+            phases.add_row(name, "pending", "", "", "", "", key=name)
+        self.query_one("#engine-log", RichLog).write(f"Run {event['run_id']} started")
+        self._set_status(error=self.last_error)
+
+    def _on_phase_started(self, event: Dict[str, Any]) -> None:
+        self._update_phase(event["phase"], {"status": "running"})
+
+    def _on_phase_finished(self, event: Dict[str, Any]) -> None:
+        self._update_phase(event["phase"], {
+            "status": event["status"], "wall_s": round(event["wall_s"], 2),
+            "items_in": "" if event["items_in"] is None else event["items_in"],
+            "items_out": "" if event["items_out"] is None else event["items_out"],
+            "http_requests": event["http_requests"],
+        })
+
+    def _update_phase(self, phase: str, cells: Dict[str, Any]) -> None:
+        table = self.query_one("#phases", DataTable)
+        if phase not in table.rows:
+            table.add_row(phase, "", "", "", "", "", key=phase)
+        for column, value in cells.items():
+            table.update_cell(phase, column, value)
+
+    def _on_http(self, event: Dict[str, Any]) -> None:
+        table = self.query_one("#http", DataTable)
+        now = time.monotonic()
+        for host, m in sorted(event["hosts"].items()):
+            # Rate over the interval since this host's previous sample
+            before_t, before_n = self._http_previous.get(host, (now, m["requests"]))
+            rate = round((m["requests"] - before_n) / (now - before_t), 1) if now > before_t else 0.0
+            self._http_previous[host] = (now, m["requests"])
+            cells = (host, m["requests"], rate, m["errors"], m["rate_limited"], round(m["bytes"] / 1024, 1))
+            if host in table.rows:
+                for (column, _), value in zip(HTTP_COLUMNS[1:], cells[1:]):
+                    table.update_cell(host, column, value)
+            else:
+                table.add_row(*cells, key=host)
+
+    def _on_tickers(self, event: Dict[str, Any]) -> None:
+        rows = {
+            ticker: (ticker, t["mentions"], round(t["sentiment"], 2),
+                     "" if t.get("activity_z") is None else t["activity_z"],
+                     "✅ YES" if t.get("blind_spot") else "")
+            for ticker, t in event["tickers"].items()
+        }
+        table = self.query_one("#live-tickers", DataTable)
+        if apply_diff(table, self.live_rows, rows, [key for key, _ in LIVE_TICKER_COLUMNS]):
+            table.sort("mentions", reverse=True)
+        self.live_rows = rows
+
+    def _on_log(self, event: Dict[str, Any]) -> None:
+        line = event["message"]
+        if event["level"] in ("WARNING", "ERROR", "CRITICAL"):
+            line = f"[red]{line}[/red]"
+        self.query_one("#engine-log", RichLog).write(line)
+
+    def _on_run_finished(self, event: Dict[str, Any]) -> None:
+        message = f"Run {event['run_id']} {event['status']}"
+        if event.get("error"):
+            message += f": {event['error']}"
+        self.query_one("#engine-log", RichLog).write(message)
+        self.notify(message, severity="information" if event["status"] == "ok" else "error")
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Social Arb terminal interface")
+    parser.add_argument("--ledger", help=f"signals file to follow (default {SocialArbTUI.LEDGER_FILE})")
+    parser.add_argument("--live", action="store_true", help="start an engine run right away and follow it")
+    parser.add_argument("--sources", help="live run: comma separated sources to scrape")
+    parser.add_argument("--no-enrich", action="store_true", help="live run: skip per-ticker enrichment lookups")
+    parser.add_argument("--dry-run", action="store_true", help="live run: don't write the ledger or history")
+    args = parser.parse_args(argv)
+
+    engine_options = {"enrich": not args.no_enrich, "dry_run": args.dry_run}
+    if args.sources:
+        engine_options["sources"] = [s.strip() for s in args.sources.split(",") if s.strip()]
+    app = SocialArbTUI(ledger_path=args.ledger, engine_options=engine_options, live=args.live)
     app.run()
+    return 0
+
+
+if __name__ == "__main__":
+    import sys
+    # `python src/ui/tui.py` puts src/ui on the path; live mode imports the engine package
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+    raise SystemExit(main())
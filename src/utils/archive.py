@@ -0,0 +1,197 @@
+"""
+Historical signal archive: every run's final output as Parquet, partitioned by day.
+
+    data/archive/date=2026-10-19/<run_id>.parquet   one file per run (today)
+    data/archive/date=2026-10-18/day.parquet        earlier days, compacted
+
+Rows are sorted by ticker, so the Parquet min/max statistics let a ticker
+filter skip row groups, and `query` only opens the date partitions inside the
+requested range. Once a day has passed its run files are merged into one, which
+keeps a query over months down to one file per day. Needs pyarrow (imported on
+first use).
+"""
+
+import operator
+import os
+from datetime import date, datetime, time as dt_time, timezone
+from functools import reduce
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from src.utils.log import get_logger, fields
+
+log = get_logger("archive")
+
+DateLike = Union[str, date, datetime]
+
+# column -> (pyarrow type name, default when the record lacks it)
+COLUMNS = {
+    "ticker": ("string", None),
+    "signal_strength": ("int64", 0),
+    "velocity": ("int64", 0),
+    "avg_sentiment": ("float64", 0.0),
+    "blind_spot": ("bool_", False),
+    "analyst_rating": ("string", None),
+    "est_position_shares": ("int64", 0),
+    "current_price": ("float64", 0.0),
+    "trend_sentiment": ("float64", 0.0),
+    "bullish_search_vol": ("int64", 0),
+    "bearish_search_vol": ("int64", 0),
+    "crowd_confirmation": ("float64", None),
+}
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema(
+        [pa.field("run_id", pa.string()), pa.field("scanned_at", pa.timestamp("us", tz="UTC"))]
+        + [pa.field(name, getattr(pa, type_name)()) for name, (type_name, _) in COLUMNS.items()]
+        + [pa.field("sources", pa.list_(pa.string()))]
+    )
+
+
+def _as_datetime(value: DateLike, end_of_day: bool = False) -> datetime:
+    """Dates (or 'YYYY-MM-DD' strings) cover the whole day; naive datetimes are taken as UTC."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value) if "T" in value or " " in value else date.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, dt_time.max if end_of_day else dt_time.min)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _cell(record: Dict[str, Any], name: str, type_name: str, default):
+    value = record.get(name, default)
+    if value is None:
+        return default
+    if type_name == "string":
+        return str(value)
+    if type_name == "int64":
+        return int(value)
+    if type_name == "float64":
+        return float(value)
+    return bool(value)
+
+
+class SignalArchive:
+    """
+    Appends engine runs to date-partitioned Parquet files and reads ranges back.
+    """
+
+    DAY_FILE = "day.parquet"
+    ROW_GROUP_SIZE = 16384
+
+    def __init__(self, root: str = os.path.join("data", "archive")):
+        self.root = root
+
+    def append(self, records: Iterable[Dict[str, Any]], run_id: str, scanned_at: Optional[datetime] = None) -> Optional[str]:
+        """
+        Writes one run's ledger records. Returns the file written, or None for an empty run.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        records = sorted(records, key=lambda r: str(r.get("ticker")))
+        if not records:
+            return None
+        scanned_at = _as_datetime(scanned_at or datetime.now(timezone.utc))
+
+        columns = {
+            "run_id": [run_id] * len(records),
+            "scanned_at": [scanned_at] * len(records),
+        }
+        for name, (type_name, default) in COLUMNS.items():
+            columns[name] = [_cell(r, name, type_name, default) for r in records]
+        columns["sources"] = [[str(s) for s in r.get("sources") or []] for r in records]
+        table = pa.table(columns, schema=_schema())
+
+        partition = os.path.join(self.root, f"date={scanned_at.date().isoformat()}")
+        os.makedirs(partition, exist_ok=True)
+        path = os.path.join(partition, f"{run_id}.parquet")
+        tmp = path + ".tmp"
+        pq.write_table(table, tmp, compression="zstd", write_statistics=True)
+        os.replace(tmp, path)
+        log.info(f"Archived {len(records)} signals to {path}", extra=fields(run_id=run_id, rows=len(records)))
+
+        self.compact(before=scanned_at.date())
+        return path
+
+    def compact(self, before: Optional[DateLike] = None) -> int:
+        """
+        Merges the run files of every day earlier than `before` (default: today, UTC)
+        into a single ticker-sorted file. Returns the number of days compacted.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        cutoff = _as_datetime(before or datetime.now(timezone.utc)).date().isoformat()
+        compacted = 0
+        for partition in self.partitions():
+            if os.path.basename(partition)[len("date="):] >= cutoff:
+                continue
+            runs = self._files(partition)
+            if len(runs) < 2 and all(os.path.basename(f) == self.DAY_FILE for f in runs):
+                continue
+
+            table = pa.concat_tables([pq.read_table(f, schema=_schema()) for f in runs])
+            table = table.sort_by([("ticker", "ascending"), ("scanned_at", "ascending")])
+            path = os.path.join(partition, self.DAY_FILE)
+            pq.write_table(table, path + ".tmp", compression="zstd", write_statistics=True,
+                           row_group_size=self.ROW_GROUP_SIZE)
+            os.replace(path + ".tmp", path)
+            for f in runs:
+                if f != path:
+                    os.remove(f)
+            compacted += 1
+        if compacted:
+            log.info(f"Compacted {compacted} archive day(s)")
+        return compacted
+
+    @staticmethod
+    def _files(partition: str) -> List[str]:
+        return [
+            os.path.join(partition, name) for name in sorted(os.listdir(partition))
+            if name.endswith(".parquet")
+        ]
+
+    def partitions(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> List[str]:
+        """Partition directories whose day overlaps [start, end], oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+        first = _as_datetime(start).date().isoformat() if start else ""
+        last = _as_datetime(end, end_of_day=True).date().isoformat() if end else "9999-12-31"
+        selected = []
+        for name in sorted(os.listdir(self.root)):
+            if not name.startswith("date="):
+                continue
+            # ISO dates compare correctly as strings
+            if first <= name[len("date="):] <= last:
+                selected.append(os.path.join(self.root, name))
+        return selected
+
+    def query(self, tickers: Optional[Iterable[str]] = None, start: Optional[DateLike] = None,
+              end: Optional[DateLike] = None, columns: Optional[List[str]] = None):
+        """
+        Archived signals for `tickers` (default all) scanned between `start` and `end`
+        (inclusive; a date covers the whole day), as a pandas DataFrame sorted by scan time.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        files = [f for partition in self.partitions(start, end) for f in self._files(partition)]
+        schema = _schema()
+        if not files:
+            return schema.empty_table().select(columns or schema.names).to_pandas()
+
+        dataset = ds.dataset(files, format="parquet", schema=schema)
+        ts_type = schema.field("scanned_at").type
+        conditions = []
+        if tickers is not None:
+            conditions.append(ds.field("ticker").isin(list(tickers)))
+        if start:
+            conditions.append(ds.field("scanned_at") >= pa.scalar(_as_datetime(start), ts_type))
+        if end:
+            conditions.append(ds.field("scanned_at") <= pa.scalar(_as_datetime(end, end_of_day=True), ts_type))
+
+        table = dataset.to_table(columns=columns, filter=reduce(operator.and_, conditions) if conditions else None)
+        if "scanned_at" in table.column_names:
+            table = table.sort_by([("scanned_at", "ascending")] + ([("ticker", "ascending")] if "ticker" in table.column_names else []))
+        return table.to_pandas()
@@ -0,0 +1,216 @@
+"""
+Record/replay layer for HTTP traffic.
+
+Set SOCIAL_ARB_HTTP_MODE to switch every requests.Session in the process
+(the shared HTTPClient as well as library sessions such as pytrends):
+
+- live   (default) talk to the network.
+- record talk to the network and append every response (status, headers,
+         body) to a gzip-compressed JSON-lines cassette.
+- replay serve responses from the cassette, never touching the network.
+
+SOCIAL_ARB_CASSETTE picks the cassette file (default fixtures/cassettes/default.jsonl.gz).
+SOCIAL_ARB_REPLAY_LATENCY adds a simulated delay in replay mode: a number of
+seconds, or "recorded" to sleep for the latency observed while recording.
+"""
+
+import base64
+import gzip
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from src.utils.log import get_logger, fields
+
+log = get_logger("cassette")
+
+DEFAULT_CASSETTE = os.path.join("fixtures", "cassettes", "default.jsonl.gz")
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+
+# Bodies are stored decoded, so transport framing headers no longer apply
+_DROP_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "set-cookie"}
+
+
+def _normalize_url(url: str) -> str:
+    """Sorts query parameters so equivalent requests share a key."""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+
+def _key(method: str, url: str) -> str:
+    return f"{method.upper()} {_normalize_url(url)}"
+
+
+class Cassette:
+    """
+    A gzip-compressed JSON-lines file of recorded responses.
+    Several responses for the same request are replayed in recorded order;
+    the last one is repeated once they run out.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[dict]] = {}
+        self._cursor: Dict[str, int] = {}
+
+    def load(self):
+        self._entries = {}
+        self._cursor = {}
+        if not os.path.exists(self.path):
+            log.warning("Cassette not found; every request will miss", extra=fields(path=self.path))
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._entries.setdefault(entry["key"], []).append(entry)
+
+    def reset(self):
+        """Starts a fresh recording."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8"):
+            pass
+
+    def append(self, entry: dict):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            # Each append is its own gzip member; gzip.open reads them back as one stream
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+
+    def next_entry(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            i = self._cursor.get(key, 0)
+            self._cursor[key] = i + 1
+            return entries[min(i, len(entries) - 1)]
+
+
+class CassetteAdapter(BaseAdapter):
+    """
+    Transport adapter that records through, or replays instead of, a real adapter.
+    """
+
+    def __init__(self, inner: BaseAdapter, cassette: Cassette, mode: str, latency=None):
+        super().__init__()
+        self.inner = inner
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        key = _key(request.method, request.url)
+        if self.mode == REPLAY:
+            return self._replay(request, key)
+
+        start = time.perf_counter()
+        response = self.inner.send(request, **kwargs)
+        body = response.content
+        self.cassette.append({
+            "key": key,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _DROP_HEADERS},
+            "body": base64.b64encode(body).decode("ascii"),
+            "elapsed": round(time.perf_counter() - start, 4)
+        })
+        return response
+
+    def _replay(self, request, key: str) -> requests.Response:
+        entry = self.cassette.next_entry(key)
+        if entry is None:
+            raise requests.ConnectionError(f"No recorded response for {key}", request=request)
+
+        if self.latency == "recorded":
+            time.sleep(entry.get("elapsed", 0))
+        elif self.latency:
+            time.sleep(self.latency)
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = entry.get("reason")
+        response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+        response._content = base64.b64decode(entry["body"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+_mode = LIVE
+_original_get_adapter = requests.Session.get_adapter
+
+
+def mode() -> str:
+    return _mode
+
+
+def is_replay() -> bool:
+    """True when the network must not be touched (callers outside requests should fall back)."""
+    return _mode == REPLAY
+
+
+def install(mode: str, path: str = DEFAULT_CASSETTE, latency=None):
+    """
+    Routes every requests.Session in the process through the cassette.
+    """
+    global _mode
+    if mode not in (LIVE, RECORD, REPLAY):
+        raise ValueError(f"Unknown HTTP mode: {mode}")
+
+    requests.Session.get_adapter = _original_get_adapter
+    _mode = mode
+    if mode == LIVE:
+        return
+
+    cassette = Cassette(path)
+    if mode == RECORD:
+        cassette.reset()
+    else:
+        cassette.load()
+
+    def get_adapter(session, url):
+        return CassetteAdapter(_original_get_adapter(session, url), cassette, mode, latency)
+
+    requests.Session.get_adapter = get_adapter
+    log.info("Using HTTP cassette", extra=fields(mode=mode, cassette=path))
+
+
+_installed = False
+
+
+def install_from_env():
+    """
+    Applies SOCIAL_ARB_HTTP_MODE / SOCIAL_ARB_CASSETTE / SOCIAL_ARB_REPLAY_LATENCY once per process.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    env_mode = os.environ.get("SOCIAL_ARB_HTTP_MODE", LIVE).lower()
+    if env_mode == LIVE:
+        return
+    latency = os.environ.get("SOCIAL_ARB_REPLAY_LATENCY")
+    if latency and latency != "recorded":
+        latency = float(latency)
+    install(env_mode, os.environ.get("SOCIAL_ARB_CASSETTE", DEFAULT_CASSETTE), latency)
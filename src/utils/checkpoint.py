@@ -0,0 +1,111 @@
+"""
+Per-phase checkpoints for engine runs, so a run that dies half way can resume.
+
+Layout under the checkpoint root (default cache/runs):
+
+    <run_id>/manifest.json    options the run was started with, completed phases, complete flag
+    <run_id>/state.json.gz    run state after the last completed phase (compact gzip JSON)
+
+The state is replaced atomically after every phase; the manifest is written
+after it, so a crash between the two only costs re-running that one phase.
+"""
+
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.utils.log import get_logger, fields
+
+log = get_logger("checkpoint")
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class CheckpointStore:
+    """
+    Saves and restores the engine's run state, one directory per run id.
+    """
+
+    MANIFEST = "manifest.json"
+    STATE = "state.json.gz"
+
+    def __init__(self, root: str, keep: int = 5):
+        self.root = root
+        self.keep = keep
+
+    def _dir(self, run_id: str) -> str:
+        return os.path.join(self.root, run_id)
+
+    def start(self, run_id: str, options: Dict[str, Any]):
+        """Creates the checkpoint directory for a new run."""
+        os.makedirs(self._dir(run_id), exist_ok=True)
+        self._write_manifest(run_id, {
+            "run_id": run_id,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "options": options,
+            "completed": [],
+            "complete": False
+        })
+
+    def save(self, run_id: str, phase: str, state: Dict[str, Any]):
+        """Records `phase` as done and stores the state it left behind."""
+        payload = json.dumps(state, separators=(",", ":"), default=str).encode("utf-8")
+        _atomic_write(os.path.join(self._dir(run_id), self.STATE), gzip.compress(payload, compresslevel=6))
+
+        manifest = self.manifest(run_id)
+        if phase not in manifest["completed"]:
+            manifest["completed"].append(phase)
+        self._write_manifest(run_id, manifest)
+        log.debug(f"Checkpointed {phase}", extra=fields(run_id=run_id, phase=phase, bytes=len(payload)))
+
+    def finish(self, run_id: str):
+        """Marks the run complete and prunes old checkpoints."""
+        manifest = self.manifest(run_id)
+        manifest["complete"] = True
+        self._write_manifest(run_id, manifest)
+        self.prune()
+
+    def manifest(self, run_id: str) -> Dict[str, Any]:
+        """Raises FileNotFoundError for unknown run ids."""
+        with open(os.path.join(self._dir(run_id), self.MANIFEST), "r") as f:
+            return json.load(f)
+
+    def load_state(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """State after the last completed phase, or None if no phase finished."""
+        path = os.path.join(self._dir(run_id), self.STATE)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, "rb") as f:
+            return json.loads(f.read())
+
+    def runs(self) -> List[str]:
+        """Run ids with checkpoints, oldest first (run ids start with a UTC timestamp)."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, self.MANIFEST))
+        )
+
+    def latest_incomplete(self) -> Optional[str]:
+        for run_id in reversed(self.runs()):
+            if not self.manifest(run_id).get("complete"):
+                return run_id
+        return None
+
+    def prune(self):
+        """Drops the oldest completed runs beyond `keep`; incomplete runs stay resumable."""
+        completed = [r for r in self.runs() if self.manifest(r).get("complete")]
+        for run_id in completed[:-self.keep] if self.keep else completed:
+            shutil.rmtree(self._dir(run_id), ignore_errors=True)
+
+    def _write_manifest(self, run_id: str, manifest: Dict[str, Any]):
+        _atomic_write(os.path.join(self._dir(run_id), self.MANIFEST), json.dumps(manifest, indent=2).encode("utf-8"))
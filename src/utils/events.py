@@ -0,0 +1,95 @@
+"""
+In-process event bus the engine publishes run progress to.
+
+Subscribers (the TUI's live mode) get a dict per event:
+
+    {"event": "run_started",    "run_id", "phases"}
+    {"event": "phase_started",  "run_id", "phase"}
+    {"event": "phase_finished", "run_id", "phase", "status", "wall_s", "items_in", "items_out", "http_requests"}
+    {"event": "http",           "run_id", "hosts": {host: {"requests", "errors", "rate_limited", "bytes"}}}
+    {"event": "tickers",        "run_id", "phase", "tickers": {ticker: {"mentions", "sentiment", ...}}}
+    {"event": "log",            "level", "message"}
+    {"event": "run_finished",   "run_id", "status", "error"}
+
+Callbacks run synchronously on the publishing thread (usually the engine's), so
+they must be quick and thread-safe, e.g. hand the event to another thread's
+queue. With no subscribers, publish() does nothing and the engine skips
+building payloads (check `active` first).
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List
+
+from src.utils.log import get_logger
+
+log = get_logger("events")
+
+Event = Dict[str, Any]
+
+
+class EventBus:
+    def __init__(self):
+        self._subscribers: List[Callable[[Event], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, callback: Callable[[Event], None]) -> Callable[[], None]:
+        """Registers `callback`; returns a function that unsubscribes it."""
+        with self._lock:
+            self._subscribers = self._subscribers + [callback]
+
+        def unsubscribe():
+            with self._lock:
+                self._subscribers = [s for s in self._subscribers if s is not callback]
+        return unsubscribe
+
+    def publish(self, event: str, **payload):
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+        message = {"event": event, **payload}
+        for callback in subscribers:
+            try:
+                callback(message)
+            except Exception:
+                # A broken monitor must never take the run down with it
+                log.debug(f"Event subscriber failed on {event}", exc_info=True)
+
+    def sample(self, event: str, snapshot: Callable[[], Dict[str, Any]], interval: float = 1.0) -> Callable[[], None]:
+        """
+        Publishes `event` with snapshot() every `interval` seconds from a daemon thread
+        (for state like HTTP counters that changes between engine hooks). Returns a stop function.
+        """
+        stopped = threading.Event()
+
+        def loop():
+            while not stopped.wait(interval):
+                self.publish(event, **snapshot())
+
+        thread = threading.Thread(target=loop, name=f"events-{event}", daemon=True)
+        thread.start()
+
+        def stop():
+            stopped.set()
+            thread.join(timeout=interval * 2)
+            # A last sample, so subscribers see the final totals
+            self.publish(event, **snapshot())
+        return stop
+
+
+class EventLogHandler(logging.Handler):
+    """Forwards engine log records to the bus as "log" events."""
+
+    def __init__(self, bus: EventBus, level=logging.INFO):
+        super().__init__(level)
+        self.bus = bus
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.bus.publish("log", level=record.levelname, message=self.format(record))
+        except Exception:
+            self.handleError(record)
@@ -0,0 +1,240 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utils import cassette
+from src.utils.log import get_logger, fields
+
+log = get_logger("http")
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+
+# (connect, read) seconds. Applied to every request that doesn't pass its own timeout.
+DEFAULT_TIMEOUT = (5, 15)
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _accept_encoding() -> str:
+    # urllib3 transparently decodes brotli when the `brotli` package is installed
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+class _CappedRetry(Retry):
+    """
+    Honours Retry-After, but never sleeps longer than MAX_RETRY_AFTER seconds.
+    Every retried attempt is reported to `on_retry(host, status)` (status None for
+    connection errors), since only the final response reaches HTTPClient.request.
+    """
+
+    MAX_RETRY_AFTER = 30
+
+    def __init__(self, *args, on_retry=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_retry = on_retry
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        # Raises once retries are exhausted; that last response is the one request() records
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if self.on_retry is not None and _pool is not None:
+            # Same key as HTTPClient._record: the URL's netloc
+            default_port = {"http": 80, "https": 443}.get(_pool.scheme)
+            host = _pool.host if _pool.port in (None, default_port) else f"{_pool.host}:{_pool.port}"
+            self.on_retry(host, response.status if response is not None else None)
+        return retry
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.MAX_RETRY_AFTER)
+
+
+class HostStats:
+    """
+    Per-host request counters.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.bytes = 0
+        self.latency_total = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, latency: float, status: Optional[int], size: int):
+        self.requests += 1
+        self.bytes += size
+        self.latency_total += latency
+        if status is None or status >= 400:
+            self.errors += 1
+        if status == 429:
+            self.rate_limited += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.latency_buckets[i] += 1
+                break
+        else:
+            self.latency_buckets[-1] += 1
+
+    def record_retry(self, status: Optional[int]):
+        # An attempt urllib3 retried; its latency is folded into the final response's
+        self.retries += 1
+        if status is not None and status < 400:
+            return
+        self.errors += 1
+        if status == 429:
+            self.rate_limited += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}s" for b in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "bytes": self.bytes,
+            "avg_latency": (self.latency_total / self.requests) if self.requests else 0.0,
+            "latency_histogram": dict(zip(labels, self.latency_buckets))
+        }
+
+
+class HTTPClient:
+    """
+    Shared HTTP client for all scrapers.
+    One pooled requests.Session (keep-alive per host), default timeouts,
+    retries with exponential backoff on 429/5xx, compressed transfer and
+    per-host metrics.
+
+    Callers working against a time budget pass retry_rate_limited=False to get
+    a 429 back immediately (from a second session without 429 retries) instead
+    of after the backoff sleeps.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout=DEFAULT_TIMEOUT,
+                 retries: int = 2, backoff: float = 0.5, pool_maxsize: int = 16):
+        self.timeout = timeout
+        self._stats: Dict[str, HostStats] = {}
+        self._stats_lock = threading.Lock()
+
+        headers = {"User-Agent": user_agent, "Accept-Encoding": _accept_encoding()}
+        self.session = self._session(headers, retries, backoff, pool_maxsize, self.RETRY_STATUSES)
+        # urllib3 retries any 429 carrying Retry-After, so that has to be off too
+        self._budget_session = self._session(headers, retries, backoff, pool_maxsize,
+                                             tuple(s for s in self.RETRY_STATUSES if s != 429),
+                                             respect_retry_after=False)
+
+    def _session(self, headers: dict, retries: int, backoff: float, pool_maxsize: int, statuses: tuple,
+                 respect_retry_after: bool = True) -> requests.Session:
+        session = requests.Session()
+        session.headers.update(headers)
+        retry = _CappedRetry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=statuses,
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=respect_retry_after,
+            raise_on_status=False,  # hand the final response back to the scraper
+            on_retry=self._record_retry
+        )
+        # pool_connections = number of hosts kept warm, pool_maxsize = sockets per host
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_maxsize, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _host_stats(self, host: str) -> HostStats:
+        # Callers hold _stats_lock
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = HostStats()
+        return stats
+
+    def _record(self, url: str, latency: float, status: Optional[int], size: int):
+        host = urlsplit(url).netloc
+        with self._stats_lock:
+            self._host_stats(host).record(latency, status, size)
+
+    def _record_retry(self, host: str, status: Optional[int]):
+        with self._stats_lock:
+            self._host_stats(host).record_retry(status)
+
+    def request(self, method: str, url: str, retry_rate_limited: bool = True, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        session = self.session if retry_rate_limited else self._budget_session
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except Exception:
+            self._record(url, time.perf_counter() - start, None, 0)
+            raise
+        # Accessing .content reads the whole body so the latency covers the transfer
+        size = len(response.content)
+        self._record(url, time.perf_counter() - start, response.status_code, size)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns {host: counters} for every host contacted so far.
+        """
+        with self._stats_lock:
+            return {host: stats.to_dict() for host, stats in self._stats.items()}
+
+    def reset_metrics(self):
+        with self._stats_lock:
+            self._stats = {}
+
+    def log_summary(self):
+        """One log line per host with its counters."""
+        for host, m in sorted(self.metrics().items()):
+            log.info("HTTP host summary", extra=fields(
+                host=host, requests=m["requests"], retries=m["retries"], errors=m["errors"],
+                rate_limited=m["rate_limited"], bytes=m["bytes"], avg_latency_s=round(m["avg_latency"], 3)))
+
+
+def pause(seconds: float):
+    """
+    Politeness delay between requests to the same service.
+    Skipped in replay mode, where nothing is sent.
+    """
+    if not cassette.is_replay():
+        time.sleep(seconds)
+
+
+_client: Optional[HTTPClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HTTPClient:
+    """
+    Returns the process-wide HTTPClient, creating it on first use.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                cassette.install_from_env()
+                _client = HTTPClient()
+    return _client
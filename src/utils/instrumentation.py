@@ -0,0 +1,167 @@
+"""
+Per-phase timing and resource accounting for SocialArbEngine runs.
+
+Each phase records wall time, CPU time, items in/out, HTTP requests/bytes/429s
+(from the shared HTTPClient), timings of external calls and free-form counters.
+`<name>_hits` / `<name>_misses` counter pairs are reported as hit rates.
+The run report is written as JSON lines: one line per phase plus a run summary.
+"""
+
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.log import get_logger, fields
+
+log = get_logger("instrumentation")
+
+
+def _http_totals(metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    return {
+        host: {"requests": m["requests"], "bytes": m["bytes"], "rate_limited": m["rate_limited"], "errors": m["errors"]}
+        for host, m in metrics.items()
+    }
+
+
+def _http_delta(before: Dict[str, Dict[str, int]], after: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    delta = {}
+    for host, counts in after.items():
+        prev = before.get(host, {})
+        diff = {k: v - prev.get(k, 0) for k, v in counts.items()}
+        if diff["requests"]:
+            delta[host] = diff
+    return delta
+
+
+class PhaseStats:
+    """
+    Mutable record for one phase; the engine fills items/counters while it runs.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items_in: Optional[int] = None
+        self.items_out: Optional[int] = None
+        self.counters: Dict[str, int] = {}
+        self.calls: Dict[str, Dict[str, float]] = {}
+        self.status = "ok"
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.http: Dict[str, Dict[str, int]] = {}
+
+    def incr(self, key: str, n: int = 1):
+        self.counters[key] = self.counters.get(key, 0) + n
+
+    @contextmanager
+    def call(self, name: str):
+        """Times one external call (yfinance, news lookup, ...)."""
+        stats = self.calls.setdefault(name, {"count": 0, "errors": 0, "wall_s": 0.0, "max_s": 0.0})
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stats["count"] += 1
+            stats["wall_s"] += elapsed
+            stats["max_s"] = max(stats["max_s"], elapsed)
+
+    def hit_rates(self) -> Dict[str, float]:
+        rates = {}
+        for key in self.counters:
+            base, _, kind = key.rpartition("_")
+            if kind not in ("hits", "misses") or base in rates:
+                continue
+            hits = self.counters.get(f"{base}_hits", 0)
+            total = hits + self.counters.get(f"{base}_misses", 0)
+            if total:
+                rates[base] = round(hits / total, 4)
+        return rates
+
+    def to_dict(self) -> Dict[str, Any]:
+        http_requests = sum(h["requests"] for h in self.http.values())
+        return {
+            "event": "phase",
+            "phase": self.name,
+            "status": self.status,
+            "wall_s": round(self.wall_s, 4),
+            "cpu_s": round(self.cpu_s, 4),
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "http_requests": http_requests,
+            "http_bytes": sum(h["bytes"] for h in self.http.values()),
+            "http_429": sum(h["rate_limited"] for h in self.http.values()),
+            "http_by_host": self.http,
+            "calls": {k: {**v, "wall_s": round(v["wall_s"], 4), "max_s": round(v["max_s"], 4)} for k, v in self.calls.items()},
+            "counters": self.counters,
+            "hit_rates": self.hit_rates()
+        }
+
+
+class RunReport:
+    """
+    Collects PhaseStats for one engine run and writes them as JSON lines.
+    """
+
+    def __init__(self, run_id: Optional[str] = None, http_metrics: Optional[Callable[[], Dict]] = None):
+        self.run_id = run_id or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + "-" + uuid.uuid4().hex[:6]
+        self.http_metrics = http_metrics or (lambda: {})
+        self.started_at = datetime.now(timezone.utc)
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        self.phases: List[PhaseStats] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        stats = PhaseStats(name)
+        self.phases.append(stats)
+        log.info(f"--- Phase: {name} ---", extra=fields(run_id=self.run_id, phase=name))
+
+        http_before = _http_totals(self.http_metrics())
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield stats
+        except Exception:
+            stats.status = "failed"
+            raise
+        finally:
+            stats.wall_s = time.perf_counter() - start_wall
+            stats.cpu_s = time.process_time() - start_cpu
+            stats.http = _http_delta(http_before, _http_totals(self.http_metrics()))
+            record = stats.to_dict()
+            log.info(
+                f"Phase {name} {stats.status} in {stats.wall_s:.2f}s",
+                extra=fields(run_id=self.run_id, phase=name, wall_s=record["wall_s"], cpu_s=record["cpu_s"],
+                             items_in=stats.items_in, items_out=stats.items_out,
+                             http_requests=record["http_requests"], http_bytes=record["http_bytes"])
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "event": "run",
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "wall_s": round(time.perf_counter() - self._start_wall, 4),
+            "cpu_s": round(time.process_time() - self._start_cpu, 4),
+            "phases": len(self.phases),
+            "failed_phases": [p.name for p in self.phases if p.status == "failed"],
+            "http_requests": sum(p.to_dict()["http_requests"] for p in self.phases),
+            "http_bytes": sum(p.to_dict()["http_bytes"] for p in self.phases),
+            "slowest_phase": max(self.phases, key=lambda p: p.wall_s).name if self.phases else None
+        }
+
+    def write(self, path: str):
+        """Overwrites `path` with this run's phase records followed by the run summary."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for stats in self.phases:
+                f.write(json.dumps({"run_id": self.run_id, **stats.to_dict()}, default=str) + "\n")
+            f.write(json.dumps(self.summary(), default=str) + "\n")
+        log.info(f"Run report saved to {path}", extra=fields(run_id=self.run_id))
@@ -0,0 +1,43 @@
+"""
+Deferred construction of heavy components.
+
+Scrapers pull in yfinance, pandas, pytrends, feedparser and VADER at import
+time. Declaring them as LazyComponent class attributes means a module is only
+imported, and the object only built, the first time an instance touches it.
+"""
+
+import importlib
+from typing import Any, Callable, Dict, Optional
+
+
+class LazyComponent:
+    """
+    Non-data descriptor: `engine.reddit` imports `module`, builds `attr()` once and
+    caches it on the instance (so later reads are plain attribute lookups and
+    assignment still works for tests/benchmarks).
+    """
+
+    def __init__(self, module: str, attr: str, before_create: Optional[Callable[[], Any]] = None,
+                 kwargs: Optional[Callable[[Any], Dict[str, Any]]] = None):
+        self.module = module
+        self.attr = attr
+        self.before_create = before_create
+        # Called with the owning instance; returns constructor keyword arguments (e.g. from its config)
+        self.kwargs = kwargs
+        self.name = attr
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        if self.before_create:
+            self.before_create()
+        factory = getattr(importlib.import_module(self.module), self.attr)
+        value = factory(**(self.kwargs(instance) if self.kwargs else {}))
+        instance.__dict__[self.name] = value
+        return value
+
+    def is_loaded(self, instance) -> bool:
+        return self.name in instance.__dict__
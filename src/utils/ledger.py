@@ -0,0 +1,179 @@
+"""
+Ledger output: data/current_signals.json for machine consumers, the dashboard
+feed in web/ and data/ledger_delta.json with what changed since the last run.
+
+Files are compact JSON with one record per line, sorted by ticker, so the
+hourly commit of data/ shows up in git as a few changed lines instead of a
+rewrite of a pretty-printed file. When no record changed, data/ isn't touched.
+
+The dashboard feed is split so page load stays small as tickers grow:
+web/data.json is an index of summary records (no `details`), and each
+ticker's full record is a shard in web/details/<TICKER>.json that the page
+fetches when a card is opened. Only shards of changed tickers are rewritten.
+With `precompress`, a .gz copy is written next to each file for servers that
+serve precompressed assets (nginx gzip_static and the like).
+"""
+
+import gzip
+import io
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.utils.log import get_logger
+
+log = get_logger("ledger")
+
+# details keys that repeat a top-level field (count == signal_strength, ...)
+DUPLICATED_DETAILS = ("count", "current_price", "trend_sentiment", "bullish_vol", "bearish_vol",
+                      "activity_z", "ew_sentiment")
+
+
+# Top-level fields left out of the dashboard index; they're in the per-ticker detail shard
+INDEX_EXCLUDED = ("details", "ew_sentiment")
+
+
+def compact_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drops the parts of `details` already present at the top level.
+    The raw `details.sources` list stays: the dashboard lists mentions from it.
+    """
+    details = record.get("details")
+    if not details:
+        return record
+    return {**record, "details": {k: v for k, v in details.items() if k not in DUPLICATED_DETAILS}}
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def write_records(f, records: Iterable[Dict[str, Any]]):
+    """Streams a JSON array to `f`, one compact record per line."""
+    f.write("[")
+    first = True
+    for record in records:
+        f.write("\n" if first else ",\n")
+        f.write(_dumps(record))
+        first = False
+    f.write("\n]\n")
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Previous ledger records; [] if the file is missing or unreadable."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if isinstance(data, dict):
+        data = data.get("signals", [])
+    return data if isinstance(data, list) else []
+
+
+def ledger_delta(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Returns {"changed": [records that are new or differ], "removed": [tickers no longer present]}.
+    """
+    before = {r.get("ticker"): _dumps(r) for r in previous}
+    after = {r.get("ticker"): r for r in current}
+    changed = [r for ticker, r in after.items() if before.get(ticker) != _dumps(r)]
+    removed = sorted(t for t in before if t not in after)
+    return {"changed": changed, "removed": removed}
+
+
+def _atomic_write(path: str, write):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _write_text(path: str, text: str, precompress: bool):
+    _atomic_write(path, lambda f: f.write(text))
+    if precompress:
+        # mtime=0 keeps the .gz byte-identical for identical content
+        with open(path + ".gz.tmp", "wb") as f:
+            f.write(gzip.compress(text.encode("utf-8"), mtime=0))
+        os.replace(path + ".gz.tmp", path + ".gz")
+    elif os.path.exists(path + ".gz"):
+        os.remove(path + ".gz")
+
+
+def summary_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in record.items() if k not in INDEX_EXCLUDED}
+
+
+def shard_name(ticker: str) -> str:
+    """File name of a ticker's detail shard ("BRK.B" -> "BRK.B.json")."""
+    return re.sub(r"[^A-Za-z0-9.\-]", "_", str(ticker)) + ".json"
+
+
+def write_web_feed(records: List[Dict[str, Any]], web_path: str, details_dir: str, changed_tickers: Iterable[str],
+                   precompress: bool = False):
+    """
+    Writes the dashboard index (`web_path`) and the detail shards in `details_dir`.
+    Shards are only rewritten for `changed_tickers` or when missing; shards of
+    tickers no longer in the ledger are removed.
+    """
+    os.makedirs(details_dir, exist_ok=True)
+    changed_tickers = set(changed_tickers)
+    suffix = ".gz" if precompress else ""
+    existing = set(os.listdir(details_dir))
+    expected = set()
+    written = 0
+    for record in records:
+        name = shard_name(record.get("ticker"))
+        expected.update((name, name + ".gz") if precompress else (name,))
+        if record.get("ticker") in changed_tickers or name not in existing or name + suffix not in existing:
+            _write_text(os.path.join(details_dir, name), _dumps(record) + "\n", precompress)
+            written += 1
+    for name in existing - expected:
+        if name.endswith((".json", ".json.gz")):
+            os.remove(os.path.join(details_dir, name))
+
+    # The index carries the scan time, so it's refreshed every run (it isn't committed)
+    last_scan = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    details_url = os.path.relpath(details_dir, os.path.dirname(web_path) or ".").replace(os.sep, "/") + "/"
+    index = io.StringIO()
+    index.write(_dumps({"metadata": {"last_scan": last_scan, "details": details_url}})[:-1] + ',"signals":')
+    write_records(index, (summary_record(r) for r in records))
+    index.write("}\n")
+    _write_text(web_path, index.getvalue(), precompress)
+    log.info(f"Web Dashboard data saved to {web_path} ({written} detail shards updated in {details_dir})")
+
+
+def write_ledger(data: list, output_path: str, web_path: str, delta_path: Optional[str] = None,
+                 details_dir: Optional[str] = None, precompress: bool = False) -> bool:
+    """
+    Writes the signal list for machine consumers and the web dashboard.
+    Returns False (and leaves output_path/delta_path alone) when no record changed.
+    `details_dir` defaults to details/ next to `web_path`.
+    """
+    records = sorted((compact_record(r) for r in data), key=lambda r: str(r.get("ticker")))
+    delta = ledger_delta(read_records(output_path), records)
+    changed = bool(delta["changed"] or delta["removed"]) or not os.path.exists(output_path)
+
+    if changed:
+        _atomic_write(output_path, lambda f: write_records(f, records))
+        log.info(f"Signals saved to {output_path} ({len(delta['changed'])} changed, {len(delta['removed'])} removed)")
+        if delta_path:
+            generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            def write_delta(f):
+                f.write(_dumps({"generated_at": generated_at, "removed": delta["removed"]})[:-1] + ',"changed":')
+                write_records(f, delta["changed"])
+                f.write("}\n")
+
+            _atomic_write(delta_path, write_delta)
+    else:
+        log.info(f"No signal changes; {output_path} left as is")
+
+    write_web_feed(records, web_path, details_dir or os.path.join(os.path.dirname(web_path) or ".", "details"),
+                   (r.get("ticker") for r in delta["changed"]), precompress=precompress)
+    return changed
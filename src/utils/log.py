@@ -0,0 +1,93 @@
+"""
+Structured logging for the engine.
+
+SOCIAL_ARB_LOG_FORMAT=json emits one JSON object per line (for Actions log
+parsing); the default is a readable text line with key=value fields.
+SOCIAL_ARB_LOG_LEVEL sets the level (default INFO).
+
+Attach structured fields with `extra=fields(ticker="AAPL", count=3)`.
+"""
+
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+_configured = False
+
+
+def fields(**kwargs) -> Dict[str, Any]:
+    """Builds the `extra` argument carrying structured fields."""
+    return {"fields": kwargs}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        payload.update(getattr(record, "fields", {}) or {})
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        line = record.getMessage()
+        extra = getattr(record, "fields", None)
+        if extra:
+            line += " " + " ".join(f"{k}={v}" for k, v in extra.items())
+        if record.levelno >= logging.WARNING:
+            line = f"{record.levelname}: {line}"
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def _configure():
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    handler = logging.StreamHandler(sys.stdout)
+    if os.environ.get("SOCIAL_ARB_LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter())
+
+    root = logging.getLogger("social_arb")
+    root.addHandler(handler)
+    root.setLevel(os.environ.get("SOCIAL_ARB_LOG_LEVEL", "INFO").upper())
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger under the `social_arb` namespace, e.g. get_logger("engine").
+    """
+    _configure()
+    return logging.getLogger(f"social_arb.{name}")
+
+
+def redirect(handler: logging.Handler):
+    """
+    Sends engine logs to `handler` instead of stdout (e.g. while a TUI owns the terminal).
+    Returns a function that restores the previous handlers.
+    """
+    _configure()
+    root = logging.getLogger("social_arb")
+    previous = list(root.handlers)
+    if handler.formatter is None:
+        handler.setFormatter(TextFormatter())
+    root.handlers = [handler]
+
+    def restore():
+        root.handlers = previous
+    return restore
@@ -1,68 +1,276 @@
-import pandas as pd
+"""
+Builds the ticker universe the EntityResolver reads.
+
+Inputs (all local files, except the S&P 500 table which is refreshed from
+Wikipedia at most once per --max-age hours):
+    data/sp500.json                   S&P 500 constituents with generated aliases
+    data/companies.json               curated product/brand aliases ("ozempic" -> NVO)
+    data/listings/nasdaqlisted.txt    Nasdaq symbol directory (optional, pipe-delimited)
+    data/listings/otherlisted.txt     NYSE/other symbol directory (optional)
+
+Outputs:
+    data/universe.json        {"version", "companies"}: resolver DB (S&P 500 + curated aliases)
+    data/listed_tickers.txt   every listed symbol, for cashtag validation; its header names the
+                              exchange directories that went in ("exchanges=none" means S&P 500
+                              only, and the resolver then doesn't reject unknown cashtags)
+    data/universe_manifest.json  input hashes, output version, last S&P fetch
+
+If no input changed since the last build, nothing is read past the hashes and
+nothing is written. Outputs are only rewritten when their content changes.
+
+Usage:
+    python -m src.utils.populate_db                      # hourly job: rebuild only on changes
+    python -m src.utils.populate_db --download-listings  # also refresh the exchange directories (at most every --max-age hours)
+    python -m src.utils.populate_db --force
+"""
+
+import hashlib
+import io
 import json
 import os
-import requests
+import time
+from typing import Dict, List, Optional
+
+from src.utils.http_client import get_client
+
+DATA_DIR = "data"
+SP500_PATH = os.path.join(DATA_DIR, "sp500.json")
+CURATED_PATH = os.path.join(DATA_DIR, "companies.json")
+LISTINGS_DIR = os.path.join(DATA_DIR, "listings")
+UNIVERSE_PATH = os.path.join(DATA_DIR, "universe.json")
+LISTED_TICKERS_PATH = os.path.join(DATA_DIR, "listed_tickers.txt")
+MANIFEST_PATH = os.path.join(DATA_DIR, "universe_manifest.json")
+
+SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+# Nasdaq Trader symbol directories: (file name, symbol column)
+LISTING_FILES = {
+    "nasdaqlisted.txt": "Symbol",
+    "otherlisted.txt": "ACT Symbol",
+}
+LISTINGS_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/{name}"
+
+# Bump when the build logic changes so unchanged inputs still trigger a rebuild
+BUILDER_VERSION = 3
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return _sha256(f.read())
+
+
+def _write_if_changed(path: str, content: str) -> bool:
+    """Writes `content` unless the file already holds exactly that. Returns True if written."""
+    encoded = content.encode("utf-8")
+    if _file_hash(path) == _sha256(encoded):
+        return False
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(encoded)
+    os.replace(path + ".tmp", path)
+    return True
+
+
+def _load_manifest() -> Dict:
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def sp500_companies(table) -> List[Dict]:
+    """
+    Turns the Wikipedia constituents table into company records.
+    Alias generation runs on whole columns instead of row by row.
+    """
+    df = table[["Symbol", "Security"]].dropna()
+    df = df[(df["Symbol"].astype(str).str.len() > 0) & (df["Security"].astype(str).str.len() > 0)]
+    names = df["Security"].astype(str)
+    name_clean = names.str.lower()
+    # Remove "Inc.", "Corp.", etc for aliases
+    simple_name = (
+        name_clean.str.replace(" inc.", "", regex=False).str.replace(" corp.", "", regex=False)
+        .str.replace(" co.", "", regex=False).str.replace(" plc", "", regex=False).str.strip()
+    )
+    # Handle special cases (e.g. GOOG/GOOGL -> Google)
+    google = name_clean.str.contains("alphabet", regex=False)
+    meta = name_clean.str.contains("meta platforms", regex=False)
+
+    companies = []
+    for symbol, name, clean, simple, is_google, is_meta in zip(
+            df["Symbol"].astype(str), names, name_clean, simple_name, google, meta):
+        aliases = {clean, simple}
+        if is_google:
+            aliases.add("google")
+        if is_meta:
+            aliases.update(("facebook", "meta"))
+        companies.append({"symbol": symbol, "name": name, "aliases": sorted(aliases)})
+    return companies
+
+
+def populate_sp500() -> bool:
+    """Refreshes data/sp500.json from Wikipedia; only rewrites it if the constituents changed."""
+    import pandas as pd
 
-def populate_sp500():
     print("Fetching S&P 500 data...")
     try:
-        # Use Wikipedia as source
-        url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-        
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        response = requests.get(url, headers=headers)
+        response = get_client().get(SP500_URL)
         response.raise_for_status()
-        
-        tables = pd.read_html(response.text)
-        df = tables[0]
-        
-        # Standardize columns
-        # Ticker column usually 'Symbol'
-        # Name column usually 'Security'
-        
-        companies = []
-        for index, row in df.iterrows():
-            ticker = row.get('Symbol')
-            name = row.get('Security')
-            
-            if not ticker or not name:
-                continue
-                
-            # Create aliases based on common variations
-            name_clean = name.lower()
-            aliases = [name_clean]
-            
-            # Remove "Inc.", "Corp.", etc for aliases
-            simple_name = name_clean.replace(" inc.", "").replace(" corp.", "").replace(" co.", "").replace(" plc", "").strip()
-            if simple_name != name_clean:
-                aliases.append(simple_name)
-                
-            # Handle special cases (e.g. GOOG/GOOGL -> Google)
-            if "alphabet" in name_clean:
-                aliases.append("google")
-            if "meta platforms" in name_clean:
-                aliases.append("facebook")
-                aliases.append("meta")
-            
-            companies.append({
-                "symbol": ticker,
-                "name": name,
-                "aliases": list(set(aliases))
-            })
-            
-        # Save to data/sp500.json
-        output_path = os.path.join("data", "sp500.json")
-        with open(output_path, "w") as f:
-            json.dump(companies, f, indent=2)
-            
-        print(f"Successfully saved {len(companies)} companies to {output_path}")
-        return True
-        
+        tables = pd.read_html(io.StringIO(response.text))
+        companies = sp500_companies(tables[0])
     except Exception as e:
         print(f"Failed to populate S&P 500: {e}")
         return False
 
+    if _write_if_changed(SP500_PATH, json.dumps(companies, indent=2) + "\n"):
+        print(f"Successfully saved {len(companies)} companies to {SP500_PATH}")
+    else:
+        print(f"S&P 500 unchanged ({len(companies)} companies)")
+    return True
+
+
+def download_listings() -> bool:
+    ok = True
+    for name in LISTING_FILES:
+        url = LISTINGS_URL.format(name=name)
+        try:
+            response = get_client().get(url)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Failed to download {url}: {e}")
+            ok = False
+            continue
+        path = os.path.join(LISTINGS_DIR, name)
+        # The trailing "File Creation Time" line changes on every download; without it an
+        # unchanged directory hashes the same and doesn't trigger a rebuild
+        body = "".join(line for line in response.text.splitlines(keepends=True)
+                       if not line.startswith("File Creation Time"))
+        if _write_if_changed(path, body):
+            print(f"Updated {path}")
+    return ok
+
+
+def listed_symbols(path: str, column: str) -> List[str]:
+    """Symbols from a Nasdaq Trader directory file, skipping test issues and the footer line."""
+    import pandas as pd
+
+    df = pd.read_csv(path, sep="|", dtype=str, keep_default_na=False)
+    if column not in df.columns:
+        print(f"Warning: {path} has no '{column}' column; skipping")
+        return []
+    df = df[~df[column].str.startswith("File Creation Time")]
+    if "Test Issue" in df.columns:
+        df = df[df["Test Issue"] != "Y"]
+    # Class shares are "BRK.B" in cashtags but "BRK B" / "BRK$B" in some directories
+    symbols = df[column].str.strip().str.upper().str.replace(r"[ $/]", ".", regex=True)
+    return symbols[symbols.str.len() > 0].tolist()
+
+
+def merge_companies(sp500: List[Dict], curated: List[Dict]) -> List[Dict]:
+    """S&P 500 records with the curated aliases folded in; curated-only symbols are added."""
+    merged = {c["symbol"]: {**c, "aliases": list(c.get("aliases", []))} for c in sp500}
+    for c in curated:
+        symbol = c.get("symbol")
+        if not symbol:
+            continue
+        entry = merged.setdefault(symbol, {"symbol": symbol, "name": c.get("name", symbol), "aliases": []})
+        entry["aliases"] = sorted(set(entry["aliases"]) | {a.lower() for a in c.get("aliases", [])})
+    return sorted(merged.values(), key=lambda c: c["symbol"])
+
+
+def _read_json(path: str) -> List[Dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def input_hashes() -> Dict[str, Optional[str]]:
+    paths = [SP500_PATH, CURATED_PATH] + [os.path.join(LISTINGS_DIR, name) for name in LISTING_FILES]
+    return {path: _file_hash(path) for path in paths}
+
+
+def build_universe(force: bool = False) -> bool:
+    """
+    Rebuilds data/universe.json and data/listed_tickers.txt if any input changed.
+    Returns True if a rebuild happened.
+    """
+    manifest = _load_manifest()
+    hashes = input_hashes()
+    outputs_exist = os.path.exists(UNIVERSE_PATH) and os.path.exists(LISTED_TICKERS_PATH)
+    if (not force and outputs_exist and manifest.get("inputs") == hashes
+            and manifest.get("builder_version") == BUILDER_VERSION):
+        print(f"Universe unchanged (version {manifest.get('version')}); skipping rebuild")
+        return False
+
+    companies = merge_companies(_read_json(SP500_PATH), _read_json(CURATED_PATH))
+    symbols = {c["symbol"].upper() for c in companies}
+    exchanges = []
+    for name, column in LISTING_FILES.items():
+        path = os.path.join(LISTINGS_DIR, name)
+        if os.path.exists(path):
+            listed_before = len(symbols)
+            symbols.update(listed_symbols(path, column))
+            if len(symbols) > listed_before:
+                exchanges.append(os.path.splitext(name)[0])
+
+    body = json.dumps(companies, indent=2)
+    listed = "\n".join(sorted(symbols))
+    # The version is the content hash, so the resolver can key caches on it
+    version = _sha256((body + "\n" + listed).encode("utf-8"))[:12]
+
+    wrote_universe = _write_if_changed(UNIVERSE_PATH, json.dumps({"version": version, "companies": companies}, indent=2) + "\n")
+    header = f"# universe {version} exchanges={','.join(exchanges) or 'none'}"
+    wrote_listed = _write_if_changed(LISTED_TICKERS_PATH, f"{header}\n{listed}\n")
+    print(f"Universe {version}: {len(companies)} companies, {len(symbols)} listed symbols"
+          f"{'' if wrote_universe or wrote_listed else ' (outputs already up to date)'}")
+
+    manifest.update({"inputs": hashes, "version": version, "builder_version": BUILDER_VERSION})
+    _write_if_changed(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    return True
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the ticker universe for the EntityResolver")
+    parser.add_argument("--max-age", type=float, default=24.0,
+                        help="hours before the S&P 500 table and exchange listings are fetched again (default 24)")
+    parser.add_argument("--download-listings", action="store_true",
+                        help="refresh the Nasdaq/NYSE symbol directories from nasdaqtrader.com")
+    parser.add_argument("--force", action="store_true", help="refetch the S&P 500 table and rebuild")
+    args = parser.parse_args(argv)
+
+    manifest = _load_manifest()
+    age_h = (time.time() - manifest.get("sp500_fetched_at", 0)) / 3600
+    if args.force or age_h >= args.max_age or not os.path.exists(SP500_PATH):
+        if populate_sp500():
+            manifest["sp500_fetched_at"] = int(time.time())
+            _write_if_changed(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    else:
+        print(f"S&P 500 fetched {age_h:.1f}h ago; not refetching")
+
+    listings_age_h = (time.time() - manifest.get("listings_fetched_at", 0)) / 3600
+    have_listings = all(os.path.exists(os.path.join(LISTINGS_DIR, name)) for name in LISTING_FILES)
+    if args.download_listings:
+        if args.force or listings_age_h >= args.max_age or not have_listings:
+            if download_listings():
+                manifest["listings_fetched_at"] = int(time.time())
+                _write_if_changed(MANIFEST_PATH, json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+        else:
+            print(f"Exchange listings fetched {listings_age_h:.1f}h ago; not refetching")
+
+    build_universe(force=args.force)
+    return 0
+
+
 if __name__ == "__main__":
-    populate_sp500()
+    raise SystemExit(main())
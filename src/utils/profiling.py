@@ -0,0 +1,148 @@
+"""
+Opt-in profiling for engine runs.
+
+SOCIAL_ARB_PROFILE   off (default) | run | phases
+SOCIAL_ARB_PROFILER  cprofile (default) | sample
+SOCIAL_ARB_PROFILE_DIR  output root (default "profiles")
+SOCIAL_ARB_PROFILE_INTERVAL  sampling interval in seconds (default 0.005)
+
+Output goes to <dir>/<run_id>/<scope>.{pstats,txt} for cProfile and
+<scope>.collapsed for the sampler. Collapsed files hold one
+"frame;frame;frame count" line per stack and can be fed straight to
+flamegraph.pl, speedscope or inferno.
+
+When disabled every scope is a nullcontext, so the cost is one function call per phase.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+from src.utils.log import get_logger
+
+log = get_logger("profiling")
+
+OFF = "off"
+RUN = "run"
+PHASES = "phases"
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every thread at a fixed interval from a background thread.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame_label(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                self.stacks[";".join(stack)] += 1
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_collapsed(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class Profiler:
+    """
+    Decides which scopes of a run get profiled and writes their output.
+    """
+
+    def __init__(self, mode: str = OFF, kind: str = "cprofile", output_dir: str = "profiles",
+                 interval: float = 0.005, run_id: str = "run"):
+        if mode not in (OFF, RUN, PHASES):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if kind not in ("cprofile", "sample"):
+            raise ValueError(f"Unknown profiler: {kind}")
+        self.mode = mode
+        self.kind = kind
+        self.interval = interval
+        self.output_dir = os.path.join(output_dir, run_id)
+
+    @classmethod
+    def from_env(cls, run_id: str, mode: Optional[str] = None) -> "Profiler":
+        """`mode` (e.g. from a CLI flag) takes precedence over SOCIAL_ARB_PROFILE."""
+        return cls(
+            mode=(mode or os.environ.get("SOCIAL_ARB_PROFILE", OFF)).lower(),
+            kind=os.environ.get("SOCIAL_ARB_PROFILER", "cprofile").lower(),
+            output_dir=os.environ.get("SOCIAL_ARB_PROFILE_DIR", "profiles"),
+            interval=float(os.environ.get("SOCIAL_ARB_PROFILE_INTERVAL", "0.005")),
+            run_id=run_id
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != OFF
+
+    def run_scope(self):
+        """Wraps the whole run when mode is `run`."""
+        return self._profile("run") if self.mode == RUN else nullcontext()
+
+    def phase_scope(self, name: str):
+        """Wraps a single phase when mode is `phases`."""
+        return self._profile(name) if self.mode == PHASES else nullcontext()
+
+    @contextmanager
+    def _profile(self, scope: str):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, scope)
+
+        if self.kind == "sample":
+            sampler = SamplingProfiler(self.interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                sampler.write_collapsed(base + ".collapsed")
+                log.info(f"Profile written to {base}.collapsed")
+            return
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(base + ".pstats")
+            summary = io.StringIO()
+            pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(40)
+            with open(base + ".txt", "w") as f:
+                f.write(summary.getvalue())
+            log.info(f"Profile written to {base}.pstats")
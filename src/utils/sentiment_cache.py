@@ -0,0 +1,140 @@
+"""
+Persistent cache of VADER scores keyed by a hash of the text.
+
+Reddit "new" listings and RSS feeds overlap heavily from one hourly run to the
+next, so most texts a run scores were already scored by an earlier run. Scores
+live in a SQLite file (cache/sentiment.sqlite):
+
+    meta(key, value)                                   schema + lexicon version
+    scores(key, neg, neu, pos, compound, last_used)    16-byte BLAKE2b of the text
+
+A different schema or lexicon version empties the table on open, so a lexicon
+change can never serve stale scores. New scores and hits are buffered in memory
+and written in one transaction by `flush`, which also evicts the least recently
+used rows beyond `max_entries`. SQLite errors disable the cache for the rest of
+the run instead of failing it.
+"""
+
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from src.utils.log import get_logger, fields
+
+log = get_logger("sentiment_cache")
+
+# Bump when the table layout changes
+SCHEMA_VERSION = 1
+
+Scores = Tuple[float, float, float, float]  # neg, neu, pos, compound
+
+
+class SentimentCache:
+    """
+    Size-bounded LRU of sentiment scores, persisted across runs.
+    """
+
+    def __init__(self, path: str, version: str, max_entries: int = 200_000):
+        self.path = path
+        self.version = f"{SCHEMA_VERSION}:{version}"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._disabled = False
+        self._pending: Dict[bytes, Scores] = {}
+        self._touched: set = set()
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        if self._conn is not None or self._disabled:
+            return self._conn
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != self.version:
+                if row is not None:
+                    log.info(f"Sentiment cache version changed ({row[0]} -> {self.version}); clearing it")
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS scores")
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (self.version,))
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scores (key BLOB PRIMARY KEY, neg REAL, neu REAL, pos REAL,"
+                " compound REAL, last_used INTEGER) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS scores_last_used ON scores (last_used)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            self._disable(e)
+        return self._conn
+
+    def _disable(self, error: Exception):
+        log.warning(f"Sentiment cache {self.path} unavailable: {error}; scoring without it")
+        self._disabled = True
+        self._conn = None
+
+    def get(self, key: bytes) -> Optional[Scores]:
+        scores = self._pending.get(key)
+        if scores is None:
+            conn = self._connect()
+            if conn is not None:
+                try:
+                    scores = conn.execute(
+                        "SELECT neg, neu, pos, compound FROM scores WHERE key = ?", (key,)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._disable(e)
+            if scores is not None:
+                self._touched.add(key)
+        if scores is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return scores
+
+    def put(self, key: bytes, scores: Scores):
+        self._pending[key] = scores
+
+    def flush(self):
+        """Writes buffered scores, refreshes last_used of hits and evicts down to max_entries."""
+        conn = self._connect()
+        if conn is None or not (self._pending or self._touched):
+            return
+        now = int(time.time())
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO scores (key, neg, neu, pos, compound, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(key, *scores, now) for key, scores in self._pending.items()]
+                )
+                conn.executemany("UPDATE scores SET last_used = ? WHERE key = ?",
+                                 [(now, key) for key in self._touched - self._pending.keys()])
+                excess = conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM scores WHERE key IN (SELECT key FROM scores ORDER BY last_used LIMIT ?)",
+                        (excess,)
+                    )
+        except sqlite3.Error as e:
+            self._disable(e)
+            return
+        log.info(f"Sentiment cache: {self.hits} hits, {self.misses} misses, {len(self._pending)} new",
+                 extra=fields(hits=self.hits, misses=self.misses, evicted=max(0, excess)))
+        self._pending.clear()
+        self._touched.clear()
+        self.hits = self.misses = 0
+
+    def close(self):
+        self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
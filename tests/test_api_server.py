@@ -0,0 +1,71 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.api_server import SignalStore, make_handler
+from src.utils.archive import SignalArchive
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def api(tmp_path):
+    signals = tmp_path / "current_signals.json"
+    signals.write_text(json.dumps([{"ticker": "GME", "signal_strength": 3, "avg_sentiment": 0.4, "sources": ["reddit"]}]))
+    store = SignalStore(str(signals), str(tmp_path / "archive"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(store))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get(path, etag=None):
+        request = urllib.request.Request(f"http://127.0.0.1:{server.server_port}{path}",
+                                         headers={"If-None-Match": etag} if etag else {})
+        try:
+            with urllib.request.urlopen(request) as resp:
+                body = resp.read()
+                return resp.status, resp.headers.get("ETag"), json.loads(body) if body else None
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get("ETag"), None
+
+    yield store, get
+    server.shutdown()
+    server.server_close()
+
+
+def test_history_follows_archive_appends_without_ledger_change(api, tmp_path):
+    store, get = api
+    archive = SignalArchive(str(tmp_path / "archive"))
+    record = {"ticker": "GME", "signal_strength": 3, "avg_sentiment": 0.4}
+    archive.append([record], "run1", datetime(2026, 10, 19, 10, tzinfo=timezone.utc))
+    assert store.reload()
+
+    status, etag, body = get("/history/GME")
+    assert status == 200 and len(body["rows"]) == 1
+    assert get("/history/GME", etag)[0] == 304
+
+    ledger_version = store.snapshot.version
+    archive.append([record], "run2", datetime(2026, 10, 19, 11, tzinfo=timezone.utc))
+    assert store.reload()
+    assert store.snapshot.version == ledger_version
+
+    status, new_etag, body = get("/history/GME", etag)
+    assert status == 200 and new_etag != etag
+    assert [row["scanned_at"] for row in body["rows"]] == ["2026-10-19 10:00:00+00:00", "2026-10-19 11:00:00+00:00"]
+    assert len(get("/history/GME?start=2026-10-19T10:30")[2]["rows"]) == 1
+
+
+def test_history_rejects_bad_dates(api):
+    _, get = api
+    assert get("/history/GME?start=garbage")[0] == 400
+
+
+def test_unknown_routes_are_404_even_with_a_matching_etag(api):
+    _, get = api
+    _, etag, _ = get("/signals/GME")
+    assert get("/signals/GME", etag)[0] == 304
+    assert get("/signals/ZZZ", etag)[0] == 404
+    assert get("/nope", etag)[0] == 404
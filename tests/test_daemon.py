@@ -0,0 +1,62 @@
+from src.daemon import memoize
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeLookups:
+    def __init__(self):
+        self.calls = []
+
+    def fetch_news_volume(self, ticker):
+        self.calls.append(ticker)
+        return 0
+
+    def get_consensus(self, ticker):
+        self.calls.append(ticker)
+        return {}
+
+
+def test_zero_news_volume_is_cached_for_the_full_ttl():
+    clock, lookups = FakeClock(), FakeLookups()
+    memoize(lookups, "fetch_news_volume", 3600, clock, negative_ttl=60)
+
+    assert lookups.fetch_news_volume("BLND") == 0
+    clock.now = 3000
+    assert lookups.fetch_news_volume("BLND") == 0
+    assert lookups.calls == ["BLND"]
+
+    clock.now = 3601
+    lookups.fetch_news_volume("BLND")
+    assert lookups.calls == ["BLND", "BLND"]
+
+
+def test_failed_lookup_expires_after_negative_ttl():
+    clock, lookups = FakeClock(), FakeLookups()
+    memoize(lookups, "get_consensus", 86400, clock, negative_ttl=60)
+
+    lookups.get_consensus("GME")
+    clock.now = 30
+    lookups.get_consensus("GME")
+    assert lookups.calls == ["GME"]
+
+    clock.now = 61
+    lookups.get_consensus("GME")
+    assert lookups.calls == ["GME", "GME"]
+
+
+def test_cache_stays_within_max_entries():
+    clock, lookups = FakeClock(), FakeLookups()
+    cache = memoize(lookups, "fetch_news_volume", 3600, clock, max_entries=3)
+
+    for ticker in ["A", "B", "C", "D", "E"]:
+        lookups.fetch_news_volume(ticker)
+    assert len(cache) == 3
+    lookups.fetch_news_volume("E")
+    lookups.fetch_news_volume("C")
+    assert lookups.calls == ["A", "B", "C", "D", "E"]
@@ -3,6 +3,13 @@ document.addEventListener('DOMContentLoaded', () => {
     // State
     let signals = [];
     let currentFilter = 'all';
+    // data.json is a summary index; full records are fetched per ticker when a card is opened
+    let detailsPath = null;
+    let lastScan = '';
+    const detailsCache = new Map();
+    // Cards are rendered a page at a time
+    const PAGE_SIZE = 60;
+    let visibleCount = PAGE_SIZE;
 
     // DOM Elements
     const container = document.getElementById('signal-container');
@@ -23,7 +30,9 @@ document.addEventListener('DOMContentLoaded', () => {
             // Check if data has metadata wrapper
             if (data.metadata && data.signals) {
                 signals = data.signals;
+                detailsPath = data.metadata.details || null;
                 if (data.metadata.last_scan) {
+                    lastScan = data.metadata.last_scan;
                     document.getElementById('last-updated').textContent = data.metadata.last_scan;
                 }
             } else {
@@ -36,13 +45,17 @@ document.addEventListener('DOMContentLoaded', () => {
         .catch(err => console.error("Error loading data:", err));
 
     // Event Listeners
-    searchInput.addEventListener('input', render);
+    searchInput.addEventListener('input', () => {
+        visibleCount = PAGE_SIZE;
+        render();
+    });
 
     filterBtns.forEach(btn => {
         btn.addEventListener('click', (e) => {
             filterBtns.forEach(b => b.classList.remove('active'));
             e.target.classList.add('active');
             currentFilter = e.target.dataset.filter;
+            visibleCount = PAGE_SIZE;
             render();
         });
     });
@@ -77,7 +90,8 @@ document.addEventListener('DOMContentLoaded', () => {
             return true;
         });
 
-        filtered.forEach(signal => {
+        const fragment = document.createDocumentFragment();
+        filtered.slice(0, visibleCount).forEach(signal => {
             const card = document.createElement('div');
             card.className = 'card';
             card.onclick = () => openModal(signal);
@@ -118,17 +132,35 @@ document.addEventListener('DOMContentLoaded', () => {
                     </div>
                 </div>
             `;
-            container.appendChild(card);
+            fragment.appendChild(card);
         });
-    }
 
-    let chartInstance = null;
+        if (filtered.length > visibleCount) {
+            const more = document.createElement('button');
+            more.className = 'filter-btn';
+            more.textContent = `Show more (${filtered.length - visibleCount} left)`;
+            more.onclick = () => {
+                visibleCount += PAGE_SIZE;
+                render();
+            };
+            fragment.appendChild(more);
+        }
+        container.appendChild(fragment);
+    }
 
-    function openModal(signal) {
-        document.getElementById('modal-ticker').textContent = signal.ticker;
-        modal.classList.add('active');
+    function loadDetails(signal) {
+        // Older data.json files still carry details inline
+        if (signal.details || !detailsPath) return Promise.resolve(signal);
+        if (!detailsCache.has(signal.ticker)) {
+            const url = `${detailsPath}${encodeURIComponent(signal.ticker)}.json?v=${encodeURIComponent(lastScan)}`;
+            detailsCache.set(signal.ticker, fetch(url)
+                .then(res => res.ok ? res.json() : signal)
+                .catch(() => signal));
+        }
+        return detailsCache.get(signal.ticker);
+    }
 
-        // Render Sources
+    function renderSources(signal) {
         const list = document.getElementById('source-list');
         list.innerHTML = '';
 
@@ -164,6 +196,21 @@ document.addEventListener('DOMContentLoaded', () => {
             li.innerHTML = contentHtml;
             list.appendChild(li);
         });
+    }
+
+    let chartInstance = null;
+
+    function openModal(signal) {
+        document.getElementById('modal-ticker').textContent = signal.ticker;
+        modal.classList.add('active');
+
+        // Render the summary sources right away, then the raw ones once the detail shard arrives
+        renderSources(signal);
+        loadDetails(signal).then(full => {
+            if (full !== signal && document.getElementById('modal-ticker').textContent === signal.ticker) {
+                renderSources(full);
+            }
+        });
 
         // Update Sentiment Battle
         const bullish = signal.bullish_search_vol || 0;